@@ -0,0 +1,121 @@
+"""
+Tiempo de arranque de la interfaz: cuánto tarda cada página en dibujarse por primera
+vez en un intérprete nuevo y qué dependencias pesadas importa.
+
+    python benchmarks/arranque.py [--repeticiones 3] [--historial benchmarks/historial_arranque.jsonl]
+
+Para cada página registrada en paginas.PAGINAS se lanza un proceso que abre app.py con
+streamlit.testing (AppTest) directamente en esa página y se mide:
+    proceso_ms        desde que se lanza el intérprete hasta que termina el primer dibujado
+    primer_render_ms  solo la primera ejecución de app.py (importaciones de la página incluidas)
+La mediana de las repeticiones se agrega al historial y se compara con la corrida anterior.
+Termina con código 1 si una página ligera importa alguna dependencia pesada o si su
+primer dibujado es más lento que la corrida anterior por encima de la tolerancia.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from benchmarks.bench import ultima_corrida, version_codigo
+from paginas import PAGINAS
+
+MODULOS_PESADOS = ["pandas", "numpy", "pyarrow", "docx", "PyPDF2", "pdfplumber", "openpyxl"]
+# Páginas que no deben cargar ninguna dependencia pesada
+PAGINAS_LIGERAS = ["R7MD - Mensajes Predefinidos"]
+
+MEDICION = """
+import json, sys, time
+inicio = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=300)
+at.session_state["pagina"] = sys.argv[2]
+antes = time.perf_counter()
+at.run()
+fin = time.perf_counter()
+print(json.dumps({
+    "primer_render_ms": round(1000 * (fin - antes), 1),
+    "errores": [str(e.value) for e in at.exception],
+    "modulos_pesados": [m for m in json.loads(sys.argv[3]) if m in sys.modules],
+}))
+"""
+
+def medir_pagina(titulo):
+    inicio = time.perf_counter()
+    proceso = subprocess.run(
+        [sys.executable, "-c", MEDICION, os.path.join(RAIZ, "app.py"), titulo, json.dumps(MODULOS_PESADOS)],
+        cwd=RAIZ, capture_output=True, text=True, check=True,
+    )
+    resultado = json.loads(proceso.stdout.strip().splitlines()[-1])
+    resultado["proceso_ms"] = round(1000 * (time.perf_counter() - inicio), 1)
+    return resultado
+
+def imprimir(corrida, anterior):
+    print(f"{'página':<32} {'proceso ms':>11} {'render ms':>10} {'vs anterior':>12}  dependencias pesadas")
+    for titulo, r in corrida["resultados"].items():
+        comparacion = ""
+        previo = (anterior or {}).get("resultados", {}).get(titulo)
+        if previo:
+            comparacion = f"{100 * (r['primer_render_ms'] / previo['primer_render_ms'] - 1):+.1f}%"
+        print(f"{titulo:<32} {r['proceso_ms']:>11.1f} {r['primer_render_ms']:>10.1f} {comparacion:>12}  "
+              f"{', '.join(r['modulos_pesados']) or '-'}")
+
+def revisar(corrida, anterior, tolerancia):
+    """Problemas que hacen fallar el benchmark"""
+    problemas = []
+    for titulo, r in corrida["resultados"].items():
+        if r["errores"]:
+            problemas.append(f"{titulo}: la página falló al dibujarse: {r['errores'][0]}")
+        if titulo not in PAGINAS_LIGERAS:
+            continue
+        if r["modulos_pesados"]:
+            problemas.append(f"{titulo}: importa {', '.join(r['modulos_pesados'])} al arrancar")
+        previo = (anterior or {}).get("resultados", {}).get(titulo)
+        if previo and r["primer_render_ms"] > previo["primer_render_ms"] * (1 + tolerancia):
+            problemas.append(f"{titulo}: primer dibujado {r['primer_render_ms']:.0f} ms, "
+                             f"antes {previo['primer_render_ms']:.0f} ms")
+    return problemas
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tiempo de arranque de las páginas de la interfaz")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--tolerancia", type=float, default=0.25,
+                        help="Cuánto más lento puede ser el primer dibujado de una página ligera (0.25 = 25 %%)")
+    parser.add_argument("--historial", default=os.path.join(RAIZ, "benchmarks", "historial_arranque.jsonl"))
+    args = parser.parse_args(argv)
+
+    corrida = {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": version_codigo(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "resultados": {},
+    }
+    for pagina in PAGINAS:
+        print(f"Midiendo {pagina.titulo}...", file=sys.stderr)
+        mediciones = [medir_pagina(pagina.titulo) for _ in range(args.repeticiones)]
+        corrida["resultados"][pagina.titulo] = {
+            "proceso_ms": statistics.median(m["proceso_ms"] for m in mediciones),
+            "primer_render_ms": statistics.median(m["primer_render_ms"] for m in mediciones),
+            "modulos_pesados": sorted({modulo for m in mediciones for modulo in m["modulos_pesados"]}),
+            "errores": [error for m in mediciones for error in m["errores"]],
+        }
+
+    anterior = ultima_corrida(args.historial)
+    imprimir(corrida, anterior)
+    problemas = revisar(corrida, anterior, args.tolerancia)
+    with open(args.historial, "a", encoding="utf-8") as f:
+        f.write(json.dumps(corrida, ensure_ascii=False) + "\n")
+    for problema in problemas:
+        print(f"✗ {problema}", file=sys.stderr)
+    return 1 if problemas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""
+Benchmarks de extracción, búsqueda y calificación de R3MD sobre un corpus sintético.
+
+    python benchmarks/bench.py [--tamanos 10 100 1000] [--historial benchmarks/historial.jsonl]
+
+Para cada tamaño se genera (o se reutiliza) un corpus con benchmarks/corpus.py y se mide:
+    extraer_docx, extraer_pdf     extraer_texto_docx / extraer_texto_pdf por documento
+                                  (en extraer_pdf, respaldo es la fracción de páginas que pasaron a pdfplumber)
+    buscar                        buscar_expresion_completa para todas las expresiones
+    buscar_tolerante              evaluar_expresiones en modo tolerante (índice y árbol BK por documento)
+    calificar                     calificar_r3md de punta a punta, con la caché en disco vacía
+    calificar_cache               lo mismo, con el texto ya en la caché
+Cada corrida se agrega al historial (JSON por renglón) y se compara con la anterior.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from benchmarks.corpus import generar_corpus
+from calificador.cache import cache_texto
+from calificador.calificacion import calificar_r3md
+from calificador.motores_pdf import estadisticas_motores
+from calificador.r3md import (
+    EXPRESIONES_FIJAS,
+    TOLERANCIA_EXPRESIONES,
+    buscar_expresion_completa,
+    evaluar_expresiones,
+    extraer_texto,
+    extraer_texto_docx,
+    extraer_texto_pdf,
+    indice_ecuaciones,
+    normalizar_texto,
+)
+
+# Documentos usados para medir la memoria (tracemalloc vuelve todo más lento)
+MUESTRA_MEMORIA = 20
+
+def cargar_corpus(directorio, n, semilla):
+    manifiesto = os.path.join(directorio, "corpus.json")
+    if not os.path.exists(manifiesto) or len(json.load(open(manifiesto))["entregas"]) != n:
+        generar_corpus(directorio, n, semilla)
+    entregas = json.load(open(manifiesto))["entregas"]
+    documentos = []
+    for archivo in sorted(entregas):
+        with open(os.path.join(directorio, archivo), "rb") as f:
+            documentos.append((archivo, f.read()))
+    return documentos, entregas
+
+def vaciar_cache():
+    """Dirige la caché en disco a un directorio temporal nuevo (y vacío)"""
+    if os.path.basename(cache_texto.directorio).startswith("calificador-bench-"):
+        shutil.rmtree(cache_texto.directorio, ignore_errors=True)
+    cache_texto.directorio = tempfile.mkdtemp(prefix="calificador-bench-")
+
+def medir(funcion, elementos, preparar=None):
+    """
+    Tiempo total de aplicar funcion a cada elemento y pico de memoria en una muestra.
+    preparar() se llama antes de cada pasada.
+    """
+    if preparar:
+        preparar()
+    inicio = time.perf_counter()
+    for elemento in elementos:
+        funcion(elemento)
+    segundos = time.perf_counter() - inicio
+
+    if preparar:
+        preparar()
+    tracemalloc.start()
+    for elemento in elementos[:MUESTRA_MEMORIA]:
+        funcion(elemento)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    cantidad = len(elementos)
+    return {
+        "documentos": cantidad,
+        "segundos": round(segundos, 4),
+        "docs_por_s": round(cantidad / segundos, 1) if segundos else None,
+        "ms_por_doc": round(1000 * segundos / cantidad, 3) if cantidad else None,
+        "pico_mb": round(pico / 2**20, 2),
+    }
+
+def medir_tamano(directorio, n, semilla):
+    documentos, esperados = cargar_corpus(directorio, n, semilla)
+    docx = [datos for archivo, datos in documentos if archivo.endswith(".docx")]
+    pdf = [datos for archivo, datos in documentos if archivo.endswith(".pdf")]
+    textos = [normalizar_texto(extraer_texto(archivo, io.BytesIO(datos))) for archivo, datos in documentos]
+
+    def buscar(texto):
+        for i, expresion in enumerate(EXPRESIONES_FIJAS):
+            buscar_expresion_completa(texto, i, expresion)
+
+    resultados = {"extraer_docx": medir(lambda datos: extraer_texto_docx(io.BytesIO(datos)), docx)}
+    estadisticas_motores.vaciar()
+    resultados["extraer_pdf"] = medir(lambda datos: extraer_texto_pdf(io.BytesIO(datos)), pdf)
+    respaldo = estadisticas_motores.tasa_respaldo()
+    resultados["extraer_pdf"]["respaldo"] = None if respaldo is None else round(respaldo, 3)
+    indice_ecuaciones.cache_clear()
+    resultados["buscar"] = medir(buscar, textos)
+    resultados["buscar_tolerante"] = medir(
+        lambda texto: evaluar_expresiones(texto, EXPRESIONES_FIJAS, tolerancia=TOLERANCIA_EXPRESIONES), textos
+    )
+
+    def calificar(documento):
+        return calificar_r3md(*documento)
+
+    resultados["calificar"] = medir(calificar, documentos, preparar=vaciar_cache)
+
+    # La pasada que llena la caché sirve también para medir la precisión contra el corpus
+    vaciar_cache()
+    aciertos = sum(calificar(documento).indices_incorrectos == esperados[documento[0]] for documento in documentos)
+    resultados["calificar"]["precision"] = round(aciertos / len(documentos), 3)
+    resultados["calificar_cache"] = medir(calificar, documentos)
+    return resultados
+
+def version_codigo():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+def ultima_corrida(historial):
+    if not os.path.exists(historial):
+        return None
+    with open(historial, encoding="utf-8") as f:
+        renglones = [r for r in f if r.strip()]
+    return json.loads(renglones[-1]) if renglones else None
+
+def imprimir(corrida, anterior):
+    print(f"{'tamaño':>6} {'etapa':<16} {'docs':>5} {'ms/doc':>9} {'docs/s':>9} {'pico MB':>8} {'vs anterior':>12} {'precisión':>10}")
+    for tamano, etapas in corrida["resultados"].items():
+        for etapa, r in etapas.items():
+            comparacion = ""
+            previo = (anterior or {}).get("resultados", {}).get(tamano, {}).get(etapa)
+            if previo and previo.get("ms_por_doc") and r["ms_por_doc"]:
+                comparacion = f"{100 * (r['ms_por_doc'] / previo['ms_por_doc'] - 1):+.1f}%"
+            print(f"{tamano:>6} {etapa:<16} {r['documentos']:>5} {r['ms_por_doc'] or 0:>9.3f} "
+                  f"{r['docs_por_s'] or 0:>9.1f} {r['pico_mb']:>8.2f} {comparacion:>12} {r.get('precision', ''):>10}")
+    for tamano, etapas in corrida["resultados"].items():
+        respaldo = etapas.get("extraer_pdf", {}).get("respaldo")
+        if respaldo is not None:
+            print(f"{tamano:>6} páginas PDF leídas con un motor de respaldo: {respaldo:.1%}")
+    print(f"Memoria máxima del proceso: {corrida['max_rss_mb']} MB")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de R3MD")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--corpus", default=os.path.join(tempfile.gettempdir(), "calificador-corpus"),
+                        help="Directorio donde se guardan los corpus generados")
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--historial", default=os.path.join(RAIZ, "benchmarks", "historial.jsonl"))
+    args = parser.parse_args(argv)
+
+    corrida = {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": version_codigo(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "resultados": {},
+    }
+    for n in args.tamanos:
+        print(f"Midiendo {n} entregas...", file=sys.stderr)
+        corrida["resultados"][str(n)] = medir_tamano(os.path.join(args.corpus, f"{n}-{args.semilla}"), n, args.semilla)
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    corrida["max_rss_mb"] = round(max_rss / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+    anterior = ultima_corrida(args.historial)
+    imprimir(corrida, anterior)
+    with open(args.historial, "a", encoding="utf-8") as f:
+        f.write(json.dumps(corrida, ensure_ascii=False) + "\n")
+    vaciar_cache()
+    shutil.rmtree(cache_texto.directorio, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Generador de entregas sintéticas de R3MD (.docx y .pdf) para los benchmarks.
+
+    python benchmarks/corpus.py SALIDA/ -n 100 [--semilla 1] [--errores 0.3] [--pdf 0.5]
+
+Cada entrega varía el formato de los incisos ("a)", "a.", "inciso a"), los símbolos
+que dejan distintos editores (Ս, Ո, ´, --), el número de páginas de relleno y los
+incisos con respuesta equivocada. En SALIDA/corpus.json quedan los incisos
+incorrectos de cada archivo para poder medir también la precisión.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+
+from calificador.algebra import mascara_a_lista
+from calificador.r3md import EXPRESIONES_FIJAS, LETRAS, extraer_conjunto
+
+FORMATOS_INCISO = ["{letra})", "{letra}.", "inciso {letra}", "Inciso {letra})", "{letra_mayuscula})"]
+
+# Cada variante reemplaza un símbolo por el que producen otros editores o teclados
+VARIANTES_SIMBOLO = [
+    {},
+    {"∪": "Ս", "∩": "Ո"},
+    {"′": "´"},
+    {"–": "--"},
+    {"∪": "Ս", "∩": "Ո", "′": "´", "–": "--"},
+]
+
+NOMBRES = ["Ana", "Beto", "Carla", "Daniel", "Elena", "Fernando", "Gabriela", "Héctor", "Irene", "Jorge",
+           "Karla", "Luis", "María", "Néstor", "Olga", "Pablo", "Raquel", "Sergio", "Teresa", "Úrsula"]
+APELLIDOS = ["López", "García", "Martínez", "Hernández", "Pérez", "Sánchez", "Ramírez", "Torres", "Flores", "Rivera"]
+
+RELLENO = [
+    "Para resolver el ejercicio se representaron los conjuntos en un diagrama de Venn.",
+    "La unión reúne los elementos que pertenecen a cualquiera de los dos conjuntos.",
+    "La intersección contiene solo los elementos comunes a ambos conjuntos.",
+    "El complemento se obtiene con los elementos del universo que no están en el conjunto.",
+    "La diferencia B – A conserva los elementos de B que no pertenecen a A.",
+    "Se revisó cada resultado elemento por elemento antes de escribir la respuesta final.",
+    "Los elementos de cada conjunto se listan en orden ascendente y sin repetir.",
+    "¿Cómo se comprueba el resultado? Contando los elementos de cada región del diagrama.",
+]
+
+LINEAS_POR_PAGINA = 46
+
+def respuesta_equivocada(azar, expresion):
+    """Cambia un elemento del conjunto: quita uno o agrega uno que no estaba"""
+    izquierda, _, derecha = expresion.partition("=")
+    elementos = mascara_a_lista(extraer_conjunto(derecha))
+    if elementos and azar.random() < 0.5:
+        elementos.remove(azar.choice(elementos))
+    else:
+        elementos.append(azar.choice([n for n in range(1, 15) if n not in elementos]))
+    return f"{izquierda.strip()} = {{{','.join(str(n) for n in sorted(elementos))}}}"
+
+def generar_lineas(azar, nombre, tasa_error=0.3, paginas=1):
+    """Renglones de una entrega y los índices de los incisos que quedaron mal"""
+    formato = azar.choice(FORMATOS_INCISO)
+    variante = azar.choice(VARIANTES_SIMBOLO)
+    lineas = [
+        "Universidad Virtual - Matemáticas Discretas",
+        f"Nombre completo: {nombre}",
+        "Reto 3. Operaciones con conjuntos",
+        "U = {1,2,3,4,5,6,7,8,9,10,11,12,13,14}",
+        "",
+    ]
+    relleno_total = max(paginas * LINEAS_POR_PAGINA - 30, 0)
+    # Parte del relleno va antes de las respuestas y parte después, como en los anexos reales
+    relleno_antes = azar.randint(0, relleno_total)
+    lineas += [azar.choice(RELLENO) for _ in range(relleno_antes)]
+
+    incorrectos = []
+    for i, expresion in enumerate(EXPRESIONES_FIJAS):
+        if azar.random() < tasa_error:
+            expresion = respuesta_equivocada(azar, expresion)
+            incorrectos.append(i)
+        for original, reemplazo in variante.items():
+            expresion = expresion.replace(original, reemplazo)
+        lineas.append(formato.format(letra=LETRAS[i], letra_mayuscula=LETRAS[i].upper()))
+        lineas.append(expresion)
+        lineas.append("")
+
+    lineas += [azar.choice(RELLENO) for _ in range(relleno_total - relleno_antes)]
+    return lineas, incorrectos
+
+def escribir_docx(lineas, destino):
+    doc = Document()
+    for linea in lineas:
+        doc.add_paragraph(linea)
+    doc.save(destino)
+
+# Caracteres fuera de ASCII que se codifican en 128+ y se declaran en el ToUnicode del PDF
+CARACTERES_PDF = "áéíóúÁÉÍÓÚñÑüÜ¿¡∪∩′–Ս Ո´−"
+CODIGOS_PDF = {c: 128 + i for i, c in enumerate(CARACTERES_PDF)}
+
+def _texto_pdf(linea):
+    partes = []
+    for c in linea:
+        if c in CODIGOS_PDF:
+            partes.append(f"\\{CODIGOS_PDF[c]:03o}")
+        elif c in "()\\":
+            partes.append("\\" + c)
+        elif 32 <= ord(c) < 127:
+            partes.append(c)
+        else:
+            partes.append("?")
+    return "".join(partes)
+
+def _to_unicode():
+    pares = "\n".join(f"<{codigo:02X}> <{ord(c):04X}>" for c, codigo in CODIGOS_PDF.items())
+    return (
+        "/CIDInit /ProcSet findresource begin\n12 dict begin\nbegincmap\n"
+        "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n"
+        "/CMapName /Adobe-Identity-UCS def\n/CMapType 2 def\n"
+        "1 begincodespacerange\n<00> <FF>\nendcodespacerange\n"
+        "1 beginbfrange\n<20> <7E> <0020>\nendbfrange\n"
+        f"{len(CODIGOS_PDF)} beginbfchar\n{pares}\nendbfchar\n"
+        "endcmap\nCMapName currentdict /CMap defineresource pop\nend\nend"
+    ).encode("ascii")
+
+def escribir_pdf(lineas, destino):
+    """
+    PDF mínimo escrito a mano (Helvetica y un ToUnicode para acentos y símbolos de
+    conjuntos), así el generador no depende de bibliotecas para crear PDF.
+    """
+    paginas = [lineas[i:i + LINEAS_POR_PAGINA] for i in range(0, len(lineas), LINEAS_POR_PAGINA)] or [[]]
+    objetos = [None, None, None, None]  # catálogo, páginas, fuente, ToUnicode
+
+    def flujo(datos):
+        comprimido = zlib.compress(datos)
+        return b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(comprimido) + comprimido + b"\nendstream"
+
+    objetos[3] = flujo(_to_unicode())
+    objetos[2] = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /ToUnicode 4 0 R >>"
+    hijos = []
+    for renglones in paginas:
+        contenido = "BT /F1 11 Tf 14 TL 56 790 Td\n" + "".join(f"({_texto_pdf(r)}) Tj T*\n" for r in renglones) + "ET"
+        objetos.append(flujo(contenido.encode("latin-1")))
+        objetos.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objetos)
+        )
+        hijos.append(len(objetos))
+    objetos[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objetos[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % n for n in hijos), len(hijos))
+
+    salida = bytearray(b"%PDF-1.4\n")
+    posiciones = []
+    for numero, objeto in enumerate(objetos, 1):
+        posiciones.append(len(salida))
+        salida += b"%d 0 obj\n" % numero + objeto + b"\nendobj\n"
+    inicio_xref = len(salida)
+    salida += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1)
+    salida += b"".join(b"%010d 00000 n \n" % p for p in posiciones)
+    salida += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objetos) + 1, inicio_xref)
+    with open(destino, "wb") as f:
+        f.write(salida)
+
+def generar_corpus(directorio, n, semilla=1, tasa_error=0.3, proporcion_pdf=0.5, max_paginas=8):
+    """
+    Escribe n entregas en el directorio y devuelve {archivo: incisos incorrectos}.
+    Con la misma semilla se obtiene exactamente el mismo corpus.
+    """
+    azar = random.Random(semilla)
+    os.makedirs(directorio, exist_ok=True)
+    manifiesto = {}
+    for i in range(n):
+        nombre = f"{azar.choice(NOMBRES)} {azar.choice(APELLIDOS)}"
+        # La mayoría de las entregas son cortas; unas pocas traen anexos largos
+        paginas = 1 if azar.random() < 0.6 else azar.randint(2, max_paginas)
+        lineas, incorrectos = generar_lineas(azar, nombre, tasa_error, paginas)
+        extension = ".pdf" if azar.random() < proporcion_pdf else ".docx"
+        archivo = f"entrega_{i:04d}{extension}"
+        (escribir_pdf if extension == ".pdf" else escribir_docx)(lineas, os.path.join(directorio, archivo))
+        manifiesto[archivo] = incorrectos
+    with open(os.path.join(directorio, "corpus.json"), "w", encoding="utf-8") as f:
+        json.dump({"semilla": semilla, "tasa_error": tasa_error, "entregas": manifiesto}, f, indent=1)
+    return manifiesto
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera entregas sintéticas de R3MD")
+    parser.add_argument("salida", help="Directorio donde se escriben las entregas")
+    parser.add_argument("-n", type=int, default=100, help="Número de entregas")
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--errores", type=float, default=0.3, help="Probabilidad de que un inciso esté mal")
+    parser.add_argument("--pdf", type=float, default=0.5, help="Proporción de entregas en PDF")
+    args = parser.parse_args(argv)
+    generar_corpus(args.salida, args.n, args.semilla, args.errores, args.pdf)
+    print(f"{args.n} entregas → {args.salida}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Carga sobre el servicio HTTP de calificación: entregas por segundo y latencia según el
+número de clientes simultáneos.
+
+    python benchmarks/servicio.py [-n 100] [--clientes 1 4 16] [--procesos 2] [--historial benchmarks/historial_servicio.jsonl]
+
+Lanza el servicio en este proceso (en un puerto libre, con caché y registro temporales),
+envía cada entrega del corpus de benchmarks/corpus.py con urllib desde varios hilos y
+compara los incisos incorrectos de cada respuesta con los del corpus. Antes de cada
+ronda se vacía la caché de texto. Las respuestas 503 (cola llena) se reintentan después
+de Retry-After y se cuentan aparte; la latencia de cada entrega incluye esos reintentos.
+Al final se guarda también lo que reporta /metrics.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+# Los procesos del pool leen estas variables al importar el paquete
+DIRECTORIO_TEMPORAL = tempfile.mkdtemp(prefix="calificador-servicio-")
+os.environ["CALIFICADOR_CACHE_DIR"] = os.path.join(DIRECTORIO_TEMPORAL, "cache")
+os.environ["CALIFICADOR_REGISTRO"] = os.path.join(DIRECTORIO_TEMPORAL, "registro.sqlite3")
+
+from benchmarks.bench import cargar_corpus, ultima_corrida, version_codigo
+from calificador.servicio import cerrar_servidor, crear_servidor, resumir_latencias
+
+def enviar(url, archivo, datos):
+    """Respuesta JSON de POST /calificar, segundos que tardó y cuántas veces se rechazó por cola llena"""
+    rechazos = 0
+    inicio = time.perf_counter()
+    while True:
+        solicitud = urllib.request.Request(f"{url}/calificar?{urlencode({'archivo': archivo})}", data=datos, method="POST")
+        try:
+            with urllib.request.urlopen(solicitud, timeout=300) as respuesta:
+                return json.load(respuesta), time.perf_counter() - inicio, rechazos
+        except urllib.error.HTTPError as e:
+            if e.code != 503:
+                raise
+            rechazos += 1
+            time.sleep(float(e.headers.get("Retry-After", 1)))
+
+def metricas(url):
+    with urllib.request.urlopen(f"{url}/metrics") as respuesta:
+        return json.load(respuesta)
+
+def medir_ronda(url, documentos, esperados, clientes):
+    shutil.rmtree(os.environ["CALIFICADOR_CACHE_DIR"], ignore_errors=True)
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(clientes) as pool:
+        respuestas = list(pool.map(lambda documento: enviar(url, *documento), documentos))
+    segundos = time.perf_counter() - inicio
+
+    aciertos = sum(
+        [i for i, inciso in enumerate(respuesta["incisos"]) if not inciso["correcto"]] == esperados[archivo]
+        for (archivo, _), (respuesta, _, _) in zip(documentos, respuestas)
+    )
+    return {
+        "documentos": len(documentos),
+        "segundos": round(segundos, 3),
+        "docs_por_s": round(len(documentos) / segundos, 1),
+        "reintentos_503": sum(rechazos for _, _, rechazos in respuestas),
+        "precision": round(aciertos / len(documentos), 3),
+        "latencia_ms": resumir_latencias([latencia for _, latencia, _ in respuestas]),
+    }
+
+def imprimir(corrida, anterior):
+    print(f"{'clientes':>8} {'docs':>5} {'docs/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} "
+          f"{'503':>5} {'vs anterior':>12} {'precisión':>10}")
+    for clientes, r in corrida["resultados"].items():
+        comparacion = ""
+        previo = (anterior or {}).get("resultados", {}).get(clientes)
+        if previo and previo.get("docs_por_s"):
+            comparacion = f"{100 * (r['docs_por_s'] / previo['docs_por_s'] - 1):+.1f}%"
+        latencia = r["latencia_ms"]
+        print(f"{clientes:>8} {r['documentos']:>5} {r['docs_por_s']:>8.1f} {latencia.get('p50', 0):>8.1f} "
+              f"{latencia.get('p90', 0):>8.1f} {latencia.get('p99', 0):>8.1f} {r['reintentos_503']:>5} "
+              f"{comparacion:>12} {r['precision']:>10}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Carga sobre el servicio HTTP de R3MD")
+    parser.add_argument("-n", type=int, default=100, help="Entregas del corpus")
+    parser.add_argument("--clientes", type=int, nargs="+", default=[1, 4, 16], help="Clientes simultáneos por ronda")
+    parser.add_argument("--procesos", type=int, default=2)
+    parser.add_argument("--max-cola", type=int, default=None)
+    parser.add_argument("--corpus", default=os.path.join(tempfile.gettempdir(), "calificador-corpus"))
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--historial", default=os.path.join(RAIZ, "benchmarks", "historial_servicio.jsonl"))
+    args = parser.parse_args(argv)
+
+    documentos, esperados = cargar_corpus(os.path.join(args.corpus, f"{args.n}-{args.semilla}"), args.n, args.semilla)
+    inicio = time.perf_counter()
+    servidor = crear_servidor(puerto=0, procesos=args.procesos, max_cola=args.max_cola)
+    arranque = time.perf_counter() - inicio
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    url = "http://%s:%d" % servidor.server_address[:2]
+    print(f"Servicio en {url} con {args.procesos} procesos (arranque {arranque:.1f} s)", file=sys.stderr)
+
+    corrida = {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": version_codigo(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "procesos": args.procesos,
+        "arranque_s": round(arranque, 2),
+        "resultados": {},
+    }
+    try:
+        for clientes in args.clientes:
+            print(f"Midiendo con {clientes} clientes...", file=sys.stderr)
+            corrida["resultados"][str(clientes)] = medir_ronda(url, documentos, esperados, clientes)
+        corrida["metricas"] = metricas(url)
+    finally:
+        servidor.shutdown()
+        cerrar_servidor(servidor)
+        shutil.rmtree(DIRECTORIO_TEMPORAL, ignore_errors=True)
+
+    anterior = ultima_corrida(args.historial)
+    imprimir(corrida, anterior)
+    with open(args.historial, "a", encoding="utf-8") as f:
+        f.write(json.dumps(corrida, ensure_ascii=False) + "\n")
+
+if __name__ == "__main__":
+    main()
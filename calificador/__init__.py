@@ -0,0 +1 @@
+"""Lógica de calificación del Sistema de Retroalimentación, sin dependencias de Streamlit."""
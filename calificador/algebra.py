@@ -0,0 +1,226 @@
+"""
+Álgebra de conjuntos con máscaras de bits.
+
+Un conjunto de números naturales se representa como un entero en el que el bit n
+está encendido si n pertenece al conjunto: la unión es |, la intersección &, la
+diferencia & ~ y el complemento U & ~. Así se pueden calcular las respuestas de
+miles de variantes (distintos U, A, B, C) en microsegundos.
+
+Precedencia: el complemento (′, ', ´) se aplica al conjunto o paréntesis que lo
+antecede, ∩ va antes que ∪ y –, y ∪ y – se evalúan de izquierda a derecha.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+# Conjuntos con números mayores se comparan como frozenset para no crear enteros gigantes
+# (una matrícula o un teléfono en el documento encendería el bit 5,512,345,678)
+MAXIMO_ELEMENTO_MASCARA = 1023
+
+EXPRESIONES_R3MD = ["B ∩ C", "C ′", "B ∪ C", "A ∩ C", "A ′", "B – A", "C – B ′"]
+
+SIMBOLOS = {
+    "∪": "∪", "Ս": "∪",
+    "∩": "∩", "Ո": "∩",
+    "′": "′", "'": "′", "´": "′",
+    "–": "–", "-": "–", "−": "–", "\\": "–",
+    "(": "(", ")": ")",
+}
+# Las variantes de un solo carácter se unifican con str.translate en una pasada
+TABLA_SIMBOLOS = str.maketrans({variante: simbolo for variante, simbolo in SIMBOLOS.items() if variante != simbolo})
+
+def mascara(numeros):
+    resultado = 0
+    for n in numeros:
+        resultado |= 1 << int(n)
+    return resultado
+
+def conjunto_a_mascara(numeros):
+    """
+    Representación comparable de un conjunto leído de un documento: máscara, o
+    frozenset si algún número rebasa MAXIMO_ELEMENTO_MASCARA. Dos conjuntos iguales
+    siempre reciben la misma representación.
+    """
+    numeros = [int(n) for n in numeros]
+    if any(n > MAXIMO_ELEMENTO_MASCARA for n in numeros):
+        return frozenset(numeros)
+    return mascara(numeros)
+
+def mascara_a_lista(conjunto):
+    """Elementos de la máscara (o frozenset) en orden ascendente"""
+    if isinstance(conjunto, frozenset):
+        return sorted(conjunto)
+    elementos = []
+    n = 0
+    while conjunto:
+        if conjunto & 1:
+            elementos.append(n)
+        conjunto >>= 1
+        n += 1
+    return elementos
+
+def formatear_conjunto(conjunto):
+    return "{" + ",".join(str(n) for n in mascara_a_lista(conjunto)) + "}"
+
+def _tokenizar(expresion):
+    """
+    Una sola pasada: unifica los símbolos (str.translate y NFKC), descarta espacios y
+    convierte los nombres de conjunto a mayúsculas; "--" o "- -" cuentan como una diferencia.
+    """
+    texto = unicodedata.normalize("NFKC", expresion.translate(TABLA_SIMBOLOS)).translate(TABLA_SIMBOLOS)
+    tokens = []
+    for caracter in texto:
+        if caracter.isspace():
+            continue
+        if caracter in SIMBOLOS:
+            simbolo = SIMBOLOS[caracter]
+            if simbolo == "–" and tokens and tokens[-1] == "–":
+                continue
+            tokens.append(simbolo)
+        elif caracter.isalpha():
+            tokens.append(caracter.upper())
+        else:
+            raise ValueError(f"Símbolo no reconocido en '{expresion}': {caracter}")
+    return tokens
+
+def _analizar(expresion):
+    """
+    Árbol de la expresión como tuplas: ("conjunto", "A"), ("′", x), ("∩", x, y),
+    ("∪", x, y) o ("–", x, y).
+    """
+    tokens = _tokenizar(expresion)
+    posicion = 0
+
+    def siguiente():
+        return tokens[posicion] if posicion < len(tokens) else None
+
+    def consumir(esperado=None):
+        nonlocal posicion
+        token = siguiente()
+        if token is None or (esperado and token != esperado):
+            raise ValueError(f"Expresión incompleta o mal formada: '{expresion}'")
+        posicion += 1
+        return token
+
+    def primario():
+        token = consumir()
+        if token == "(":
+            nodo = union()
+            consumir(")")
+        elif token.isalpha():
+            nodo = ("conjunto", token)
+        else:
+            raise ValueError(f"Se esperaba un conjunto en '{expresion}'")
+        while siguiente() == "′":
+            consumir()
+            nodo = ("′", nodo)
+        return nodo
+
+    def interseccion():
+        nodo = primario()
+        while siguiente() == "∩":
+            consumir()
+            nodo = ("∩", nodo, primario())
+        return nodo
+
+    def union():
+        nodo = interseccion()
+        while siguiente() in ("∪", "–"):
+            operador = consumir()
+            nodo = (operador, nodo, interseccion())
+        return nodo
+
+    arbol = union()
+    if posicion != len(tokens):
+        raise ValueError(f"Sobran símbolos en '{expresion}'")
+    return arbol
+
+def _compilar(nodo):
+    tipo = nodo[0]
+    if tipo == "conjunto":
+        return lambda conjuntos, universo, nombre=nodo[1]: conjuntos[nombre]
+    if tipo == "′":
+        x = _compilar(nodo[1])
+        return lambda conjuntos, universo: universo & ~x(conjuntos, universo)
+    x, y = _compilar(nodo[1]), _compilar(nodo[2])
+    if tipo == "∩":
+        return lambda conjuntos, universo: x(conjuntos, universo) & y(conjuntos, universo)
+    if tipo == "∪":
+        return lambda conjuntos, universo: x(conjuntos, universo) | y(conjuntos, universo)
+    return lambda conjuntos, universo: x(conjuntos, universo) & ~y(conjuntos, universo)
+
+@lru_cache(maxsize=256)
+def compilar_expresion(expresion):
+    """
+    Convierte la expresión en una función f(conjuntos, universo) -> máscara.
+    Se compila una sola vez y se reutiliza para todas las variantes.
+    """
+    return _compilar(_analizar(expresion))
+
+def _canonizar(nodo):
+    tipo = nodo[0]
+    if tipo == "conjunto":
+        return nodo[1]
+    if tipo == "′":
+        return f"′({_canonizar(nodo[1])})"
+    if tipo == "–":
+        return f"–({_canonizar(nodo[1])},{_canonizar(nodo[2])})"
+    # ∪ e ∩ son asociativas y conmutativas: se aplanan y se ordenan sus operandos
+    operandos = []
+    pendientes = [nodo]
+    while pendientes:
+        actual = pendientes.pop()
+        if actual[0] == tipo:
+            pendientes.extend(actual[1:])
+        else:
+            operandos.append(_canonizar(actual))
+    return f"{tipo}({','.join(sorted(operandos))})"
+
+@lru_cache(maxsize=4096)
+def forma_canonica(expresion):
+    """
+    Forma comparable (y hasheable) de una expresión: "B ∩ C", "C Ո B" y "(b∩c)" dan
+    "∩(B,C)". ∪ e ∩ no dependen del orden; – y ′ sí. None si no se puede interpretar.
+    """
+    try:
+        return _canonizar(_analizar(expresion))
+    except ValueError:
+        return None
+
+def evaluar(expresion, conjuntos, universo=None):
+    """
+    Evalúa la expresión con los conjuntos dados ({"A": máscara, ...}).
+    El universo es conjuntos["U"] si no se indica.
+    """
+    universo = conjuntos["U"] if universo is None else universo
+    return compilar_expresion(expresion)(conjuntos, universo)
+
+def parsear_definiciones(texto):
+    """
+    Lee definiciones como "U = {1,...,14}; A = {2,4,6}" (separadas por ';' o saltos
+    de línea) y devuelve {"U": máscara, "A": máscara, ...}.
+    Acepta rangos con "..." o "..": {1,...,14}.
+    """
+    conjuntos = {}
+    for definicion in re.split(r"[;\n]", texto):
+        if not definicion.strip():
+            continue
+        nombre, _, contenido = definicion.partition("=")
+        nombre = nombre.strip().upper()
+        if not nombre.isalpha() or not contenido.strip():
+            raise ValueError(f"Definición inválida: '{definicion.strip()}'")
+        numeros = []
+        for parte in re.findall(r"\d+\s*,\s*\.{2,3}\s*,?\s*\d+|\d+\s*\.{2,3}\s*\d+|\d+", contenido):
+            extremos = re.findall(r"\d+", parte)
+            if len(extremos) == 2:
+                numeros.extend(range(int(extremos[0]), int(extremos[1]) + 1))
+            else:
+                numeros.append(int(extremos[0]))
+        conjuntos[nombre] = mascara(numeros)
+    if "U" not in conjuntos:
+        raise ValueError("Falta definir el universo U")
+    return conjuntos
+
+def generar_clave(conjuntos, expresiones=EXPRESIONES_R3MD):
+    """Respuestas esperadas en el formato que buscan las funciones de R3MD ("B ∩ C = {1,2,13}")"""
+    return [f"{expresion} = {formatear_conjunto(evaluar(expresion, conjuntos))}" for expresion in expresiones]
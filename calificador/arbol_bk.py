@@ -0,0 +1,67 @@
+"""
+Árbol BK para buscar cadenas parecidas por distancia de edición (Levenshtein).
+
+Cada hijo cuelga de su padre según su distancia a él. Por la desigualdad del triángulo,
+una cadena a distancia d del nodo solo puede tener vecinos dentro del radio r entre los
+hijos con distancia d - r a d + r, así que una búsqueda con radio pequeño compara
+contra unos cuantos nodos en lugar de contra todas las cadenas.
+"""
+
+def distancia_edicion(a, b):
+    """Inserciones, borrados y sustituciones mínimas para convertir a en b"""
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    anterior = list(range(len(b) + 1))
+    for i, caracter_a in enumerate(a, start=1):
+        actual = [i]
+        for j, caracter_b in enumerate(b, start=1):
+            actual.append(min(anterior[j] + 1, actual[j - 1] + 1, anterior[j - 1] + (caracter_a != caracter_b)))
+        anterior = actual
+    return anterior[-1]
+
+class ArbolBK:
+    """Conjunto de cadenas con búsqueda por radio; los nodos son (cadena, {distancia: hijo})"""
+
+    def __init__(self, cadenas=(), distancia=distancia_edicion):
+        self._distancia = distancia
+        self._raiz = None
+        self._tamano = 0
+        for cadena in cadenas:
+            self.agregar(cadena)
+
+    def __len__(self):
+        return self._tamano
+
+    def agregar(self, cadena):
+        """Agrega la cadena; devuelve False si ya estaba"""
+        if self._raiz is None:
+            self._raiz = (cadena, {})
+            self._tamano = 1
+            return True
+        nodo = self._raiz
+        while True:
+            distancia = self._distancia(cadena, nodo[0])
+            if distancia == 0:
+                return False
+            hijo = nodo[1].get(distancia)
+            if hijo is None:
+                nodo[1][distancia] = (cadena, {})
+                self._tamano += 1
+                return True
+            nodo = hijo
+
+    def buscar(self, cadena, radio):
+        """[(distancia, cadena), ...] a lo más a radio de distancia, de la más cercana a la más lejana"""
+        encontradas = []
+        pendientes = [self._raiz] if self._raiz is not None else []
+        while pendientes:
+            valor, hijos = pendientes.pop()
+            distancia = self._distancia(cadena, valor)
+            if distancia <= radio:
+                encontradas.append((distancia, valor))
+            for distancia_hijo, hijo in hijos.items():
+                if distancia - radio <= distancia_hijo <= distancia + radio:
+                    pendientes.append(hijo)
+        return sorted(encontradas)
@@ -0,0 +1,139 @@
+"""Caché en disco del texto extraído de las entregas, indexada por el contenido del archivo."""
+import hashlib
+import os
+import tempfile
+
+from calificador.medicion import etapa
+from calificador.r3md import VERSION_EXTRACTOR, iterar_paginas, leer_paginas
+
+DIRECTORIO_CACHE = os.environ.get(
+    "CALIFICADOR_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "calificador", "texto")
+)
+TAMANO_MAXIMO_CACHE = int(os.environ.get("CALIFICADOR_CACHE_MB", "256")) * 1024 * 1024
+
+SUFIJOS_CACHE = (".txt", ".firma")
+
+class CacheTexto:
+    """
+    Guarda un archivo .txt por entrega, nombrado con el SHA-256 de sus bytes más la
+    versión del extractor; otros datos derivados del mismo archivo (como las firmas
+    de similitud) se guardan junto a él con su propio sufijo. La fecha de modificación
+    se actualiza en cada acierto y, al rebasar el tamaño máximo, se borran primero las
+    entradas menos usadas (LRU).
+    Si el directorio no se puede escribir, la caché simplemente no guarda nada.
+    """
+
+    def __init__(self, directorio=DIRECTORIO_CACHE, tamano_maximo=TAMANO_MAXIMO_CACHE):
+        self.directorio = directorio
+        self.tamano_maximo = tamano_maximo
+
+    def clave(self, datos, extension):
+        h = hashlib.sha256()
+        h.update(f"{VERSION_EXTRACTOR}:{extension.lower()}:".encode())
+        h.update(datos)
+        return h.hexdigest()
+
+    def _ruta(self, clave, sufijo=".txt"):
+        return os.path.join(self.directorio, f"{clave}{sufijo}")
+
+    def obtener_bytes(self, clave, sufijo):
+        ruta = self._ruta(clave, sufijo)
+        try:
+            with open(ruta, "rb") as f:
+                datos = f.read()
+            os.utime(ruta)
+            return datos
+        except OSError:
+            return None
+
+    def guardar_bytes(self, clave, sufijo, datos):
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            # Escritura atómica: otros procesos del pool nunca ven un archivo a medias
+            fd, temporal = tempfile.mkstemp(dir=self.directorio, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(datos)
+            os.replace(temporal, self._ruta(clave, sufijo))
+            self.recortar()
+        except OSError:
+            pass
+
+    def obtener(self, clave):
+        datos = self.obtener_bytes(clave, ".txt")
+        return None if datos is None else datos.decode("utf-8")
+
+    def guardar(self, clave, texto):
+        self.guardar_bytes(clave, ".txt", texto.encode("utf-8"))
+
+    def recortar(self):
+        """Elimina las entradas usadas hace más tiempo hasta quedar bajo el tamaño máximo"""
+        entradas = []
+        total = 0
+        with os.scandir(self.directorio) as it:
+            for entrada in it:
+                if not entrada.name.endswith(SUFIJOS_CACHE):
+                    continue
+                try:
+                    info = entrada.stat()
+                except FileNotFoundError:
+                    continue
+                entradas.append((info.st_mtime, info.st_size, entrada.path))
+                total += info.st_size
+
+        if total <= self.tamano_maximo:
+            return
+        for _, tamano, ruta in sorted(entradas):
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass
+            total -= tamano
+            if total <= self.tamano_maximo:
+                break
+
+cache_texto = CacheTexto()
+
+def extraer_texto_cacheado(nombre_archivo, datos, cache=None):
+    """
+    Igual que extraer_texto, pero reutiliza el resultado de entregas idénticas ya procesadas.
+    Devuelve (texto, aviso); el aviso explica por qué un PDF se leyó solo en parte (ver
+    motores_pdf.LIMITES_PDF) y ese texto no se guarda en la caché.
+    """
+    cache = cache or cache_texto
+    clave = cache.clave(datos, os.path.splitext(nombre_archivo)[1])
+    texto = cache.obtener(clave)
+    if texto is not None:
+        return texto, ""
+    paginas = iterar_paginas(nombre_archivo, datos)
+    texto = "\n".join(paginas).strip()
+    aviso = getattr(paginas, "aviso", "")
+    if not aviso:
+        cache.guardar(clave, texto)
+    return texto, aviso
+
+def leer_entrega(nombre_archivo, datos, cadenas_busqueda, cache=None):
+    """
+    Texto e índice de ecuaciones de una entrega. Si no está en caché se extrae página
+    por página y la lectura se detiene en cuanto aparecen todas las expresiones
+    esperadas; solo las lecturas completas se guardan en la caché.
+    datos son los bytes de la entrega o un mmap (ver temporales.abrir_datos).
+    Devuelve (texto, índice, si se leyó el documento completo, aviso si un límite de
+    motores_pdf.LIMITES_PDF cortó la lectura).
+    """
+    cache = cache or cache_texto
+    with etapa("leer_cache"):
+        clave = cache.clave(datos, os.path.splitext(nombre_archivo)[1])
+        texto = cache.obtener(clave)
+    if texto is not None:
+        texto, indice, _ = leer_paginas([texto], cadenas_busqueda)
+        return texto, indice, True, ""
+    
+    paginas = iterar_paginas(nombre_archivo, datos)
+    texto, indice, completo = leer_paginas(paginas, cadenas_busqueda)
+    aviso = getattr(paginas, "aviso", "")
+    if aviso:
+        completo = False
+    elif completo:
+        cache.guardar(clave, texto)
+    return texto, indice, completo, aviso
@@ -0,0 +1,94 @@
+"""API de calificación R3MD: extraer → normalizar → buscar → redactar retroalimentación."""
+from dataclasses import dataclass, field
+
+from calificador.cache import leer_entrega
+from calificador.medicion import etapa
+from calificador.r3md import (
+    EXPRESIONES_FIJAS,
+    LETRAS,
+    determinar_videos_necesarios,
+    evaluar_expresiones,
+    extraer_nombre,
+    generar_mensaje,
+    normalizar_texto,
+)
+from calificador.temporales import abrir_datos
+
+@dataclass
+class ResultadoR3MD:
+    archivo: str
+    nombre: str
+    cadenas_busqueda: list
+    coincidencias: list = field(default_factory=list)
+    no_encontradas: list = field(default_factory=list)
+    indices_incorrectos: list = field(default_factory=list)
+    videos: list = field(default_factory=list)
+    mensaje: str = ""
+    texto: str = ""
+    # False cuando la lectura se detuvo antes del final porque ya estaban todas las respuestas
+    completo: bool = True
+    # Por qué se dejaron páginas sin leer (límite de páginas por documento); vacío si no pasó
+    aviso: str = ""
+    # Incisos aceptados en el modo tolerante, con la línea que escribió el alumno
+    aproximadas: dict = field(default_factory=dict)
+
+    @property
+    def todo_correcto(self):
+        return not self.indices_incorrectos
+
+def calificar_texto(nombre_archivo, texto_completo, cadenas_busqueda=EXPRESIONES_FIJAS, indice=None, completo=True,
+                    aviso="", tolerancia=0):
+    """
+    Califica un texto ya extraído (por ejemplo, el que guarda el registro de calificaciones).
+    Con tolerancia se aceptan expresiones con esas ediciones de diferencia (ver
+    r3md.evaluar_expresiones).
+    """
+    with etapa("normalizar"):
+        texto_completo = normalizar_texto(texto_completo)
+    nombre = extraer_nombre(texto_completo)
+
+    with etapa("evaluar_expresiones"):
+        coincidencias, no_encontradas, indices_incorrectos, aproximadas = evaluar_expresiones(
+            texto_completo, cadenas_busqueda, indice, tolerancia
+        )
+    return ResultadoR3MD(
+        archivo=nombre_archivo,
+        nombre=nombre,
+        cadenas_busqueda=list(cadenas_busqueda),
+        coincidencias=coincidencias,
+        no_encontradas=no_encontradas,
+        indices_incorrectos=indices_incorrectos,
+        videos=determinar_videos_necesarios(indices_incorrectos) if indices_incorrectos else [],
+        # extraer_nombre solo da el primer nombre (o "Alumno"), así que se siembra también
+        # con el archivo para que dos Anas no reciban siempre el mismo encabezado
+        mensaje=generar_mensaje(nombre, cadenas_busqueda, coincidencias, indices_incorrectos,
+                                semilla=f"{nombre_archivo}:{nombre}"),
+        texto=texto_completo,
+        completo=completo,
+        aviso=aviso,
+        aproximadas=aproximadas,
+    )
+
+def calificar_r3md(nombre_archivo, datos, cadenas_busqueda=EXPRESIONES_FIJAS, tolerancia=0):
+    """Califica una entrega (.pdf o .docx) a partir de sus bytes o de un temporales.ArchivoEnDisco"""
+    with etapa("leer_entrega", archivo=nombre_archivo), abrir_datos(datos) as contenido:
+        texto_completo, indice, completo, aviso = leer_entrega(nombre_archivo, contenido, cadenas_busqueda)
+    return calificar_texto(nombre_archivo, texto_completo, cadenas_busqueda, indice, completo, aviso, tolerancia)
+
+def armar_fila(archivo, alumno, cadenas_busqueda, indices_incorrectos, mensaje, error=""):
+    """
+    Renglón de la tabla de resultados por lote: totales, un booleano por inciso y el
+    mensaje. Una entrega truncada lleva su aviso en Error para que se revise a mano.
+    """
+    fila = {
+        "Archivo": archivo,
+        "Alumno": alumno,
+        "Correctas": len(cadenas_busqueda) - len(indices_incorrectos),
+        "Total": len(cadenas_busqueda),
+        "Incorrectos": ", ".join(f"{LETRAS[i]})" for i in indices_incorrectos),
+        "Error": error,
+    }
+    for i in range(len(cadenas_busqueda)):
+        fila[f"{LETRAS[i]})"] = i not in indices_incorrectos
+    fila["Mensaje"] = mensaje
+    return fila
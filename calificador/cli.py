@@ -0,0 +1,238 @@
+"""
+Línea de comandos para calificar sin abrir la interfaz de Streamlit.
+
+    python -m calificador r3md ENTREGAS/ -o resultados.xlsx [--clave clave.xlsx --columna Respuestas]
+    python -m calificador r3md ENTREGAS/ --conjuntos "U={1,...,14}; A={2,4,6}; B={1,2}; C={3}"
+    python -m calificador r3md ENTREGAS/ -o resultados.xlsx --registro [calificaciones.sqlite3]
+    python -m calificador r3md ENTREGAS/ -o resultados.xlsx --tolerancia [2]
+    python -m calificador r3md ENTREGAS/ -o resultados.xlsx --similares similares.csv
+    python -m calificador r3md ENTREGAS/ -o resultados.xlsx --retro retro_r3md.zip [--formato-retro txt]
+    python -m calificador r3md ENTREGAS/ -o resultados.xlsx --memoria-acotada [--max-paginas 60 --max-mb 50]
+    python -m calificador r4md calificaciones.xlsx -o mensajes_r4.xlsx [--retro retro_r4md.zip]
+    python -m calificador r4md calificaciones.csv -o mensajes_r4.csv [--filas-por-bloque 5000]
+    python -m calificador plantillas --importar plantillas.csv
+    python -m calificador plantillas --buscar "hasse transitivas" [--etiqueta corregir]
+    python -m calificador servicio [--puerto 8765 --procesos 2 --max-cola 8]
+"""
+import argparse
+import csv
+import itertools
+import logging
+import os
+import signal
+import sys
+
+import pandas as pd
+
+from calificador import medicion
+from calificador.algebra import EXPRESIONES_R3MD, generar_clave, parsear_definiciones
+from calificador.exportar import EscritorTabla, escribir_xlsx
+from calificador.hojas import FILAS_POR_BLOQUE
+from calificador.lote import EXTENSIONES_ENTREGA, calificar_lote, expandir_entregas
+from calificador.motores_pdf import configurar_limites
+from calificador.plantillas import banco_plantillas
+from calificador.r3md import EXPRESIONES_FIJAS, TOLERANCIA_EXPRESIONES
+from calificador.r4md import ExportacionCalificaciones, iterar_mensajes_r4
+from calificador.registro import RUTA_REGISTRO, RegistroCalificaciones
+from calificador.retroalimentacion import FORMATOS_RETRO, documentos_r3md, documentos_r4, escribir_zip_retro
+from calificador.servicio import PUERTO, cerrar_servidor, crear_servidor
+from calificador.similitud import UMBRAL_SIMILITUD, buscar_similares, tabla_similares
+from calificador.temporales import MEMORIA_ACOTADA, ArchivoEnDisco, borrar_temporales
+
+def leer_carpeta(carpeta, en_disco=False):
+    """
+    Lee las entregas (.docx, .pdf o .zip) de una carpeta y sus subcarpetas. Con en_disco
+    los archivos no se cargan en memoria: se procesan desde su ruta y los ZIP se
+    descomprimen a temporales (ver temporales.ArchivoEnDisco).
+    """
+    archivos = []
+    for raiz, _, nombres in os.walk(carpeta):
+        for nombre in sorted(nombres):
+            if nombre.lower().endswith(EXTENSIONES_ENTREGA + (".zip",)):
+                ruta = os.path.join(raiz, nombre)
+                relativa = os.path.relpath(ruta, carpeta).replace(os.sep, "/")
+                if en_disco:
+                    archivos.append((relativa, ArchivoEnDisco(ruta, os.path.getsize(ruta), temporal=False)))
+                    continue
+                with open(ruta, "rb") as f:
+                    archivos.append((relativa, f.read()))
+    return expandir_entregas(archivos, en_disco)
+
+def cargar_clave(ruta_excel, columna=None):
+    """Expresiones esperadas de una columna del Excel (la primera si no se indica)"""
+    df_cadenas = pd.read_excel(ruta_excel)
+    columna = columna or df_cadenas.columns[0]
+    return df_cadenas[columna].astype(str).str.strip().unique().tolist()
+
+def escribir_tabla(df, salida, hoja):
+    if salida.lower().endswith(".xlsx"):
+        escribir_xlsx(df, salida, hoja)
+    else:
+        df.to_csv(salida, index=False, encoding="utf-8-sig")
+
+def comando_r3md(args):
+    configurar_limites(args.max_paginas, args.max_mb)
+    if args.conjuntos:
+        expresiones = [e.strip() for e in args.expresiones.split(";")] if args.expresiones else EXPRESIONES_R3MD
+        cadenas_busqueda = generar_clave(parsear_definiciones(args.conjuntos), expresiones)
+    elif args.clave:
+        cadenas_busqueda = cargar_clave(args.clave, args.columna)
+    else:
+        cadenas_busqueda = EXPRESIONES_FIJAS
+    entregas = leer_carpeta(args.carpeta, args.memoria_acotada)
+    try:
+        return calificar_carpeta(args, entregas, cadenas_busqueda)
+    finally:
+        borrar_temporales(entregas)
+
+def calificar_carpeta(args, entregas, cadenas_busqueda):
+    if not entregas:
+        print(f"No se encontraron entregas .docx/.pdf en {args.carpeta}", file=sys.stderr)
+        return 1
+
+    def al_avanzar(hechos, total):
+        print(f"\rCalificadas {hechos} de {total} entregas", end="", file=sys.stderr)
+
+    registro = RegistroCalificaciones(args.registro) if args.registro else None
+    filas = calificar_lote(entregas, cadenas_busqueda, max_workers=args.procesos, al_avanzar=al_avanzar, registro=registro,
+                           tolerancia=args.tolerancia)
+    print(file=sys.stderr)
+    escribir_tabla(pd.DataFrame(filas), args.salida, "Resultados_R3")
+    con_error = sum(1 for fila in filas if fila["Error"])
+    print(f"{len(filas)} entregas calificadas ({con_error} con error o leídas solo en parte) → {args.salida}", file=sys.stderr)
+
+    if args.retro:
+        escritos = escribir_zip_retro(args.retro, documentos_r3md(filas), args.formato_retro)
+        print(f"{escritos} archivos de retroalimentación → {args.retro}", file=sys.stderr)
+
+    if args.similares:
+        grupos = buscar_similares(entregas, args.umbral, max_workers=args.procesos)
+        columnas = ["Grupo", "Archivo", "Entregas en el grupo", "Similitud máxima"]
+        escribir_tabla(pd.DataFrame(tabla_similares([ruta for ruta, _ in entregas], grupos), columns=columnas),
+                       args.similares, "Similares")
+        print(f"{len(grupos)} grupos de entregas casi idénticas → {args.similares}", file=sys.stderr)
+    return 0
+
+def comando_r4md(args):
+    exportacion = ExportacionCalificaciones(args.calificaciones)
+    if not exportacion.columna_objetivo or not exportacion.columna_nombre:
+        print("No se encontró la columna objetivo o la columna de nombres", file=sys.stderr)
+        return 1
+
+    def escribir_bloques(escritor):
+        for df_mensajes in iterar_mensajes_r4(exportacion, args.filas_por_bloque):
+            escritor.agregar(df_mensajes)
+            yield df_mensajes
+
+    # Los mensajes se escriben bloque por bloque mientras se lee la exportación; con --retro,
+    # cada bloque también se agrega al ZIP antes de leer el siguiente
+    with EscritorTabla(args.salida, ["Nombre", "Mensaje"], "Mensajes_R4") as escritor:
+        bloques = escribir_bloques(escritor)
+        if args.retro:
+            escribir_zip_retro(args.retro, itertools.chain.from_iterable(map(documentos_r4, bloques)), args.formato_retro)
+        else:
+            for _ in bloques:
+                pass
+    print(f"{escritor.renglones} mensajes → {args.salida}", file=sys.stderr)
+    if args.retro:
+        print(f"{escritor.renglones} archivos de retroalimentación → {args.retro}", file=sys.stderr)
+    return 0
+
+def comando_plantillas(args):
+    if args.importar:
+        # Columnas: titulo, texto, actividad y etiquetas (separadas por comas)
+        with open(args.importar, encoding="utf-8-sig", newline="") as f:
+            plantillas = [
+                (fila["titulo"], fila["texto"], fila["actividad"], (fila.get("etiquetas") or "").split(","))
+                for fila in csv.DictReader(f)
+            ]
+        print(f"{banco_plantillas.agregar_varias(plantillas)} plantillas importadas", file=sys.stderr)
+    if args.buscar is not None or not args.importar:
+        plantillas, total = banco_plantillas.buscar(args.buscar or "", args.etiqueta, args.actividad)
+        for plantilla in plantillas:
+            print(f"[{plantilla['id']}] {plantilla['titulo']} — {plantilla['actividad']} · {', '.join(plantilla['etiquetas'])}")
+        print(f"{len(plantillas)} de {total} plantillas", file=sys.stderr)
+    return 0
+
+def comando_servicio(args):
+    configurar_limites(args.max_paginas, args.max_mb)
+    # Un renglón por solicitud atendida en stderr
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    print(f"Lanzando {args.procesos} procesos...", file=sys.stderr)
+    servidor = crear_servidor(args.host, args.puerto, procesos=args.procesos, max_cola=args.max_cola,
+                              registro=RegistroCalificaciones(args.registro), timeout=args.timeout)
+    host, puerto = servidor.server_address[:2]
+    print(f"Servicio de calificación en http://{host}:{puerto} (Ctrl+C para detenerlo)", file=sys.stderr)
+    # SIGTERM (systemd, docker stop) también detiene el pool en lugar de dejar procesos huérfanos
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cerrar_servidor(servidor)
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m calificador", description="Sistema de Retroalimentación sin interfaz")
+    parser.add_argument("--tiempos", action="store_true", help="Emite en stderr el tiempo de cada etapa como JSON")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    r3md = subparsers.add_parser("r3md", help="Califica una carpeta de entregas de conjuntos")
+    r3md.add_argument("carpeta", help="Carpeta con archivos .docx/.pdf o ZIP descargados del LMS")
+    r3md.add_argument("-o", "--salida", default="resultados_r3md.csv", help="Archivo .csv o .xlsx de resultados")
+    r3md.add_argument("--clave", help="Excel con las expresiones esperadas (por defecto, las predefinidas)")
+    r3md.add_argument("--columna", help="Columna del Excel con las expresiones")
+    r3md.add_argument("--conjuntos", help="Definiciones de U, A, B, C para calcular las respuestas esperadas")
+    r3md.add_argument("--expresiones", help="Expresiones separadas por ';' a calcular con --conjuntos")
+    r3md.add_argument("--tolerancia", type=int, nargs="?", const=TOLERANCIA_EXPRESIONES, default=0,
+                      help="Acepta expresiones con hasta N caracteres de diferencia si el conjunto es el esperado "
+                           f"(sin N, {TOLERANCIA_EXPRESIONES})")
+    r3md.add_argument("--procesos", type=int, default=None, help="Procesos en paralelo (por defecto, uno por núcleo)")
+    r3md.add_argument("--registro", nargs="?", const=RUTA_REGISTRO,
+                      help="Guarda las calificaciones en el registro SQLite y reutiliza las ya hechas con esta clave")
+    r3md.add_argument("--similares", help="Archivo .csv o .xlsx con los grupos de entregas casi idénticas")
+    r3md.add_argument("--umbral", type=float, default=UMBRAL_SIMILITUD, help="Similitud mínima para --similares (0 a 1)")
+    r3md.add_argument("--retro", help="ZIP con un archivo de retroalimentación por alumno")
+    r3md.add_argument("--formato-retro", choices=FORMATOS_RETRO, default="docx", help="Formato de los archivos de --retro")
+    r3md.add_argument("--memoria-acotada", action="store_true", default=MEMORIA_ACOTADA,
+                      help="Procesa las entregas desde disco (mmap) en lugar de cargarlas en memoria")
+    r3md.add_argument("--max-paginas", type=int, help="Páginas que se leen como máximo de cada PDF (0 = sin límite)")
+    r3md.add_argument("--max-mb", type=int, help="Tamaño máximo de cada PDF en MB (0 = sin límite)")
+    r3md.set_defaults(funcion=comando_r3md)
+
+    r4md = subparsers.add_parser("r4md", help="Genera los mensajes de R4MD a partir de las calificaciones exportadas")
+    r4md.add_argument("calificaciones", help="Calificaciones exportadas del LMS (.xlsx o .csv)")
+    r4md.add_argument("-o", "--salida", default="mensajes_r4.xlsx", help="Archivo .csv, .xlsx o .txt de salida")
+    r4md.add_argument("--filas-por-bloque", type=int, default=FILAS_POR_BLOQUE,
+                      help="Renglones de la exportación que se leen a la vez")
+    r4md.add_argument("--retro", help="ZIP con un archivo de retroalimentación por alumno")
+    r4md.add_argument("--formato-retro", choices=FORMATOS_RETRO, default="docx", help="Formato de los archivos de --retro")
+    r4md.set_defaults(funcion=comando_r4md)
+
+    plantillas = subparsers.add_parser("plantillas", help="Importa o busca en el banco de plantillas de R7MD")
+    plantillas.add_argument("--importar", help="CSV con columnas titulo, texto, actividad y etiquetas")
+    plantillas.add_argument("--buscar", help="Palabras a buscar en título, texto y etiquetas")
+    plantillas.add_argument("--etiqueta", action="append", default=[], help="Solo plantillas con esta etiqueta (se puede repetir)")
+    plantillas.add_argument("--actividad", help="Solo plantillas de esta actividad")
+    plantillas.set_defaults(funcion=comando_plantillas)
+
+    servicio = subparsers.add_parser("servicio", help="Servicio HTTP local que califica entregas de R3MD")
+    servicio.add_argument("--host", default="127.0.0.1", help="Dirección en la que escucha (por defecto, solo local)")
+    servicio.add_argument("--puerto", type=int, default=PUERTO)
+    servicio.add_argument("--procesos", type=int, default=min(os.cpu_count() or 1, 4),
+                          help="Procesos que califican en paralelo (se lanzan al arrancar)")
+    servicio.add_argument("--max-cola", type=int, help="Entregas que esperan a un proceso libre antes de responder 503 "
+                                                       "(por defecto, 4 por proceso)")
+    servicio.add_argument("--timeout", type=float, default=120, help="Segundos máximos por entrega antes de responder 504")
+    servicio.add_argument("--registro", default=RUTA_REGISTRO, help="Registro SQLite con las versiones de la clave")
+    servicio.add_argument("--max-paginas", type=int, help="Páginas que se leen como máximo de cada PDF (0 = sin límite)")
+    servicio.add_argument("--max-mb", type=int, help="Tamaño máximo de cada entrega en MB (0 = sin límite)")
+    servicio.set_defaults(funcion=comando_servicio)
+
+    args = parser.parse_args(argv)
+    if args.tiempos:
+        medicion.activar_log()
+        # Los procesos del pool heredan la variable y también reportan sus etapas
+        os.environ["CALIFICADOR_LOG_TIEMPOS"] = "1"
+    return args.funcion(args)
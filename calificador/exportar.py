@@ -0,0 +1,91 @@
+"""Exportación de tablas de resultados a XLSX, CSV y TXT."""
+import hashlib
+import io
+import os
+
+import pandas as pd
+from openpyxl import Workbook
+
+from calificador.medicion import etapa
+
+def huella_tabla(df):
+    """Hash del contenido de la tabla; cambia si cambia cualquier celda o columna"""
+    h = hashlib.sha256("\x1f".join(map(str, df.columns)).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()
+
+@etapa("exportar_xlsx")
+def escribir_xlsx(df, destino, hoja="Hoja1"):
+    """
+    Escribe la tabla con un libro de solo escritura: openpyxl va volcando los
+    renglones a disco en lugar de mantener todas las celdas en memoria.
+    destino puede ser una ruta o un archivo abierto en modo binario.
+    """
+    libro = Workbook(write_only=True)
+    hoja_xlsx = libro.create_sheet(hoja)
+    hoja_xlsx.append([str(c) for c in df.columns])
+    for fila in df.itertuples(index=False, name=None):
+        hoja_xlsx.append([None if pd.isna(v) else v for v in fila])
+    libro.save(destino)
+
+def tabla_a_xlsx(df, hoja="Hoja1"):
+    salida = io.BytesIO()
+    escribir_xlsx(df, salida, hoja)
+    return salida.getvalue()
+
+@etapa("exportar_csv")
+def tabla_a_csv(df):
+    # utf-8-sig para que Excel reconozca los acentos al abrir el CSV
+    return df.to_csv(index=False).encode("utf-8-sig")
+
+@etapa("exportar_txt")
+def mensajes_a_txt(mensajes):
+    return "\n\n".join(mensajes).encode("utf-8")
+
+class EscritorTabla:
+    """
+    Escribe una tabla por partes en .xlsx, .csv o .txt (solo la columna Mensaje,
+    separada por renglones en blanco) según la extensión del destino, sin juntarla en
+    memoria: cada DataFrame que se agrega se vuelca al archivo y se descarta.
+    """
+
+    def __init__(self, destino, columnas, hoja="Hoja1"):
+        self.destino = destino
+        self.formato = os.path.splitext(destino)[1].lower()
+        self.renglones = 0
+        self._libro = None
+        if self.formato == ".xlsx":
+            self._libro = Workbook(write_only=True)
+            self._hoja = self._libro.create_sheet(hoja)
+            self._hoja.append([str(c) for c in columnas])
+        elif self.formato == ".txt":
+            self._archivo = open(destino, "w", encoding="utf-8")
+        else:
+            # utf-8-sig para que Excel reconozca los acentos al abrir el CSV
+            self._archivo = open(destino, "w", encoding="utf-8-sig", newline="")
+            pd.DataFrame(columns=columnas).to_csv(self._archivo, index=False)
+
+    def agregar(self, df):
+        if self.formato == ".xlsx":
+            for fila in df.itertuples(index=False, name=None):
+                self._hoja.append([None if pd.isna(v) else v for v in fila])
+        elif self.formato == ".txt":
+            for mensaje in df["Mensaje"]:
+                self._archivo.write(("\n\n" if self.renglones else "") + mensaje)
+                self.renglones += 1
+            return
+        else:
+            df.to_csv(self._archivo, index=False, header=False)
+        self.renglones += len(df)
+
+    def cerrar(self):
+        if self._libro is not None:
+            self._libro.save(self.destino)
+        else:
+            self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.cerrar()
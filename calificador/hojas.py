@@ -0,0 +1,236 @@
+"""
+Lectura por bloques de exportaciones del LMS en CSV o XLSX.
+
+Solo se leen las columnas pedidas y nunca se carga la hoja completa: el CSV se recorre
+con pandas en trozos y la hoja del XLSX (xl/worksheets/*.xml) se le da por partes a
+un XMLParser que arma cada renglón sin construir el árbol de la hoja, y de cada
+renglón se toman únicamente las celdas de esas columnas. La
+memoria depende del tamaño del bloque y no del archivo (salvo la tabla de textos
+compartidos del libro, que crece con los textos distintos, no con las celdas).
+"""
+import codecs
+import csv
+import os
+import posixpath
+import zipfile
+from contextlib import closing
+from xml.etree import ElementTree
+
+import pandas as pd
+
+FILAS_POR_BLOQUE = 5000
+BYTES_POR_LECTURA = 1 << 16
+
+_S = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_CELDA, _RENGLON, _VALOR, _TEXTO, _FONETICA = (_S + nombre for nombre in ("c", "row", "v", "t", "rPh"))
+
+def formato_tabla(nombre_archivo):
+    """'csv' o 'xlsx' según la extensión"""
+    extension = os.path.splitext(nombre_archivo or "")[1].lower()
+    if extension not in (".csv", ".xlsx"):
+        raise ValueError(f"Formato no soportado: '{extension}'. Usa un archivo .xlsx o .csv")
+    return extension[1:]
+
+def _rebobinar(archivo):
+    if hasattr(archivo, "seek"):
+        archivo.seek(0)
+    return archivo
+
+def _nombrar(encabezados):
+    # Igual que pandas: las columnas sin título se llaman "Unnamed: i"
+    return [str(c).strip() if c not in (None, "") else f"Unnamed: {i}" for i, c in enumerate(encabezados)]
+
+# --- CSV ---
+
+def _abrir_csv(archivo):
+    """Detecta codificación y separador con el primer bloque; devuelve (codificación, separador)"""
+    if hasattr(archivo, "read"):
+        muestra = _rebobinar(archivo).read(64 * 1024)
+        _rebobinar(archivo)
+    else:
+        with open(archivo, "rb") as f:
+            muestra = f.read(64 * 1024)
+    try:
+        # El bloque puede cortar un carácter de varios bytes al final
+        codecs.getincrementaldecoder("utf-8")().decode(muestra)
+        codificacion = "utf-8-sig"
+    except UnicodeDecodeError:
+        # CSV guardado desde Excel en Windows
+        codificacion = "cp1252"
+    texto = muestra.decode(codificacion, errors="ignore")
+    primera_linea = texto.splitlines()[0] if texto else ""
+    try:
+        separador = csv.Sniffer().sniff(primera_linea, delimiters=",;\t").delimiter
+    except csv.Error:
+        separador = ","
+    return codificacion, separador
+
+def _encabezados_originales_csv(archivo, codificacion, separador):
+    return pd.read_csv(_rebobinar(archivo), sep=separador, encoding=codificacion, nrows=0).columns
+
+def encabezados_csv(archivo):
+    codificacion, separador = _abrir_csv(archivo)
+    return _nombrar(_encabezados_originales_csv(archivo, codificacion, separador))
+
+def iterar_bloques_csv(archivo, columnas, filas_por_bloque=FILAS_POR_BLOQUE):
+    codificacion, separador = _abrir_csv(archivo)
+    # usecols necesita los títulos tal como vienen en el archivo ("Nombre " y no "Nombre")
+    originales = _encabezados_originales_csv(archivo, codificacion, separador)
+    por_nombre = dict(zip(_nombrar(originales), originales))
+    usecols = [por_nombre.get(c, c) for c in columnas]
+    lector = pd.read_csv(_rebobinar(archivo), sep=separador, encoding=codificacion, usecols=usecols,
+                         dtype=object, chunksize=filas_por_bloque)
+    with lector:
+        for bloque in lector:
+            yield bloque[usecols].set_axis(columnas, axis=1)
+
+# --- XLSX ---
+
+def _indice_columna(referencia):
+    """Índice (desde 0) de la columna de una referencia como AB12"""
+    numero = 0
+    for letra in referencia.rstrip("0123456789"):
+        numero = numero * 26 + ord(letra.upper()) - 64
+    return numero - 1
+
+def _ruta_primera_hoja(zf):
+    """La primera hoja del libro según workbook.xml (no siempre es sheet1.xml)"""
+    with zf.open("xl/workbook.xml") as xml:
+        hoja = ElementTree.parse(xml).find(f"{_S}sheets/{_S}sheet")
+    id_relacion = hoja.get(f"{_R}id") if hoja is not None else None
+    with zf.open("xl/_rels/workbook.xml.rels") as xml:
+        for relacion in ElementTree.parse(xml).getroot().iter(f"{_REL}Relationship"):
+            if relacion.get("Id") == id_relacion:
+                destino = relacion.get("Target")
+                return destino.lstrip("/") if destino.startswith("/") else posixpath.normpath(posixpath.join("xl", destino))
+    return "xl/worksheets/sheet1.xml"
+
+def _texto_enriquecido(elem):
+    # Los textos con formato vienen partidos en varios <r><t>; se omite la fonética (<rPh>)
+    return "".join(t.text or "" for r in [elem] + elem.findall(_S + "r") for t in r.findall(_S + "t"))
+
+def _textos_compartidos(zf):
+    textos = []
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return textos
+    with zf.open("xl/sharedStrings.xml") as xml:
+        for _, elem in ElementTree.iterparse(xml):
+            if elem.tag == _S + "si":
+                textos.append(_texto_enriquecido(elem))
+                elem.clear()
+    return textos
+
+class _LectorHoja:
+    """
+    Destino de XMLParser que arma {índice de columna: valor} por cada renglón de la hoja
+    sin construir su árbol: solo se junta el texto de <v> y de <t> (sin la fonética <rPh>)
+    de la celda que se está leyendo. Los renglones terminados se acumulan en `renglones`
+    hasta que quien alimenta el parser los recoge.
+    """
+
+    def __init__(self, textos):
+        self.textos = textos
+        self.renglones = []
+        self._celdas = {}
+        self._columna = -1
+        self._tipo = None
+        self._partes = []
+        self._leyendo = False
+        self._fonetica = 0
+
+    def start(self, tag, atributos):
+        if tag == _CELDA:
+            # La referencia es opcional: sin ella la celda va después de la anterior
+            referencia = atributos.get("r")
+            self._columna = _indice_columna(referencia) if referencia else self._columna + 1
+            self._tipo = atributos.get("t")
+            self._partes = []
+        elif tag == _RENGLON:
+            self._celdas = {}
+            self._columna = -1
+        elif tag == _VALOR or (tag == _TEXTO and not self._fonetica):
+            self._leyendo = True
+        elif tag == _FONETICA:
+            self._fonetica += 1
+
+    def data(self, texto):
+        if self._leyendo:
+            self._partes.append(texto)
+
+    def end(self, tag):
+        if tag == _VALOR or tag == _TEXTO:
+            self._leyendo = False
+        elif tag == _CELDA:
+            valor = "".join(self._partes) if self._partes else None
+            if valor is not None and self._tipo == "s":
+                valor = self.textos[int(valor)]
+            self._celdas[self._columna] = valor
+        elif tag == _RENGLON:
+            self.renglones.append(self._celdas)
+        elif tag == _FONETICA:
+            self._fonetica -= 1
+
+    def close(self):
+        return None
+
+def _iterar_renglones(zf, ruta, textos):
+    """
+    {índice de columna: valor} por cada renglón de la hoja. La hoja se le da al parser
+    por lecturas de BYTES_POR_LECTURA, así que en memoria solo están los renglones de
+    la última lectura.
+    """
+    lector = _LectorHoja(textos)
+    parser = ElementTree.XMLParser(target=lector)
+    with zf.open(ruta) as xml:
+        while datos := xml.read(BYTES_POR_LECTURA):
+            parser.feed(datos)
+            renglones, lector.renglones = lector.renglones, []
+            yield from renglones
+    parser.close()
+    yield from lector.renglones
+
+def _nombrar_renglon(celdas):
+    return _nombrar([celdas.get(i) for i in range(max(celdas) + 1)] if celdas else [])
+
+def encabezados_xlsx(archivo):
+    with zipfile.ZipFile(_rebobinar(archivo)) as zf:
+        renglones = _iterar_renglones(zf, _ruta_primera_hoja(zf), _textos_compartidos(zf))
+        with closing(renglones):
+            encabezado = next(renglones, None)
+    return _nombrar_renglon(encabezado) if encabezado is not None else []
+
+def iterar_bloques_xlsx(archivo, columnas, filas_por_bloque=FILAS_POR_BLOQUE):
+    with zipfile.ZipFile(_rebobinar(archivo)) as zf:
+        renglones = _iterar_renglones(zf, _ruta_primera_hoja(zf), _textos_compartidos(zf))
+        with closing(renglones):
+            # El primer renglón de la hoja es el encabezado, aunque tenga celdas vacías
+            encabezados = _nombrar_renglon(next(renglones, None) or {})
+            indices = {encabezados.index(c): c for c in columnas}
+            filas = []
+            for celdas in renglones:
+                # Como en el CSV: un renglón sin celdas equivale a una línea en blanco y se
+                # omite, pero uno con datos en otras columnas se conserva con valores vacíos
+                if not celdas:
+                    continue
+                filas.append({c: celdas.get(i) for i, c in indices.items()})
+                if len(filas) == filas_por_bloque:
+                    yield pd.DataFrame(filas, columns=columnas, dtype=object)
+                    filas = []
+            if filas:
+                yield pd.DataFrame(filas, columns=columnas, dtype=object)
+
+# --- Ambos formatos ---
+
+def leer_encabezados(archivo, nombre_archivo):
+    """Nombres de columna sin leer ningún renglón de datos"""
+    if formato_tabla(nombre_archivo) == "csv":
+        return encabezados_csv(archivo)
+    return encabezados_xlsx(archivo)
+
+def iterar_bloques(archivo, nombre_archivo, columnas, filas_por_bloque=FILAS_POR_BLOQUE):
+    """DataFrames de a lo más filas_por_bloque renglones con solo las columnas pedidas (como texto)"""
+    if formato_tabla(nombre_archivo) == "csv":
+        return iterar_bloques_csv(archivo, columnas, filas_por_bloque)
+    return iterar_bloques_xlsx(archivo, columnas, filas_por_bloque)
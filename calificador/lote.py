@@ -0,0 +1,200 @@
+"""R3MD - Calificación por lote de varias entregas (archivos sueltos o ZIP del LMS)."""
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from calificador.cache import cache_texto, extraer_texto_cacheado
+from calificador.calificacion import armar_fila, calificar_r3md, calificar_texto
+from calificador.motores_pdf import estadisticas_motores
+from calificador.registro import RegistroCalificaciones
+from calificador.temporales import abrir_datos, como_archivo, guardar_temporal
+
+EXTENSIONES_ENTREGA = (".docx", ".pdf")
+
+def expandir_entregas(archivos, en_disco=False):
+    """
+    Convierte una lista de (nombre, bytes) en entregas individuales, abriendo los ZIP
+    exportados por el LMS y descartando archivos que no sean .docx/.pdf.
+    Con en_disco, cada entrega de un ZIP se descomprime a un archivo temporal
+    (temporales.ArchivoEnDisco) en lugar de quedar en memoria; los datos también
+    pueden ser ya un ArchivoEnDisco.
+    """
+    entregas = []
+    for nombre, datos in archivos:
+        if nombre.lower().endswith(".zip"):
+            with abrir_datos(datos) as contenido, como_archivo(contenido) as archivo, zipfile.ZipFile(archivo) as zf:
+                for info in zf.infolist():
+                    ruta = info.filename
+                    if info.is_dir() or ruta.startswith("__MACOSX/") or os.path.basename(ruta).startswith("~$"):
+                        continue
+                    if not ruta.lower().endswith(EXTENSIONES_ENTREGA):
+                        continue
+                    if en_disco:
+                        with zf.open(info) as miembro:
+                            entregas.append((ruta, guardar_temporal(miembro, os.path.splitext(ruta)[1])))
+                    else:
+                        entregas.append((ruta, zf.read(info)))
+        elif nombre.lower().endswith(EXTENSIONES_ENTREGA):
+            entregas.append((nombre, datos))
+    return entregas
+
+def nombre_desde_ruta(ruta):
+    """
+    Obtiene el nombre del alumno de la carpeta que genera Moodle al descargar
+    entregas ("Nombre Apellido_12345_assignsubmission_file_/archivo.pdf")
+    """
+    carpeta = os.path.dirname(ruta).split("/")[-1]
+    if "_assignsubmission" in carpeta:
+        return carpeta.split("_", 1)[0].strip()
+    return ""
+
+def _fila_error(ruta, alumno, cadenas_busqueda, error):
+    return {"Archivo": ruta, "Alumno": alumno, "Correctas": 0, "Total": len(cadenas_busqueda),
+            "Incorrectos": "", "Error": str(error)}
+
+def calificar_entrega(ruta, datos, cadenas_busqueda, tolerancia=0):
+    """Extrae y califica una entrega; se ejecuta dentro de un proceso del pool"""
+    alumno = nombre_desde_ruta(ruta)
+    try:
+        resultado = calificar_r3md(ruta, datos, cadenas_busqueda, tolerancia)
+    except Exception as e:
+        return _fila_error(ruta, alumno, cadenas_busqueda, e)
+    return armar_fila(ruta, alumno or resultado.nombre, cadenas_busqueda, resultado.indices_incorrectos, resultado.mensaje,
+                      resultado.aviso)
+
+def calificar_entrega_registrada(ruta, datos, cadenas_busqueda, ruta_registro, id_clave, tolerancia=0):
+    """
+    Como calificar_entrega, pero reutiliza el texto del registro si el archivo ya se
+    había extraído y guarda ahí el resultado. El documento se lee completo (sin
+    detenerse al encontrar las respuestas) para poder recalificarlo con otra clave.
+    """
+    registro = RegistroCalificaciones(ruta_registro)
+    alumno = nombre_desde_ruta(ruta)
+    aviso = ""
+    try:
+        with abrir_datos(datos) as contenido:
+            hash_archivo = cache_texto.clave(contenido, os.path.splitext(ruta)[1])
+            texto = registro.texto(hash_archivo)
+            if texto is None:
+                texto, aviso = extraer_texto_cacheado(ruta, contenido)
+        resultado = calificar_texto(ruta, texto, cadenas_busqueda, tolerancia=tolerancia)
+    except Exception as e:
+        return _fila_error(ruta, alumno, cadenas_busqueda, e)
+    alumno = alumno or resultado.nombre
+    # Un texto truncado no se registra: al recalificar pasaría por la entrega completa
+    if not aviso:
+        registro.guardar(ruta, alumno, hash_archivo, texto, id_clave, resultado)
+    return armar_fila(ruta, alumno, cadenas_busqueda, resultado.indices_incorrectos, resultado.mensaje, aviso)
+
+def _ejecutar_en_proceso(funcion, argumentos):
+    """Devuelve también las estadísticas de motores PDF que acumuló el proceso hijo"""
+    resultado = funcion(*argumentos)
+    return resultado, estadisticas_motores.vaciar()
+
+def ejecutar_lote(funcion, tareas, max_workers=None, al_avanzar=None, al_terminar=None, cancelacion=None):
+    """
+    Ejecuta funcion(*argumentos) para cada tupla de tareas repartiéndolas en un pool
+    de procesos (con max_workers=1 se ejecutan en el mismo proceso, sin costo de
+    arranque). funcion debe estar definida a nivel de módulo para poder enviarse
+    a los procesos hijos.
+    al_avanzar(hechos, total) se llama cada vez que termina una tarea y
+    al_terminar(indice, resultado) recibe su resultado en cuanto está listo.
+    Si cancelacion (threading.Event) se activa, ya no se ejecutan más tareas y
+    las pendientes quedan en None.
+    Los resultados se devuelven en el mismo orden que las tareas.
+    """
+    total = len(tareas)
+    resultados = [None] * total
+    if not total:
+        return resultados
+
+    def cancelado():
+        return cancelacion is not None and cancelacion.is_set()
+
+    def terminar(indice, resultado, hechos):
+        resultados[indice] = resultado
+        if al_terminar:
+            al_terminar(indice, resultado)
+        if al_avanzar:
+            al_avanzar(hechos, total)
+
+    if max_workers == 1:
+        for i, argumentos in enumerate(tareas):
+            if cancelado():
+                break
+            terminar(i, funcion(*argumentos), i + 1)
+        return resultados
+
+    # "spawn" evita heredar los hilos del servidor de Streamlit en los procesos hijos
+    contexto = multiprocessing.get_context("spawn")
+    workers = min(max_workers or os.cpu_count() or 1, total)
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=contexto)
+    try:
+        futuros = {
+            executor.submit(_ejecutar_en_proceso, funcion, argumentos): i
+            for i, argumentos in enumerate(tareas)
+        }
+        pendientes = set(futuros)
+        hechos = 0
+        # Se espera en intervalos cortos para atender la cancelación aunque una tarea tarde
+        while pendientes and not cancelado():
+            listos, pendientes = wait(pendientes, timeout=0.5, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                resultado, estadisticas = futuro.result()
+                estadisticas_motores.combinar(estadisticas)
+                hechos += 1
+                terminar(futuros[futuro], resultado, hechos)
+    finally:
+        # Al cancelar no se espera a las tareas que ya se estaban ejecutando
+        executor.shutdown(wait=not cancelado(), cancel_futures=True)
+    return resultados
+
+def calificar_lote(entregas, cadenas_busqueda, max_workers=None, al_avanzar=None,
+                   al_calificar=None, cancelacion=None, registro=None, tolerancia=0):
+    """
+    Califica todas las entregas en paralelo (ver ejecutar_lote); al_calificar(indice, fila)
+    recibe cada renglón en cuanto está listo. Las entregas no calificadas por una
+    cancelación quedan en None. Los resultados siguen el orden de las entregas.
+    Con un RegistroCalificaciones, las entregas ya calificadas con esta clave (y esta
+    tolerancia) se toman del registro y solo se evalúan las demás, que quedan guardadas.
+    """
+    if registro is None:
+        tareas = [(ruta, datos, cadenas_busqueda, tolerancia) for ruta, datos in entregas]
+        return ejecutar_lote(calificar_entrega, tareas, max_workers=max_workers, al_avanzar=al_avanzar,
+                             al_terminar=al_calificar, cancelacion=cancelacion)
+
+    total = len(entregas)
+    resultados = [None] * total
+    id_clave = registro.registrar_clave(cadenas_busqueda, tolerancia)
+    pendientes = []
+    for i, (ruta, datos) in enumerate(entregas):
+        with abrir_datos(datos) as contenido:
+            hash_archivo = cache_texto.clave(contenido, os.path.splitext(ruta)[1])
+        resultados[i] = registro.buscar_fila(ruta, hash_archivo, id_clave, cadenas_busqueda)
+        if resultados[i] is None:
+            pendientes.append(i)
+
+    ya_calificadas = total - len(pendientes)
+    hechos = 0
+    for i, fila in enumerate(resultados):
+        if fila is not None:
+            hechos += 1
+            if al_calificar:
+                al_calificar(i, fila)
+            if al_avanzar:
+                al_avanzar(hechos, total)
+
+    def terminar(j, fila):
+        resultados[pendientes[j]] = fila
+        if al_calificar:
+            al_calificar(pendientes[j], fila)
+
+    def avanzar(hechos_pendientes, _):
+        if al_avanzar:
+            al_avanzar(ya_calificadas + hechos_pendientes, total)
+
+    tareas = [(*entregas[i], cadenas_busqueda, registro.ruta, id_clave, tolerancia) for i in pendientes]
+    ejecutar_lote(calificar_entrega_registrada, tareas, max_workers=max_workers, al_avanzar=avanzar,
+                  al_terminar=terminar, cancelacion=cancelacion)
+    return resultados
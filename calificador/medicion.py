@@ -0,0 +1,139 @@
+"""
+Tiempos por etapa de la calificación (extracción, normalización, búsqueda, exportación).
+
+Cada etapa medida se agrega a la captura activa (ver capturar) y, si el logger
+"calificador.medicion" tiene nivel INFO, se emite como un renglón JSON. Sin captura ni
+log activos, medir una etapa solo cuesta una consulta a una variable de contexto.
+Con CALIFICADOR_LOG_TIEMPOS=1 el log se activa al importar el módulo.
+"""
+import contextvars
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+logger = logging.getLogger("calificador.medicion")
+_eventos = contextvars.ContextVar("eventos_medicion", default=None)
+
+def activar_log(stream=None):
+    """Emite cada etapa medida como un renglón JSON en stream (stderr por defecto)"""
+    if not any(getattr(h, "_calificador", False) for h in logger.handlers):
+        handler = logging.StreamHandler(stream or sys.stderr)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        handler._calificador = True
+        logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+if os.environ.get("CALIFICADOR_LOG_TIEMPOS"):
+    activar_log()
+
+def activa():
+    return _eventos.get() is not None or logger.isEnabledFor(logging.INFO)
+
+def registrar(nombre, segundos, **datos):
+    """Registra una etapa ya medida"""
+    eventos = _eventos.get()
+    if eventos is None and not logger.isEnabledFor(logging.INFO):
+        return
+    evento = {"etapa": nombre, "ms": round(segundos * 1000, 3), **datos}
+    if eventos is not None:
+        eventos.append(evento)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps(evento, ensure_ascii=False, default=str))
+
+@contextmanager
+def etapa(nombre, **datos):
+    """Mide el bloque (también sirve como decorador: @etapa("generar_mensajes"))"""
+    if not activa():
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar(nombre, time.perf_counter() - inicio, **datos)
+
+def medir_iterable(nombre, iterable, **datos):
+    """Mide cuánto tarda en producirse cada elemento, por ejemplo cada página extraída"""
+    iterador = iter(iterable)
+    numero = 0
+    try:
+        while True:
+            inicio = time.perf_counter()
+            try:
+                elemento = next(iterador)
+            except StopIteration:
+                return
+            numero += 1
+            registrar(nombre, time.perf_counter() - inicio, numero=numero, **datos)
+            yield elemento
+    finally:
+        if hasattr(iterador, "close"):
+            iterador.close()
+
+@contextmanager
+def capturar():
+    """Junta en una lista los eventos de las etapas medidas dentro del bloque"""
+    eventos = []
+    token = _eventos.set(eventos)
+    try:
+        yield eventos
+    finally:
+        _eventos.reset(token)
+
+def resumir(eventos):
+    """Veces, tiempo total y máximo por etapa, de la más costosa a la menos costosa"""
+    resumen = {}
+    for evento in eventos:
+        datos = resumen.setdefault(evento["etapa"], {"etapa": evento["etapa"], "veces": 0, "total_ms": 0.0, "max_ms": 0.0})
+        datos["veces"] += 1
+        datos["total_ms"] += evento["ms"]
+        datos["max_ms"] = max(datos["max_ms"], evento["ms"])
+    for datos in resumen.values():
+        datos["total_ms"] = round(datos["total_ms"], 3)
+    return sorted(resumen.values(), key=lambda d: d["total_ms"], reverse=True)
+
+@contextmanager
+def perfilar(lineas=40):
+    """
+    Perfila el bloque con cProfile y tracemalloc. Al salir, el diccionario devuelto
+    tiene "texto" (reporte legible) y "prof" (estadísticas de pstats para snakeviz).
+    """
+    resultado = {}
+    perfil = cProfile.Profile()
+    ya_rastreando = tracemalloc.is_tracing()
+    if not ya_rastreando:
+        tracemalloc.start()
+    perfil.enable()
+    try:
+        yield resultado
+    finally:
+        perfil.disable()
+        instantanea = tracemalloc.take_snapshot()
+        _, pico = tracemalloc.get_traced_memory()
+        if not ya_rastreando:
+            tracemalloc.stop()
+
+        salida = io.StringIO()
+        pstats.Stats(perfil, stream=salida).sort_stats("cumulative").print_stats(lineas)
+        salida.write(f"\nPico de memoria: {pico / 2**20:.2f} MB\nLíneas que más memoria reservaron:\n")
+        for estadistica in instantanea.statistics("lineno")[:20]:
+            salida.write(f"{estadistica}\n")
+        resultado["texto"] = salida.getvalue()
+
+        fd, ruta = tempfile.mkstemp(suffix=".prof")
+        os.close(fd)
+        try:
+            perfil.dump_stats(ruta)
+            with open(ruta, "rb") as f:
+                resultado["prof"] = f.read()
+        finally:
+            os.remove(ruta)
@@ -0,0 +1,289 @@
+"""Motores de extracción de texto PDF intercambiables, del más rápido al más preciso."""
+import importlib.util
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+from calificador import medicion
+from calificador.temporales import como_archivo
+
+# Las librerías de PDF solo se buscan aquí; se importan al abrir el primer PDF
+PDF_AVAILABLE = all(importlib.util.find_spec(nombre) is not None for nombre in ("PyPDF2", "pdfplumber"))
+
+@dataclass(frozen=True)
+class LimitesPDF:
+    """Presupuesto por documento; None es sin límite"""
+    max_paginas: int = None
+    max_bytes: int = None
+
+def _limite_entorno(variable, defecto, factor=1):
+    valor = int(os.environ.get(variable, defecto)) * factor
+    return valor or None
+
+# Con 0 no hay límite
+LIMITES_PDF = LimitesPDF(
+    max_paginas=_limite_entorno("CALIFICADOR_PDF_MAX_PAGINAS", "60"),
+    max_bytes=_limite_entorno("CALIFICADOR_PDF_MAX_MB", "50", 1024 * 1024),
+)
+
+def configurar_limites(max_paginas=None, max_mb=None):
+    """
+    Cambia los límites de LIMITES_PDF (0 es sin límite; None deja el actual). También se
+    guardan en el entorno para que los procesos del pool que se lancen después los usen.
+    """
+    global LIMITES_PDF
+    if max_paginas is not None:
+        os.environ["CALIFICADOR_PDF_MAX_PAGINAS"] = str(max_paginas)
+        LIMITES_PDF = LimitesPDF(max_paginas or None, LIMITES_PDF.max_bytes)
+    if max_mb is not None:
+        os.environ["CALIFICADOR_PDF_MAX_MB"] = str(max_mb)
+        LIMITES_PDF = LimitesPDF(LIMITES_PDF.max_paginas, max_mb * 1024 * 1024 or None)
+
+class LimiteExcedido(Exception):
+    """El documento rebasa el tamaño máximo y no se intenta leer"""
+
+class MotorPDF(ABC):
+    """
+    Interfaz de un motor: abrir(datos) devuelve un documento con numero_paginas,
+    texto(numero) y cerrar(). datos son bytes o un mmap de solo lectura. texto debe
+    soltar lo que guardó en caché para esa página, de modo que la memoria no crezca
+    con el número de páginas. Los motores se prueban en el orden de MOTORES_PDF.
+    """
+    nombre = ""
+
+    @abstractmethod
+    def abrir(self, datos):
+        """Abre el PDF a partir de sus bytes"""
+
+class _DocumentoPyPDF2:
+    def __init__(self, datos):
+        import PyPDF2
+        self._archivo = como_archivo(datos)
+        self._lector = PyPDF2.PdfReader(self._archivo)
+        self.numero_paginas = len(self._lector.pages)
+
+    def texto(self, numero):
+        texto = self._lector.pages[numero].extract_text() or ""
+        # Los objetos resueltos (imágenes incluidas) se vuelven a leer del archivo si hacen falta
+        self._lector.resolved_objects.clear()
+        return texto
+
+    def cerrar(self):
+        self._archivo.close()
+
+class _DocumentoPdfplumber:
+    def __init__(self, datos):
+        import pdfplumber
+        self._archivo = como_archivo(datos)
+        self._pdf = pdfplumber.open(self._archivo)
+        self.numero_paginas = len(self._pdf.pages)
+
+    def texto(self, numero):
+        pagina = self._pdf.pages[numero]
+        texto = pagina.extract_text() or ""
+        # pdfplumber conserva los objetos de cada página y pdfminer los del documento
+        # hasta cerrar el PDF; se sueltan en cuanto se tiene el texto. _cached_objs es
+        # interno de PDFDocument (probado con pdfplumber 0.11.10 y pdfminer.six 20260107):
+        # si otra versión no lo tiene, solo se deja de soltar esa memoria
+        pagina.close()
+        objetos = getattr(self._pdf.doc, "_cached_objs", None)
+        if hasattr(objetos, "clear"):
+            objetos.clear()
+        return texto
+
+    def cerrar(self):
+        self._pdf.close()
+        self._archivo.close()
+
+class MotorPyPDF2(MotorPDF):
+    """Rápido; suficiente para los PDF de solo texto que exportan Word o Google Docs"""
+    nombre = "PyPDF2"
+
+    def abrir(self, datos):
+        return _DocumentoPyPDF2(datos)
+
+class MotorPdfplumber(MotorPDF):
+    """Lento pero respeta la disposición del texto; se usa cuando el rápido no basta"""
+    nombre = "pdfplumber"
+
+    def abrir(self, datos):
+        return _DocumentoPdfplumber(datos)
+
+MOTORES_PDF = [MotorPyPDF2(), MotorPdfplumber()] if PDF_AVAILABLE else []
+
+def registrar_motor(motor, posicion=None):
+    """Agrega un motor a la lista; sin posición se prueba al final, como último recurso"""
+    MOTORES_PDF.insert(len(MOTORES_PDF) if posicion is None else posicion, motor)
+
+def calidad_suficiente(texto_pagina):
+    """
+    Si el texto del motor basta para la página. Una página vacía (escaneada o mal
+    extraída) no basta; una con ecuaciones basta si trae '=' y algún conjunto entre
+    llaves. Una página con texto pero sin nada de ecuaciones (portada, instrucciones,
+    anexo) también basta: otro motor no le encontraría respuestas.
+    """
+    if not texto_pagina.strip():
+        return False
+    tiene_igual = "=" in texto_pagina
+    tiene_llaves = "{" in texto_pagina or "}" in texto_pagina
+    # Solo una parte de la ecuación suele ser una línea que el motor rápido partió o perdió
+    return tiene_igual == tiene_llaves
+
+class EstadisticasMotores:
+    """Páginas, aciertos, errores y tiempo acumulados por motor (protegido para varios hilos)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._datos = {}
+
+    def registrar(self, motor, segundos, aceptada, error=False):
+        with self._lock:
+            datos = self._datos.setdefault(motor, {"paginas": 0, "aceptadas": 0, "errores": 0, "segundos": 0.0})
+            datos["paginas"] += 1
+            datos["aceptadas"] += int(aceptada)
+            datos["errores"] += int(error)
+            datos["segundos"] += segundos
+
+    def combinar(self, otras):
+        """Suma estadísticas recibidas como diccionario (por ejemplo, desde un proceso del pool)"""
+        with self._lock:
+            for motor, valores in otras.items():
+                datos = self._datos.setdefault(motor, {"paginas": 0, "aceptadas": 0, "errores": 0, "segundos": 0.0})
+                for campo, valor in valores.items():
+                    datos[campo] += valor
+
+    def vaciar(self):
+        """Devuelve lo acumulado como diccionario y reinicia los contadores"""
+        with self._lock:
+            datos, self._datos = self._datos, {}
+        return datos
+
+    def tasa_respaldo(self, primer_motor=None):
+        """
+        Fracción de las páginas que el primer motor no resolvió y pasaron a un motor de
+        respaldo; None si no se ha leído ninguna
+        """
+        primer_motor = primer_motor or (MOTORES_PDF[0].nombre if MOTORES_PDF else None)
+        with self._lock:
+            datos = self._datos.get(primer_motor)
+            if not datos or not datos["paginas"]:
+                return None
+            return (datos["paginas"] - datos["aceptadas"]) / datos["paginas"]
+
+    def como_filas(self):
+        with self._lock:
+            return [
+                {
+                    "Motor": motor,
+                    "Páginas": datos["paginas"],
+                    "Aceptadas": datos["aceptadas"],
+                    "Tasa de acierto": datos["aceptadas"] / datos["paginas"],
+                    "Errores": datos["errores"],
+                    "ms por página": 1000 * datos["segundos"] / datos["paginas"],
+                }
+                for motor, datos in self._datos.items()
+            ]
+
+estadisticas_motores = EstadisticasMotores()
+
+class PaginasPDF:
+    """
+    Texto de cada página de un PDF. Para cada página se prueba primero el motor más
+    rápido y solo se pasa al siguiente si el texto no supera calidad_suficiente o si
+    el motor falla; si ninguno convence se usa el último texto obtenido. Los motores
+    se abren únicamente cuando alguna página los necesita.
+    Un PDF más grande que limites.max_bytes no se abre (LimiteExcedido); de uno con más
+    de limites.max_paginas solo se leen esas páginas y, al terminar de recorrerlo,
+    truncado queda en True. quedan_paginas dice si al dejar de recorrerlo todavía había
+    páginas sin extraer.
+    """
+
+    def __init__(self, datos, motores=None, estadisticas=None, limites=None):
+        self.datos = datos
+        self.motores = motores or MOTORES_PDF
+        self.estadisticas = estadisticas or estadisticas_motores
+        self.limites = limites or LIMITES_PDF
+        self.numero_paginas = None
+        self.paginas_extraidas = 0
+        self.truncado = False
+
+    @property
+    def quedan_paginas(self):
+        return self.numero_paginas is None or self.paginas_extraidas < self.numero_paginas
+
+    @property
+    def aviso(self):
+        if not self.truncado:
+            return ""
+        return (f"Documento truncado: solo se leyeron las primeras {self.limites.max_paginas} "
+                f"de {self.numero_paginas} páginas (CALIFICADOR_PDF_MAX_PAGINAS)")
+
+    def __iter__(self):
+        if not PDF_AVAILABLE:
+            raise Exception("Las librerías de PDF no están instaladas. Instala: pip install PyPDF2 pdfplumber")
+        max_bytes = self.limites.max_bytes
+        if max_bytes and len(self.datos) > max_bytes:
+            raise LimiteExcedido(f"El PDF pesa {len(self.datos) / 1024 / 1024:.1f} MB y el límite por documento "
+                                 f"es de {max_bytes / 1024 / 1024:.0f} MB (CALIFICADOR_PDF_MAX_MB); no se leyó")
+
+        motores = self.motores
+        estadisticas = self.estadisticas
+        documentos = {}
+        errores = {}
+
+        def abrir(motor):
+            if motor.nombre not in documentos and motor.nombre not in errores:
+                try:
+                    documentos[motor.nombre] = motor.abrir(self.datos)
+                except Exception as e:
+                    errores[motor.nombre] = e
+            return documentos.get(motor.nombre)
+
+        try:
+            for motor in motores:
+                documento = abrir(motor)
+                if documento is not None:
+                    self.numero_paginas = documento.numero_paginas
+                    break
+            if self.numero_paginas is None:
+                raise Exception(" | ".join(f"Error con {nombre}: {str(e)}" for nombre, e in errores.items()))
+
+            por_leer = min(self.numero_paginas, self.limites.max_paginas or self.numero_paginas)
+            for numero in range(por_leer):
+                texto_pagina = None
+                errores_pagina = []
+                for motor in motores:
+                    documento = abrir(motor)
+                    if documento is None:
+                        continue
+                    inicio = time.perf_counter()
+                    try:
+                        texto_motor = documento.texto(numero)
+                    except Exception as e:
+                        estadisticas.registrar(motor.nombre, time.perf_counter() - inicio, aceptada=False, error=True)
+                        medicion.registrar("motor_pdf", time.perf_counter() - inicio, motor=motor.nombre, pagina=numero + 1, error=True)
+                        errores_pagina.append(f"Error con {motor.nombre}: {str(e)}")
+                        continue
+                    aceptada = calidad_suficiente(texto_motor)
+                    estadisticas.registrar(motor.nombre, time.perf_counter() - inicio, aceptada=aceptada)
+                    medicion.registrar("motor_pdf", time.perf_counter() - inicio, motor=motor.nombre, pagina=numero + 1, aceptada=aceptada)
+                    texto_pagina = texto_motor
+                    if aceptada:
+                        break
+
+                if texto_pagina is None:
+                    raise Exception(" | ".join(errores_pagina))
+                self.paginas_extraidas = numero + 1
+                if texto_pagina:
+                    yield texto_pagina
+            # Solo se llega aquí si se recorrieron todas las páginas permitidas
+            self.truncado = por_leer < self.numero_paginas
+        finally:
+            for documento in documentos.values():
+                documento.cerrar()
+
+def iterar_paginas_pdf(datos, motores=None, estadisticas=None, limites=None):
+    """Texto de cada página conforme se extrae (ver PaginasPDF)"""
+    return PaginasPDF(datos, motores, estadisticas, limites)
@@ -0,0 +1,239 @@
+"""
+Banco de plantillas de retroalimentación en SQLite con índice de texto completo (FTS5).
+
+Cada plantilla tiene un título, el texto, la actividad a la que pertenece y etiquetas
+(criterio de la rúbrica, "corregir"/"correcto", etc.). La búsqueda usa el índice FTS5,
+sin distinguir acentos ni mayúsculas y con las palabras como prefijos ("hass dig"
+encuentra "diagrama de Hasse ... dígrafo"), y devuelve solo las mejores coincidencias,
+así que la interfaz no tiene que dibujar toda la biblioteca. Solo usa la biblioteca
+estándar: R7MD sigue sin cargar pandas ni las librerías de documentos.
+"""
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+
+RUTA_PLANTILLAS = os.environ.get(
+    "CALIFICADOR_PLANTILLAS",
+    os.path.join(os.path.expanduser("~"), ".local", "share", "calificador", "plantillas.sqlite3")
+)
+RESULTADOS_POR_BUSQUEDA = 10
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS plantillas (
+    id INTEGER PRIMARY KEY,
+    titulo TEXT NOT NULL,
+    texto TEXT NOT NULL,
+    actividad TEXT NOT NULL,
+    fecha TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS etiquetas (
+    plantilla INTEGER NOT NULL REFERENCES plantillas(id) ON DELETE CASCADE,
+    etiqueta TEXT NOT NULL,
+    PRIMARY KEY (plantilla, etiqueta)
+);
+CREATE INDEX IF NOT EXISTS etiquetas_por_nombre ON etiquetas (etiqueta);
+CREATE VIRTUAL TABLE IF NOT EXISTS plantillas_fts USING fts5(
+    titulo, texto, actividad, etiquetas,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+# Los mensajes que R7MD tenía fijos; se cargan la primera vez que se abre el banco
+PLANTILLAS_R7MD = [
+    ("Hasse: cambio de dirección de la arista en el paso 3", ["corregir", "diagrama de Hasse"],
+     """Buen trabajo, lo que corresponde a tu primera tabla es correcto, identificas de manera adecuada las propiedades, en la segunda tabla la que corresponde al diagrama de Hasse, es correcta hasta el paso 2, ya que en el paso 3, a pesar que identificas de manera correcta cada una de las relaciones transitivas, hay un cambio de dirección de la arista de "c" a "b", ya que la dirección en un paso anterior lo manejas de "b" a "c", de ahí la calificación, su pudieras argumentar dicho cambio de dirección podría corregir la calificación, quedo al pendiente.
+
+Saludos."""),
+
+    ("Hasse: relaciones transitivas incompletas en el paso 3", ["corregir", "diagrama de Hasse", "video"],
+     """Buen trabajo, lo que corresponde a tu primera tabla es correcto, identificas de manera adecuada las propiedades, en la segunda tabla la que corresponde al diagrama de Hasse, es correcta hasta el paso 2, ya que en el paso 3, no identificas en su totalidad las relaciones transitivas, situación que te lleva al error en tu diagrama final, te dejo un video que he realizado con el objetivo de poder darte claridad para resolver el ejercicio.
+
+https://youtu.be/naYR2TQ84L0
+Corrige y reenvía.
+
+Saludos."""),
+
+    ("Hasse: no se entiende la reestructuración del paso 4", ["corregir", "diagrama de Hasse", "video"],
+     """Buen trabajo, lo que corresponde a tu primera tabla es correcto, identificas de manera adecuada las propiedades, en la segunda tabla la que corresponde al diagrama de Hasse, es correcta hasta el paso 2, ya que en el paso 3, no entiendo como llegas a reestructurar para conseguir el diagrama presentado en el punto 4, ¿serías tan amable de dejarme una nota en tu reenvío? Te dejo un video que he realizado con el objetivo de poder darte claridad para resolver el ejercicio.
+
+https://youtu.be/naYR2TQ84L0
+Corrige y reenvía.
+
+Saludos."""),
+
+    ("Dígrafo: faltó eliminar relaciones transitivas", ["corregir", "dígrafo", "video"],
+     """Buen trabajo, la primera tabla es correcta, en la parte que corresponde al dígrafo faltó eliminar la totalidad de las relaciones transitivas, hecho que no te permite alcanzar el 100% de la calificación.
+Te dejo la resolución del ejercicio y quedo a disposición por si hubiera alguna duda más, aprovecho para preguntar, con todo respeto ¿Viste el video que te envíe en la realimentación anterior?
+Saludos.
+
+https://youtu.be/WTGkSBsLX34"""),
+
+    ("Hasse: acomodo incorrecto en el paso 4 (mayor calificación)", ["correcto", "diagrama de Hasse", "video"],
+     """Buen trabajo, lo que corresponde a tu primera tabla es correcto, identificas de manera adecuada las propiedades, en la segunda tabla la que corresponde al diagrama de Hasse, es correcta hasta el paso 3, ya que en el paso 4, estás realizando un acomodo incorrecto, situación que te lleva al error en tu diagrama final, te dejo un video que he realizado con el objetivo de poder darte claridad para resolver el ejercicio. Esperando tomes en consideración la recomendación, para evitar suspicacia en futuros trabajo, se asigna la mayor calificación.
+https://youtu.be/WTGkSBsLX34
+
+Éxito en tus subsecuentes retos."""),
+
+    ("Cierre del curso", ["correcto", "despedida"],
+     """Ha sido un placer acompañarte en este proceso de aprendizaje. Te deseo mucho éxito en tus subsecuentes módulos.
+
+Saludos."""),
+
+    ("Excelente trabajo y cierre del curso", ["correcto", "despedida"],
+     """Excelente trabajo, se requiere poner en práctica todo el conocimiento del curso para lograr resolver el ejercicio como lo has hecho, identificas de manera adecuada todos los elementos solicitados, continua así.
+
+Ha sido un gusto acompañarte en este proceso de aprendizaje. Te deseo mucho éxito en tus subsecuentes módulos."""),
+]
+
+PATRON_TERMINO = re.compile(r"\w+")
+
+def _ahora():
+    return datetime.now().isoformat(timespec="seconds")
+
+def consulta_fts(busqueda):
+    """
+    Convierte lo escrito por el usuario en una consulta FTS5 segura: cada palabra es
+    un prefijo entre comillas y todas deben aparecer. Devuelve None si no hay palabras.
+    """
+    terminos = PATRON_TERMINO.findall(busqueda or "")
+    if not terminos:
+        return None
+    return " ".join(f'"{termino}"*' for termino in terminos)
+
+def _limpiar_etiquetas(etiquetas):
+    return sorted({e.strip() for e in etiquetas if e and e.strip()})
+
+class BancoPlantillas:
+    """Igual que el registro de calificaciones, cada operación abre su propia conexión"""
+
+    def __init__(self, ruta=RUTA_PLANTILLAS, iniciales=PLANTILLAS_R7MD):
+        self.ruta = ruta
+        self.iniciales = iniciales
+        self._esquema_listo = False
+
+    @contextmanager
+    def _conectar(self):
+        if not self._esquema_listo:
+            directorio = os.path.dirname(self.ruta)
+            if directorio:
+                os.makedirs(directorio, exist_ok=True)
+        conexion = sqlite3.connect(self.ruta, timeout=30)
+        try:
+            conexion.execute("PRAGMA foreign_keys = ON")
+            if not self._esquema_listo:
+                conexion.execute("PRAGMA journal_mode=WAL")
+                conexion.executescript(ESQUEMA)
+                # user_version marca que las plantillas iniciales ya se cargaron, para no
+                # volver a crearlas si el usuario las borra
+                if conexion.execute("PRAGMA user_version").fetchone()[0] == 0:
+                    with conexion:
+                        for titulo, etiquetas, texto in self.iniciales:
+                            self._insertar(conexion, titulo, texto, "R7MD", etiquetas)
+                        conexion.execute("PRAGMA user_version = 1")
+                self._esquema_listo = True
+            with conexion:
+                yield conexion
+        finally:
+            conexion.close()
+
+    def _indexar(self, conexion, id_plantilla):
+        conexion.execute("DELETE FROM plantillas_fts WHERE rowid = ?", (id_plantilla,))
+        conexion.execute(
+            "INSERT INTO plantillas_fts (rowid, titulo, texto, actividad, etiquetas) "
+            "SELECT p.id, p.titulo, p.texto, p.actividad, "
+            "COALESCE((SELECT group_concat(etiqueta, ' ') FROM etiquetas WHERE plantilla = p.id), '') "
+            "FROM plantillas p WHERE p.id = ?",
+            (id_plantilla,)
+        )
+
+    def _insertar(self, conexion, titulo, texto, actividad, etiquetas):
+        cursor = conexion.execute(
+            "INSERT INTO plantillas (titulo, texto, actividad, fecha) VALUES (?, ?, ?, ?)",
+            (titulo.strip(), texto.strip(), actividad.strip(), _ahora())
+        )
+        conexion.executemany("INSERT INTO etiquetas (plantilla, etiqueta) VALUES (?, ?)",
+                             [(cursor.lastrowid, e) for e in _limpiar_etiquetas(etiquetas)])
+        self._indexar(conexion, cursor.lastrowid)
+        return cursor.lastrowid
+
+    # --- Edición ---
+
+    def agregar(self, titulo, texto, actividad, etiquetas=()):
+        """Crea una plantilla y devuelve su id"""
+        with self._conectar() as conexion:
+            return self._insertar(conexion, titulo, texto, actividad, etiquetas)
+
+    def agregar_varias(self, plantillas):
+        """Carga [(titulo, texto, actividad, etiquetas), ...] en una sola transacción; devuelve cuántas"""
+        with self._conectar() as conexion:
+            return len([self._insertar(conexion, *plantilla) for plantilla in plantillas])
+
+    def actualizar(self, id_plantilla, titulo, texto, actividad, etiquetas=()):
+        with self._conectar() as conexion:
+            conexion.execute("UPDATE plantillas SET titulo = ?, texto = ?, actividad = ?, fecha = ? WHERE id = ?",
+                             (titulo.strip(), texto.strip(), actividad.strip(), _ahora(), id_plantilla))
+            conexion.execute("DELETE FROM etiquetas WHERE plantilla = ?", (id_plantilla,))
+            conexion.executemany("INSERT INTO etiquetas (plantilla, etiqueta) VALUES (?, ?)",
+                                 [(id_plantilla, e) for e in _limpiar_etiquetas(etiquetas)])
+            self._indexar(conexion, id_plantilla)
+
+    def eliminar(self, id_plantilla):
+        with self._conectar() as conexion:
+            conexion.execute("DELETE FROM plantillas_fts WHERE rowid = ?", (id_plantilla,))
+            conexion.execute("DELETE FROM plantillas WHERE id = ?", (id_plantilla,))
+
+    # --- Consulta ---
+
+    def buscar(self, busqueda="", etiquetas=(), actividad=None, limite=RESULTADOS_POR_BUSQUEDA):
+        """
+        Plantillas que contienen todas las palabras de busqueda y todas las etiquetas
+        indicadas, de la más relevante a la menos (sin búsqueda, las más recientes).
+        Devuelve (lista de hasta limite plantillas, total de coincidencias).
+        """
+        origen, condiciones, parametros = "plantillas p", [], []
+        orden = "p.fecha DESC, p.id DESC"
+        consulta = consulta_fts(busqueda)
+        if consulta:
+            origen += " JOIN plantillas_fts ON plantillas_fts.rowid = p.id"
+            condiciones.append("plantillas_fts MATCH ?")
+            parametros.append(consulta)
+            # bm25 da la relevancia (menor es mejor); el título y las etiquetas pesan más que el texto
+            orden = "bm25(plantillas_fts, 10.0, 1.0, 2.0, 5.0), p.id DESC"
+        for etiqueta in etiquetas:
+            condiciones.append("EXISTS (SELECT 1 FROM etiquetas e WHERE e.plantilla = p.id AND e.etiqueta = ?)")
+            parametros.append(etiqueta)
+        if actividad:
+            condiciones.append("p.actividad = ?")
+            parametros.append(actividad)
+        where = (" WHERE " + " AND ".join(condiciones)) if condiciones else ""
+
+        with self._conectar() as conexion:
+            total = conexion.execute(f"SELECT COUNT(*) FROM {origen}{where}", parametros).fetchone()[0]
+            filas = conexion.execute(
+                "SELECT p.id, p.titulo, p.texto, p.actividad, "
+                "(SELECT group_concat(etiqueta, '|') FROM etiquetas WHERE plantilla = p.id) "
+                f"FROM {origen}{where} ORDER BY {orden} LIMIT ?",
+                parametros + [limite]
+            ).fetchall()
+        return [
+            {"id": id_plantilla, "titulo": titulo, "texto": texto, "actividad": actividad,
+             "etiquetas": sorted(etiquetas_plantilla.split("|")) if etiquetas_plantilla else []}
+            for id_plantilla, titulo, texto, actividad, etiquetas_plantilla in filas
+        ], total
+
+    def etiquetas(self, actividad=None):
+        """Etiquetas en uso con cuántas plantillas tiene cada una"""
+        with self._conectar() as conexion:
+            return conexion.execute(
+                "SELECT e.etiqueta, COUNT(*) FROM etiquetas e JOIN plantillas p ON p.id = e.plantilla "
+                "WHERE ? IS NULL OR p.actividad = ? GROUP BY e.etiqueta ORDER BY COUNT(*) DESC, e.etiqueta",
+                (actividad, actividad)
+            ).fetchall()
+
+    def actividades(self):
+        with self._conectar() as conexion:
+            return [a for (a,) in conexion.execute("SELECT DISTINCT actividad FROM plantillas ORDER BY actividad")]
+
+banco_plantillas = BancoPlantillas()
@@ -0,0 +1,529 @@
+"""R3MD - Extracción de texto y búsqueda de expresiones de conjuntos."""
+import io
+import random
+import re
+import unicodedata
+import zipfile
+from collections import deque
+from contextlib import closing
+from functools import lru_cache
+from xml.etree import ElementTree
+
+from calificador import motores_pdf
+from calificador.algebra import TABLA_SIMBOLOS, conjunto_a_mascara, forma_canonica
+from calificador.arbol_bk import ArbolBK, distancia_edicion
+from calificador.medicion import etapa, medir_iterable
+from calificador.temporales import como_archivo
+
+# Incrementar cuando cambie la forma de extraer texto, para invalidar la caché en disco
+VERSION_EXTRACTOR = 4
+
+LETRAS = "abcdefghijklmnopqrstuvwxyz"
+
+# Ediciones que se toleran entre lo que escribió el alumno y la expresión esperada en el
+# modo tolerante ("BnC" por "B ∩ C", "A^c" por "A ′"); el conjunto se exige idéntico
+TOLERANCIA_EXPRESIONES = 2
+
+# "a)", "a." o "inciso a" para cualquier letra, en una sola búsqueda por línea
+PATRON_INCISO = re.compile(r"\b([a-z])[\)\.]|inciso\s*([a-z])\b", re.IGNORECASE)
+# Inciso escrito al inicio de la misma línea que la ecuación ("a) B ∩ C = {1,2,13}")
+PATRON_PREFIJO_INCISO = re.compile(r"^(?:inciso\s*)?[a-z]\s*[\)\.]\s*|^inciso\s*[a-z]\b\s*", re.IGNORECASE)
+PATRON_LLAVES = re.compile(r"{([^}]*)}")
+PATRON_CORCHETES = re.compile(r"\[([^\]]*)\]")
+PATRON_LISTA_NUMEROS = re.compile(r"(\d+(?:\s*,\s*\d+)+)")
+PATRON_NUMERO = re.compile(r"\b(\d+)\b")
+PATRON_DIGITOS = re.compile(r"\d+")
+
+MENSAJES_EXITO = [
+    "Excelente trabajo, {nombre}. El último ejercicio de este reto demuestra tu dominio de los conjuntos. Saludos.",
+    "Muy bien hecho, {nombre}. Tus respuestas son precisas y completas. Sigue así.",
+    "Perfecto, {nombre}. Se nota que comprendiste el tema de conjuntos.",
+    "Buen trabajo, {nombre}. Has resuelto correctamente todos los incisos del reto.",
+    "Todo correcto, {nombre}. Refleja que dominaste el concepto de operaciones con conjuntos.",
+    "Felicidades, {nombre}. El ejercicio está resuelto sin errores.",
+    "Gran resultado, {nombre}. El dominio del tema es evidente.",
+    "Correcto en todos los puntos, {nombre}. Sigue con ese nivel.",
+    "Buen cierre del reto, {nombre}. Todas las respuestas son válidas.",
+    "Excelente resolución, {nombre}. Cada conjunto está trabajado con precisión."
+]
+
+MENSAJES_ERROR = [
+    "Buen trabajo, {nombre}. Aunque hay detalles que revisar. Corrige y reenvía.",
+    "Estás cerca, {nombre}. Revisa las operaciones que te señalo abajo y ajusta.",
+    "Tu avance es bueno, {nombre}, pero hay expresiones que requieren corrección.",
+    "Vamos bien, {nombre}, pero algunos incisos necesitan revisión.",
+    "Buen intento, {nombre}, faltan ajustes en ciertas expresiones.",
+    "Estás entendiendo el tema, {nombre}, pero hay errores por corregir.",
+    "Revisa los conjuntos indicados abajo, {nombre}. Puedes mejorar.",
+    "Vamos por buen camino, {nombre}, pero aún hay inconsistencias.",
+    "Casi lo tienes, {nombre}. Corrige los puntos marcados como incorrectos.",
+    "Un pequeño esfuerzo más, {nombre}, y todo estará correcto."
+]
+
+EXPRESIONES_FIJAS = [
+    "B ∩ C = {1,2,13}",
+    "C ′ = {3,5,8,9,12,14}",
+    "B ∪ C = {1,2,3,4,5,6,7,8,10,11,13}",
+    "A ∩ C = {2,4,6,10}",
+    "A ′ = {1,3,5,7,9,11,13}",
+    "B – A = {1,3,5,13}",
+    "C – B ′ = {1,2,13}"
+]
+
+NORMALIZACIONES_TEXTO = {
+    'Ս': '∪',
+    'Ո': '∩',
+    '´': '′',
+    '--': '–',
+    ' - ': ' – ',
+}
+
+def iterar_paginas_pdf(pdf_file):
+    """
+    Genera el texto de cada página conforme se extrae, con el motor más rápido que dé
+    buen texto. pdf_file es un archivo abierto o su contenido (bytes o mmap, sin copiarlo).
+    """
+    # Un mmap también tiene read(); leerlo lo copiaría completo a memoria
+    if isinstance(pdf_file, io.IOBase):
+        pdf_file.seek(0)
+        pdf_file = pdf_file.read()
+    return motores_pdf.iterar_paginas_pdf(pdf_file)
+
+def extraer_texto_pdf(pdf_file):
+    """Extrae texto de un archivo PDF"""
+    return "\n".join(iterar_paginas_pdf(pdf_file)).strip()
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_M = "{http://schemas.openxmlformats.org/officeDocument/2006/math}"
+# Un .docx no tiene páginas; se entrega en bloques de líneas para poder dejar de leerlo antes
+LINEAS_POR_BLOQUE_DOCX = 40
+
+def iterar_lineas_docx(docx_file):
+    """
+    Lee word/document.xml directo del zip con iterparse (sin cargar imágenes ni armar el
+    modelo de python-docx) y genera, en el orden del documento, una línea por párrafo o
+    salto de línea y una por renglón de tabla, con las celdas separadas por tabuladores.
+    También se incluye el texto de las ecuaciones del editor de Word.
+    """
+    with zipfile.ZipFile(docx_file) as zf, zf.open("word/document.xml") as xml:
+        parrafos = []  # piezas de los párrafos abiertos (un cuadro de texto anida párrafos)
+        filas = []     # renglones de tabla abiertos: lista de celdas, cada una lista de líneas
+
+        def destino(linea):
+            # Dentro de una tabla la línea pertenece a la celda actual; fuera, se entrega
+            if filas and filas[-1]:
+                filas[-1][-1].append(linea)
+                return None
+            return linea
+
+        for evento, elem in ElementTree.iterparse(xml, events=("start", "end")):
+            etiqueta = elem.tag
+            if evento == "start":
+                if etiqueta == _W + "p":
+                    parrafos.append([])
+                elif etiqueta == _W + "tr":
+                    filas.append([])
+                elif etiqueta == _W + "tc" and filas:
+                    filas[-1].append([])
+                continue
+
+            linea = None
+            if etiqueta in (_W + "t", _M + "t"):
+                if parrafos:
+                    parrafos[-1].append(elem.text or "")
+            elif etiqueta == _W + "tab":
+                if parrafos:
+                    parrafos[-1].append("\t")
+            elif etiqueta in (_W + "br", _W + "cr"):
+                if parrafos:
+                    linea = destino("".join(parrafos[-1]))
+                    parrafos[-1] = []
+            elif etiqueta == _W + "p":
+                if parrafos:
+                    linea = destino("".join(parrafos.pop()))
+                elem.clear()
+            elif etiqueta == _W + "tr":
+                if filas:
+                    linea = destino("\t".join(" ".join(celda).strip() for celda in filas.pop()))
+                elem.clear()
+            elif etiqueta == _W + "tbl":
+                elem.clear()
+
+            if linea is not None:
+                yield linea
+
+def extraer_texto_docx(docx_file):
+    """Extrae texto de un archivo DOCX, una línea por párrafo o renglón de tabla"""
+    return "\n".join(iterar_lineas_docx(docx_file)).strip()
+
+def iterar_bloques_docx(docx_file, lineas_por_bloque=LINEAS_POR_BLOQUE_DOCX):
+    lineas = []
+    with closing(iterar_lineas_docx(docx_file)) as iterador:
+        for linea in iterador:
+            lineas.append(linea)
+            if len(lineas) >= lineas_por_bloque:
+                yield "\n".join(lineas)
+                lineas = []
+    if lineas:
+        yield "\n".join(lineas)
+
+def iterar_paginas(nombre_archivo, archivo):
+    """
+    Texto de una entrega por páginas; un .docx se entrega en bloques de líneas.
+    archivo es un archivo abierto o el contenido de la entrega (bytes o mmap).
+    """
+    if nombre_archivo.lower().endswith('.pdf'):
+        return iterar_paginas_pdf(archivo)
+    if not isinstance(archivo, io.IOBase):
+        archivo = como_archivo(archivo)
+    return iterar_bloques_docx(archivo)
+
+def extraer_texto(nombre_archivo, archivo):
+    """Extrae el texto de una entrega según su extensión (.pdf o .docx)"""
+    if nombre_archivo.lower().endswith('.pdf'):
+        return extraer_texto_pdf(archivo)
+    return extraer_texto_docx(archivo)
+
+PATRON_NORMALIZACION_TEXTO = re.compile("|".join(re.escape(original) for original in NORMALIZACIONES_TEXTO))
+
+def normalizar_texto(texto_completo):
+    """Unifica los símbolos de conjuntos que producen distintos editores (en una sola pasada)"""
+    return PATRON_NORMALIZACION_TEXTO.sub(lambda m: NORMALIZACIONES_TEXTO[m.group()], texto_completo)
+
+def extraer_conjunto(texto):
+    """Máscara del primer {…}, o si no hay, del primer […], de una lista "1, 2, 3" o de un número"""
+    match = None
+    if "{" in texto:
+        match = PATRON_LLAVES.search(texto)
+    if match is None and "[" in texto:
+        match = PATRON_CORCHETES.search(texto)
+    if match is None:
+        match = PATRON_LISTA_NUMEROS.search(texto) or PATRON_NUMERO.search(texto)
+    
+    if match:
+        numeros = PATRON_DIGITOS.findall(match.group(1))
+        if numeros:
+            return conjunto_a_mascara(numeros)
+    
+    return 0
+
+def extraer_nombre(texto):
+    match = re.search(r"(?i)nombre completo:\s*(\w+)", texto)
+    return match.group(1) if match else "Alumno"
+
+def normalizar_expresion(expresion):
+    """
+    Forma canónica de la expresión (ver algebra.forma_canonica), así "B ∩ C" y "C Ո B"
+    coinciden. Si trae el inciso al inicio ("a) B ∩ C") se descarta; si aun así no se
+    puede interpretar, se compara el texto sin espacios con los símbolos unificados.
+    """
+    canonica = forma_canonica(expresion)
+    if canonica is None:
+        sin_inciso = PATRON_PREFIJO_INCISO.sub("", expresion, count=1)
+        if sin_inciso != expresion:
+            canonica = forma_canonica(sin_inciso)
+    if canonica is not None:
+        return canonica
+    expr_normalizada = expresion.replace(" ", "").translate(TABLA_SIMBOLOS)
+    while "––" in expr_normalizada:
+        expr_normalizada = expr_normalizada.replace("––", "–")
+    return expr_normalizada.lower()
+
+PATRON_ESPACIOS = re.compile(r"\s+")
+PATRON_DIFERENCIAS = re.compile(r"–{2,}")
+
+def forma_escrita(expresion):
+    """
+    Expresión como la escribió el alumno, con los símbolos unificados y sin inciso,
+    espacios ni minúsculas: es lo que se compara por distancia de edición en el modo
+    tolerante, donde "BnC" queda a una edición de "B∩C".
+    """
+    texto = PATRON_PREFIJO_INCISO.sub("", expresion.strip(), count=1)
+    texto = unicodedata.normalize("NFKC", texto.translate(TABLA_SIMBOLOS)).translate(TABLA_SIMBOLOS)
+    return PATRON_DIFERENCIAS.sub("–", PATRON_ESPACIOS.sub("", texto)).upper()
+
+def separar_ecuacion(linea):
+    """
+    Divide la línea en el primer "=" que tenga texto a ambos lados (sin otro "=" de por
+    medio) y devuelve (expresión, conjunto) sin espacios alrededor, o None si no es una ecuación.
+    """
+    partes = linea.split("=")
+    for i in range(1, len(partes)):
+        if partes[i - 1] and partes[i]:
+            return partes[i - 1].strip(), partes[i].strip()
+    return None
+
+def extraer_expresion_y_conjunto(expresion_completa):
+    if '=' in expresion_completa:
+        partes = expresion_completa.split('=', 1)
+        expresion = normalizar_expresion(partes[0].strip())
+        conjunto = extraer_conjunto(partes[1].strip())
+        return expresion, conjunto
+    return "", 0
+
+class IndiceEcuaciones:
+    """
+    Índice de las ecuaciones de un documento, construido en una sola pasada.
+
+    Cada línea con forma "expresión = conjunto" se registra por (expresión normalizada,
+    conjunto) y también por (letra de inciso, expresión, conjunto) para cada inciso
+    que la precede. Un inciso aplica a la línea donde aparece o a la siguiente, y a
+    las dos líneas posteriores, igual que en la búsqueda línea por línea original.
+    Para el modo tolerante también se guarda cada forma_escrita con sus conjuntos, en
+    todo el documento y por inciso; el árbol BK sobre las formas de todo el documento
+    se arma hasta la primera búsqueda aproximada que no se resuelve dentro del inciso.
+    """
+
+    def __init__(self, texto_completo=""):
+        self._por_inciso = {}
+        self._por_expresion = {}
+        self._por_forma = {}
+        self._formas_por_inciso = {}
+        self._arbol = None
+        # (línea vacía, letras de inciso) de las últimas líneas leídas
+        self._recientes = deque(maxlen=4)
+        self.agregar_texto(texto_completo)
+
+    def agregar_texto(self, texto):
+        for linea in texto.split('\n'):
+            self.agregar_linea(linea)
+
+    def agregar_linea(self, linea):
+        linea_limpia = linea.strip()
+        letras = set()
+        if linea_limpia:
+            for letra, letra_palabra in PATRON_INCISO.findall(linea_limpia):
+                letras.add((letra or letra_palabra).lower())
+        self._recientes.append((not linea_limpia, letras))
+
+        ecuacion = separar_ecuacion(linea_limpia) if "=" in linea_limpia else None
+        if ecuacion is None:
+            return
+
+        clave = (normalizar_expresion(ecuacion[0]), extraer_conjunto(ecuacion[1]))
+        self._por_expresion.setdefault(clave, linea_limpia)
+        forma = forma_escrita(ecuacion[0])
+        self._por_forma.setdefault(forma, {}).setdefault(clave[1], linea_limpia)
+        if self._arbol is not None:
+            self._arbol.agregar(forma)
+
+        # Una línea i (no vacía) con inciso en i o en i-1 abre la ventana [i, i+2]
+        recientes = list(self._recientes)
+        for k in range(max(len(recientes) - 3, 0), len(recientes)):
+            vacia, letras_k = recientes[k]
+            if vacia:
+                continue
+            letras_ventana = letras_k | recientes[k - 1][1] if k > 0 else letras_k
+            for letra in letras_ventana:
+                self._por_inciso.setdefault((letra,) + clave, linea_limpia)
+                formas = self._formas_por_inciso.setdefault(letra, {})
+                formas.setdefault(forma, {}).setdefault(clave[1], linea_limpia)
+
+    def contiene(self, clave):
+        """Indica si ya apareció alguna línea con (expresión normalizada, conjunto)"""
+        return clave in self._por_expresion
+
+    def linea_por_inciso(self, letra_inciso, clave):
+        """Línea con (expresión normalizada, conjunto) bajo el inciso letra_inciso, o "" si no hay"""
+        return self._por_inciso.get((letra_inciso,) + clave, "")
+
+    def linea_por_expresion(self, clave):
+        """Primera línea con (expresión normalizada, conjunto) en cualquier parte del texto, o "" si no hay"""
+        return self._por_expresion.get(clave, "")
+
+    def buscar(self, indice_inciso, expresion_esperada):
+        """Primero busca la expresión bajo su inciso y después en cualquier parte del texto"""
+        letra_inciso = LETRAS[indice_inciso] if indice_inciso < len(LETRAS) else None
+        
+        expresion_esperada_norm, conjunto_esperado = extraer_expresion_y_conjunto(expresion_esperada)
+        
+        if not expresion_esperada_norm or not conjunto_esperado:
+            return False, ""
+        
+        clave = (expresion_esperada_norm, conjunto_esperado)
+        with etapa("buscar_por_inciso", inciso=letra_inciso):
+            linea = self.linea_por_inciso(letra_inciso, clave)
+        if not linea:
+            with etapa("buscar_flexible", inciso=letra_inciso):
+                linea = self.linea_por_expresion(clave)
+        if linea:
+            return True, linea
+        
+        return False, ""
+
+    def buscar_aproximada(self, expresion_esperada, tolerancia=TOLERANCIA_EXPRESIONES, indice_inciso=None):
+        """
+        Línea cuya expresión está a lo más a tolerancia ediciones de la esperada (la más
+        cercana primero) y cuyo conjunto es exactamente el esperado, o "" si no hay.
+        Igual que buscar, primero se intenta con las líneas del inciso indice_inciso y
+        después en todo el texto, donde solo se compara contra las formas vecinas que
+        deja el árbol BK.
+        """
+        if "=" not in expresion_esperada:
+            return ""
+        expresion, conjunto = expresion_esperada.split("=", 1)
+        conjunto_esperado = extraer_conjunto(conjunto.strip())
+        if not conjunto_esperado:
+            return ""
+        forma_esperada = forma_escrita(expresion)
+
+        letra_inciso = LETRAS[indice_inciso] if indice_inciso is not None and indice_inciso < len(LETRAS) else None
+        formas_inciso = self._formas_por_inciso.get(letra_inciso, {})
+        # Bajo un inciso hay unas cuantas líneas: se comparan todas sin el árbol
+        cercanas = sorted(
+            (distancia, forma) for forma in formas_inciso
+            if (distancia := distancia_edicion(forma_esperada, forma)) <= tolerancia
+        )
+        for _, forma in cercanas:
+            linea = formas_inciso[forma].get(conjunto_esperado)
+            if linea:
+                return linea
+
+        if self._arbol is None:
+            self._arbol = ArbolBK(self._por_forma)
+        for _, forma in self._arbol.buscar(forma_esperada, tolerancia):
+            linea = self._por_forma[forma].get(conjunto_esperado)
+            if linea:
+                return linea
+        return ""
+
+@lru_cache(maxsize=8)
+def indice_ecuaciones(texto_completo):
+    """Índice del texto, reutilizado mientras se buscan todas las expresiones del mismo documento"""
+    return IndiceEcuaciones(texto_completo)
+
+def buscar_expresion_completa(texto_completo, indice_inciso, expresion_esperada):
+    return indice_ecuaciones(texto_completo).buscar(indice_inciso, expresion_esperada)
+
+def buscar_por_inciso_exacto(texto_completo, letra_inciso, expresion_esperada_norm, conjunto_esperado):
+    linea = indice_ecuaciones(texto_completo).linea_por_inciso(letra_inciso, (expresion_esperada_norm, conjunto_esperado))
+    return (True, linea) if linea else (False, "")
+
+def buscar_por_expresion_flexible(texto_completo, expresion_esperada_norm, conjunto_esperado):
+    linea = indice_ecuaciones(texto_completo).linea_por_expresion((expresion_esperada_norm, conjunto_esperado))
+    return (True, linea) if linea else (False, "")
+
+def buscar_por_expresion_aproximada(texto_completo, expresion_esperada, tolerancia=TOLERANCIA_EXPRESIONES,
+                                    indice_inciso=None):
+    linea = indice_ecuaciones(texto_completo).buscar_aproximada(expresion_esperada, tolerancia, indice_inciso)
+    return (True, linea) if linea else (False, "")
+
+def leer_paginas(paginas, cadenas_busqueda):
+    """
+    Indexa las páginas conforme llegan y deja de pedir más en cuanto todas las
+    expresiones esperadas ya aparecieron, para no extraer anexos ni páginas de sobra.
+    Devuelve (texto leído sin normalizar, índice, si se leyó el documento completo).
+    """
+    pendientes = set()
+    for expresion in cadenas_busqueda:
+        expresion_norm, conjunto = extraer_expresion_y_conjunto(expresion)
+        if expresion_norm and conjunto:
+            pendientes.add((expresion_norm, conjunto))
+    
+    indice = IndiceEcuaciones()
+    leidas = []
+    completo = True
+    origen = paginas
+    paginas = medir_iterable("extraer_pagina", paginas)
+    with closing(paginas):
+        for texto_pagina in paginas:
+            leidas.append(texto_pagina)
+            # El índice unifica los símbolos de cada ecuación por su cuenta; no hace falta normalizar la página
+            with etapa("indexar"):
+                indice.agregar_texto(texto_pagina)
+            if all(indice.contiene(clave) for clave in pendientes):
+                # Si las respuestas estaban en la última página, la lectura sí fue completa
+                completo = not _quedan_paginas(origen, paginas, leidas, indice)
+                break
+    return "\n".join(leidas).strip(), indice, completo
+
+def _quedan_paginas(origen, paginas, leidas, indice):
+    """
+    Si al dejar de leer el documento todavía tenía páginas. Un PaginasPDF lo sabe sin
+    extraer nada; de otros iteradores (bloques de un .docx) se pide la página siguiente,
+    que se agrega a lo leído.
+    """
+    if hasattr(origen, "quedan_paginas"):
+        return origen.quedan_paginas
+    siguiente = next(paginas, None)
+    if siguiente is None:
+        return False
+    leidas.append(siguiente)
+    indice.agregar_texto(siguiente)
+    return True
+
+def evaluar_expresiones(texto_completo, cadenas_busqueda, indice=None, tolerancia=0):
+    """
+    Busca cada expresión esperada en el texto y separa coincidencias de errores. Con
+    tolerancia, una expresión que no aparece tal cual se acepta si hay una línea a lo
+    más a esas ediciones con el conjunto correcto; aproximadas guarda {inciso: línea}
+    de esas coincidencias para revisarlas.
+    Devuelve (coincidencias, no_encontradas, indices_incorrectos, aproximadas).
+    """
+    indice = indice or IndiceEcuaciones(texto_completo)
+    coincidencias = []
+    no_encontradas = []
+    indices_incorrectos = []
+    aproximadas = {}
+    
+    for i, expresion in enumerate(cadenas_busqueda):
+        encontrado, linea_encontrada = indice.buscar(i, expresion)
+        if not encontrado and tolerancia:
+            with etapa("buscar_aproximada", inciso=LETRAS[i] if i < len(LETRAS) else None):
+                linea_encontrada = indice.buscar_aproximada(expresion, tolerancia, i)
+            if linea_encontrada:
+                encontrado = True
+                aproximadas[i] = linea_encontrada
+        
+        if encontrado:
+            coincidencias.append(expresion)
+        else:
+            no_encontradas.append(expresion)
+            indices_incorrectos.append(i)
+    
+    return coincidencias, no_encontradas, indices_incorrectos, aproximadas
+
+def determinar_videos_necesarios(indices_incorrectos):
+    videos = []
+    if 6 in indices_incorrectos:
+        videos.append("https://youtu.be/-IHf20iF3Cg")
+    
+    otros_incorrectos = [i for i in indices_incorrectos if i != 6]
+    if otros_incorrectos:
+        videos.append("https://youtu.be/q5uYIWw7uD0")
+    
+    return videos
+
+def generar_mensaje(nombre, cadenas_busqueda, coincidencias, indices_incorrectos, semilla=None):
+    """
+    Arma la retroalimentación: encabezado al azar, videos sugeridos y el estado de cada inciso.
+    El encabezado se elige con un generador sembrado con el nombre del alumno (o con
+    semilla), así que el mismo alumno recibe siempre el mismo mensaje.
+    """
+    azar = random.Random(nombre if semilla is None else semilla)
+    mensaje_limpio = ""
+
+    if not indices_incorrectos:
+        encabezado = azar.choice(MENSAJES_EXITO).format(nombre=nombre)
+        mensaje_limpio += f"{encabezado}\n\n"
+        for i, exp in enumerate(cadenas_busqueda):
+            mensaje_limpio += f"{LETRAS[i]}) {exp} - correcto\n"
+    else:
+        encabezado = azar.choice(MENSAJES_ERROR).format(nombre=nombre)
+        mensaje_limpio += f"{encabezado}\n"
+        
+        videos_necesarios = determinar_videos_necesarios(indices_incorrectos)
+        
+        if videos_necesarios:
+            mensaje_limpio += "Revisa estos videos:\n"
+            for video in videos_necesarios:
+                mensaje_limpio += f"{video}\n"
+            mensaje_limpio += "\n"
+        
+        for i, exp in enumerate(cadenas_busqueda):
+            if exp in coincidencias:
+                mensaje_limpio += f"{LETRAS[i]}) {exp} - correcto\n"
+            else:
+                mensaje_limpio += f"{LETRAS[i]}) - incorrecto\n"
+
+    return mensaje_limpio
@@ -0,0 +1,154 @@
+"""R4MD - Mensajes para los alumnos con la actividad de proposiciones lógicas pendiente."""
+from collections import Counter
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from calificador.hojas import FILAS_POR_BLOQUE, iterar_bloques, leer_encabezados
+from calificador.medicion import etapa
+
+MENSAJES_R4 = [
+    "Buen día {nombre}. He tenido la oportunidad de revisar tu participación en el foro y quiero felicitarte, ya que has abordado todos los puntos de manera adecuada, cumpliendo con los criterios de la rúbrica. Ahora, aguardamos los comentarios de tus compañeros para enriquecer el intercambio. Te sugiero considerar sus observaciones y sacar provecho de esta oportunidad. ¡Saludos!",
+
+    "Hola {nombre}, qué gusto saludarte. Revisé tu trabajo en el foro y quiero felicitarte por cumplir con los puntos solicitados en la rúbrica. Ahora esperemos la retroalimentación de tus compañeros, ya que el foro está diseñado para promover este intercambio de ideas. Aprovecha los comentarios recibidos para potenciar tu aprendizaje. Saludos.",
+
+    "Gracias por tu aporte {nombre}. He revisado con detalle tu participación en el foro y quiero reconocerte el haber cumplido con todos los criterios establecidos. Ahora, esperamos las observaciones de tus compañeros, que enriquecerán la discusión y te brindarán nuevos puntos de vista. Aprovecha esta oportunidad para fortalecer tus conocimientos. Saludos cordiales.",
+
+    "Excelente trabajo {nombre}. Al revisar tu contribución en el foro, pude ver que has cumplido con todos los aspectos solicitados en la rúbrica, ¡felicidades! Ahora queda por esperar los comentarios de tus compañeros, quienes podrán ofrecerte nuevas perspectivas. Considera sus observaciones para sacar el mayor provecho de esta actividad. Saludos.",
+
+    "¿Qué tal? {nombre}. Muy bien hecho. Tu participación en el foro ha sido revisada, y es evidente que has cumplido con los puntos solicitados de forma satisfactoria. Ahora, espera la retroalimentación de tus compañeros, ya que el intercambio de ideas es el objetivo de este espacio. Aprovecha sus comentarios para fortalecer tu aprendizaje. ¡Saludos!"
+]
+
+NOMBRES_COLUMNA_OBJETIVO = [
+    "Tarea:R4. Proposiciones lógicas (Real)",
+    "Tarea: R4. Proposiciones lógicas (Real)",
+    "Tarea:R4.Proposiciones lógicas (Real)"
+]
+
+NOMBRES_COLUMNA_NOMBRE = [
+    "Nombre",
+    "nombre",
+    "NOMBRE",
+    "Nombre completo",
+    "nombre completo"
+]
+
+def buscar_columna_flexible(df, nombres_posibles):
+    """
+    Busca una columna de manera flexible, considerando diferentes variaciones de mayúsculas/minúsculas
+    y espacios
+    """
+    # Acepta un DataFrame o directamente la lista de encabezados
+    columnas_df = list(df)
+
+    for nombre_buscado in nombres_posibles:
+        # Búsqueda exacta
+        if nombre_buscado in columnas_df:
+            return nombre_buscado
+
+        # Búsqueda insensible a mayúsculas/minúsculas
+        for col in columnas_df:
+            if col.lower() == nombre_buscado.lower():
+                return col
+
+        # Búsqueda con normalización de espacios
+        nombre_normalizado = nombre_buscado.lower().strip()
+        for col in columnas_df:
+            col_normalizada = col.lower().strip()
+            if col_normalizada == nombre_normalizado:
+                return col
+
+    return None
+
+class ExportacionCalificaciones:
+    """
+    Exportación de calificaciones del LMS (.xlsx o .csv) que se recorre por bloques.
+    Al crearla solo se lee el encabezado para resolver las columnas objetivo y de
+    nombre; bloques() lee únicamente esas dos columnas, FILAS_POR_BLOQUE renglones a la vez.
+    """
+
+    def __init__(self, archivo, nombre_archivo=None):
+        self.archivo = archivo
+        self.nombre_archivo = nombre_archivo or getattr(archivo, "name", archivo)
+        self.encabezados = leer_encabezados(archivo, self.nombre_archivo)
+        self.columna_objetivo = buscar_columna_flexible(self.encabezados, NOMBRES_COLUMNA_OBJETIVO)
+        self.columna_nombre = buscar_columna_flexible(self.encabezados, NOMBRES_COLUMNA_NOMBRE)
+
+    def bloques(self, filas_por_bloque=FILAS_POR_BLOQUE):
+        columnas = [self.columna_objetivo] + ([self.columna_nombre] if self.columna_nombre else [])
+        return iterar_bloques(self.archivo, self.nombre_archivo, columnas, filas_por_bloque)
+
+@dataclass
+class PendientesR4:
+    filas: int = 0
+    con_guion: int = 0
+    nombres: list = field(default_factory=list)
+    # Cuántas veces aparece cada valor de la columna objetivo (para explicar por qué no hay pendientes)
+    valores: Counter = field(default_factory=Counter)
+
+@etapa("buscar_pendientes_r4")
+def buscar_pendientes(exportacion, filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Recorre la exportación una vez y junta solo lo que R4MD necesita: los nombres de
+    los alumnos con "-" y el conteo de valores de la columna objetivo. Requiere que
+    exista la columna objetivo.
+    """
+    pendientes = PendientesR4()
+    for bloque in exportacion.bloques(filas_por_bloque):
+        pendientes.filas += len(bloque)
+        pendientes.valores.update(bloque[exportacion.columna_objetivo].dropna().tolist())
+        con_guion = filtrar_pendientes(bloque, exportacion.columna_objetivo)
+        pendientes.con_guion += len(con_guion)
+        if exportacion.columna_nombre:
+            pendientes.nombres.extend(limpiar_nombres(con_guion[exportacion.columna_nombre]))
+    return pendientes
+
+def iterar_mensajes_r4(exportacion, filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Mensajes (DataFrames Nombre/Mensaje) bloque por bloque, para escribirlos mientras
+    se lee la exportación; la rotación de plantillas continúa de un bloque al siguiente.
+    """
+    generados = 0
+    for bloque in exportacion.bloques(filas_por_bloque):
+        con_guion = filtrar_pendientes(bloque, exportacion.columna_objetivo)
+        nombres = limpiar_nombres(con_guion[exportacion.columna_nombre])
+        if nombres:
+            yield generar_mensajes_r4(nombres, inicio=generados)
+            generados += len(nombres)
+
+def filtrar_pendientes(df, columna_objetivo):
+    """Filas cuya calificación en la columna objetivo es "-" (sin calificar)"""
+    return df[df[columna_objetivo] == "-"]
+
+def limpiar_nombres(nombres):
+    """Quita espacios extra y descarta valores vacíos o NaN"""
+    serie = pd.Series(nombres, dtype=object)
+    serie = serie[serie.notna()].astype(str).str.strip()
+    return serie[serie != ""].tolist()
+
+@etapa("generar_mensajes_r4")
+def generar_mensajes_r4(nombres_limpios, inicio=0):
+    """
+    Asigna los mensajes en orden rotativo para repartirlos de forma equilibrada.
+    Se arma una plantilla a la vez sobre todos los nombres que le tocan, en lugar de
+    formatear renglón por renglón. inicio es cuántos mensajes se generaron antes (al
+    procesar por bloques), para que la rotación no vuelva a empezar en cada bloque.
+    Devuelve un DataFrame con las columnas Nombre y Mensaje.
+    """
+    nombres = pd.Series(nombres_limpios, dtype=object).reset_index(drop=True)
+    plantillas = (inicio + np.arange(len(nombres))) % len(MENSAJES_R4)
+    mensajes = pd.Series("", index=nombres.index, dtype=object)
+
+    for numero, plantilla in enumerate(MENSAJES_R4):
+        seleccion = plantillas == numero
+        if not seleccion.any():
+            continue
+        partes = plantilla.split("{nombre}")
+        grupo = nombres[seleccion]
+        mensaje = partes[0]
+        for parte in partes[1:]:
+            mensaje = mensaje + grupo + parte
+        mensajes[seleccion] = mensaje
+
+    return pd.DataFrame({'Nombre': nombres, 'Mensaje': mensajes})
@@ -0,0 +1,293 @@
+"""
+Registro de calificaciones en SQLite: entregas con su texto extraído, versiones de la
+clave de respuestas y el resultado de cada par entrega–clave.
+
+El texto se guarda por hash del archivo (el mismo de la caché de texto), así que al
+corregir la clave se recalifica desde el registro sin volver a cargar ni a extraer los
+documentos, y solo se evalúan los pares entrega–clave que todavía no existen.
+También guarda los mensajes de R4MD generados para cada Excel.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+
+from calificador.calificacion import armar_fila, calificar_texto
+from calificador.medicion import etapa
+
+RUTA_REGISTRO = os.environ.get(
+    "CALIFICADOR_REGISTRO",
+    os.path.join(os.path.expanduser("~"), ".local", "share", "calificador", "calificaciones.sqlite3")
+)
+# Subirla cuando cambie la forma de evaluar: los pares calificados con otra versión se recalculan
+VERSION_EVALUACION = 1
+# Textos de entregas que recalificar lee de la base a la vez
+TEXTOS_POR_BLOQUE = 100
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS textos (
+    hash TEXT PRIMARY KEY,
+    texto TEXT NOT NULL,
+    fecha TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entregas (
+    id INTEGER PRIMARY KEY,
+    archivo TEXT NOT NULL,
+    alumno TEXT NOT NULL,
+    hash TEXT NOT NULL REFERENCES textos(hash),
+    fecha TEXT NOT NULL,
+    UNIQUE (archivo, hash)
+);
+CREATE TABLE IF NOT EXISTS claves (
+    id INTEGER PRIMARY KEY,
+    huella TEXT NOT NULL UNIQUE,
+    cadenas TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    tolerancia INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS calificaciones (
+    entrega INTEGER NOT NULL REFERENCES entregas(id),
+    clave INTEGER NOT NULL REFERENCES claves(id),
+    version INTEGER NOT NULL,
+    incorrectos TEXT NOT NULL,
+    mensaje TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    PRIMARY KEY (entrega, clave)
+);
+CREATE INDEX IF NOT EXISTS calificaciones_por_clave ON calificaciones (clave);
+CREATE TABLE IF NOT EXISTS mensajes_r4 (
+    excel TEXT NOT NULL,
+    alumno TEXT NOT NULL,
+    mensaje TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    PRIMARY KEY (excel, alumno)
+);
+CREATE INDEX IF NOT EXISTS mensajes_r4_por_alumno ON mensajes_r4 (alumno);
+"""
+
+def _ahora():
+    return datetime.now().isoformat(timespec="seconds")
+
+def huella_clave(cadenas_busqueda, tolerancia=0):
+    """
+    Las mismas expresiones con otra tolerancia (modo tolerante de R3MD) son otra versión
+    de la clave; sin tolerancia la huella es la de siempre
+    """
+    texto = "\n".join(cadenas_busqueda)
+    if tolerancia:
+        texto = f"tolerancia={tolerancia}\n{texto}"
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+class RegistroCalificaciones:
+    """
+    Cada operación abre su propia conexión, así que una misma instancia se puede usar
+    desde los hilos de Streamlit y los procesos del pool (SQLite serializa las escrituras).
+    """
+
+    def __init__(self, ruta=RUTA_REGISTRO):
+        self.ruta = ruta
+        self._esquema_listo = False
+
+    @contextmanager
+    def _conectar(self):
+        if not self._esquema_listo:
+            directorio = os.path.dirname(self.ruta)
+            if directorio:
+                os.makedirs(directorio, exist_ok=True)
+        conexion = sqlite3.connect(self.ruta, timeout=30)
+        try:
+            if not self._esquema_listo:
+                # WAL deja leer el registro mientras un lote sigue escribiendo
+                conexion.execute("PRAGMA journal_mode=WAL")
+                conexion.executescript(ESQUEMA)
+                self._migrar(conexion)
+                self._esquema_listo = True
+            with conexion:
+                yield conexion
+        finally:
+            conexion.close()
+
+    def _migrar(self, conexion):
+        """Columnas agregadas después de crear registros que ya están en uso"""
+        columnas = {fila[1] for fila in conexion.execute("PRAGMA table_info(claves)")}
+        if "tolerancia" not in columnas:
+            try:
+                conexion.execute("ALTER TABLE claves ADD COLUMN tolerancia INTEGER NOT NULL DEFAULT 0")
+            except sqlite3.OperationalError:
+                # Otro proceso del pool la agregó primero
+                pass
+
+    # --- Claves de respuestas ---
+
+    def registrar_clave(self, cadenas_busqueda, tolerancia=0):
+        """Id de la versión de la clave; se crea si estas expresiones (y tolerancia) no se habían usado"""
+        huella = huella_clave(cadenas_busqueda, tolerancia)
+        with self._conectar() as conexion:
+            conexion.execute(
+                "INSERT OR IGNORE INTO claves (huella, cadenas, fecha, tolerancia) VALUES (?, ?, ?, ?)",
+                (huella, json.dumps(list(cadenas_busqueda), ensure_ascii=False), _ahora(), tolerancia)
+            )
+            return conexion.execute("SELECT id FROM claves WHERE huella = ?", (huella,)).fetchone()[0]
+
+    def buscar_clave(self, cadenas_busqueda, tolerancia=0):
+        """Id de la versión de la clave, o None si nunca se ha usado"""
+        with self._conectar() as conexion:
+            fila = conexion.execute("SELECT id FROM claves WHERE huella = ?",
+                                    (huella_clave(cadenas_busqueda, tolerancia),)).fetchone()
+        return fila[0] if fila else None
+
+    def clave(self, id_clave):
+        """Expresiones y tolerancia de una versión de la clave, o None si el id no existe"""
+        with self._conectar() as conexion:
+            fila = conexion.execute("SELECT cadenas, fecha, tolerancia FROM claves WHERE id = ?", (id_clave,)).fetchone()
+        if fila is None:
+            return None
+        cadenas, fecha, tolerancia = fila
+        return {"id": id_clave, "cadenas": json.loads(cadenas), "fecha": fecha, "tolerancia": tolerancia}
+
+    def claves(self):
+        """Versiones de la clave de la más reciente a la más antigua, con cuántas entregas calificaron"""
+        with self._conectar() as conexion:
+            filas = conexion.execute(
+                "SELECT k.id, k.cadenas, k.fecha, k.tolerancia, COUNT(c.entrega) FROM claves k "
+                "LEFT JOIN calificaciones c ON c.clave = k.id GROUP BY k.id ORDER BY k.id DESC"
+            ).fetchall()
+        return [
+            {"id": id_clave, "cadenas": json.loads(cadenas), "fecha": fecha, "tolerancia": tolerancia, "entregas": entregas}
+            for id_clave, cadenas, fecha, tolerancia, entregas in filas
+        ]
+
+    # --- Entregas y calificaciones ---
+
+    def texto(self, hash_archivo):
+        with self._conectar() as conexion:
+            fila = conexion.execute("SELECT texto FROM textos WHERE hash = ?", (hash_archivo,)).fetchone()
+        return fila[0] if fila else None
+
+    def buscar_fila(self, archivo, hash_archivo, id_clave, cadenas_busqueda):
+        """Renglón ya calificado de esta entrega con esta clave, o None si hay que evaluarla"""
+        with self._conectar() as conexion:
+            fila = conexion.execute(
+                "SELECT e.alumno, c.incorrectos, c.mensaje FROM entregas e "
+                "JOIN calificaciones c ON c.entrega = e.id "
+                "WHERE e.archivo = ? AND e.hash = ? AND c.clave = ? AND c.version = ?",
+                (archivo, hash_archivo, id_clave, VERSION_EVALUACION)
+            ).fetchone()
+        if fila is None:
+            return None
+        alumno, incorrectos, mensaje = fila
+        return armar_fila(archivo, alumno, cadenas_busqueda, json.loads(incorrectos), mensaje)
+
+    def guardar(self, archivo, alumno, hash_archivo, texto, id_clave, resultado):
+        """Guarda la entrega, su texto extraído y su calificación con la clave id_clave"""
+        fecha = _ahora()
+        with self._conectar() as conexion:
+            conexion.execute("INSERT OR IGNORE INTO textos (hash, texto, fecha) VALUES (?, ?, ?)",
+                             (hash_archivo, texto, fecha))
+            conexion.execute("INSERT OR IGNORE INTO entregas (archivo, alumno, hash, fecha) VALUES (?, ?, ?, ?)",
+                             (archivo, alumno, hash_archivo, fecha))
+            id_entrega = conexion.execute("SELECT id FROM entregas WHERE archivo = ? AND hash = ?",
+                                          (archivo, hash_archivo)).fetchone()[0]
+            self._guardar_calificacion(conexion, id_entrega, id_clave, resultado, fecha)
+
+    def _guardar_calificacion(self, conexion, id_entrega, id_clave, resultado, fecha):
+        conexion.execute(
+            "INSERT OR REPLACE INTO calificaciones (entrega, clave, version, incorrectos, mensaje, fecha) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (id_entrega, id_clave, VERSION_EVALUACION, json.dumps(resultado.indices_incorrectos),
+             resultado.mensaje, fecha)
+        )
+
+    def filas(self, id_clave):
+        """
+        Renglones calificados con una versión de la clave, en el formato de la tabla por
+        lote. Si un archivo se entregó más de una vez, solo cuenta la entrega más reciente.
+        """
+        with self._conectar() as conexion:
+            cadenas = json.loads(conexion.execute("SELECT cadenas FROM claves WHERE id = ?", (id_clave,)).fetchone()[0])
+            registros = conexion.execute(
+                "SELECT e.archivo, e.alumno, c.incorrectos, c.mensaje FROM entregas e "
+                "JOIN calificaciones c ON c.entrega = e.id WHERE c.clave = ? ORDER BY e.id",
+                (id_clave,)
+            ).fetchall()
+        ultimas = {}
+        for archivo, alumno, incorrectos, mensaje in registros:
+            ultimas[archivo] = armar_fila(archivo, alumno, cadenas, json.loads(incorrectos), mensaje)
+        return list(ultimas.values())
+
+    @etapa("recalificar")
+    def recalificar(self, cadenas_busqueda, desde_clave=None, al_avanzar=None, tolerancia=0):
+        """
+        Califica con cadenas_busqueda las entregas que tenían calificación con la versión
+        desde_clave (todas las del registro si es None), usando el texto guardado: no se
+        extrae ningún documento y los pares ya calificados con esta clave no se repiten.
+        Devuelve (id de la clave, pares evaluados).
+        """
+        id_clave = self.registrar_clave(cadenas_busqueda, tolerancia)
+        consulta = (
+            "SELECT e.id, e.archivo, t.texto FROM entregas e JOIN textos t ON t.hash = e.hash "
+            "WHERE NOT EXISTS (SELECT 1 FROM calificaciones c WHERE c.entrega = e.id AND c.clave = ? AND c.version = ?)"
+        )
+        parametros = [id_clave, VERSION_EVALUACION]
+        if desde_clave is not None:
+            consulta += " AND EXISTS (SELECT 1 FROM calificaciones c WHERE c.entrega = e.id AND c.clave = ?)"
+            parametros.append(desde_clave)
+        fecha = _ahora()
+        evaluados = 0
+        # Los textos se leen por bloques con una conexión y las calificaciones se escriben con
+        # otra (WAL deja leer mientras se escribe), así nunca están todos en memoria a la vez
+        with self._conectar() as lectura, self._conectar() as escritura:
+            total = lectura.execute(f"SELECT COUNT(*) FROM ({consulta})", parametros).fetchone()[0]
+            cursor = lectura.execute(consulta, parametros)
+            while pendientes := cursor.fetchmany(TEXTOS_POR_BLOQUE):
+                for id_entrega, archivo, texto in pendientes:
+                    resultado = calificar_texto(archivo, texto, cadenas_busqueda, tolerancia=tolerancia)
+                    self._guardar_calificacion(escritura, id_entrega, id_clave, resultado, fecha)
+                    evaluados += 1
+                    if al_avanzar:
+                        al_avanzar(evaluados, max(total, evaluados))
+        return id_clave, evaluados
+
+    def resumen(self):
+        with self._conectar() as conexion:
+            return {
+                "entregas": conexion.execute("SELECT COUNT(*) FROM entregas").fetchone()[0],
+                "claves": conexion.execute("SELECT COUNT(*) FROM claves").fetchone()[0],
+                "calificaciones": conexion.execute("SELECT COUNT(*) FROM calificaciones").fetchone()[0],
+            }
+
+    # --- R4MD ---
+
+    def guardar_mensajes_r4(self, huella_excel, df_mensajes):
+        """Guarda los mensajes generados para un Excel (una sola vez por alumno y archivo)"""
+        fecha = _ahora()
+        with self._conectar() as conexion:
+            conexion.executemany(
+                "INSERT OR IGNORE INTO mensajes_r4 (excel, alumno, mensaje, fecha) VALUES (?, ?, ?, ?)",
+                [(huella_excel, nombre, mensaje, fecha)
+                 for nombre, mensaje in zip(df_mensajes["Nombre"], df_mensajes["Mensaje"])]
+            )
+
+    def mensajes_r4(self, busqueda="", limite=200):
+        """Mensajes de R4MD ya generados, del más reciente al más antiguo, filtrados por nombre"""
+        with self._conectar() as conexion:
+            filas = conexion.execute(
+                "SELECT fecha, alumno, mensaje FROM mensajes_r4 WHERE alumno LIKE ? "
+                "ORDER BY fecha DESC, alumno LIMIT ?",
+                (f"%{busqueda}%", limite)
+            ).fetchall()
+        return [{"Fecha": fecha, "Nombre": alumno, "Mensaje": mensaje} for fecha, alumno, mensaje in filas]
+
+    def alumnos_r4_con_mensaje(self, nombres, excepto_excel=None):
+        """Cuáles de estos alumnos ya recibieron un mensaje de R4MD por otro Excel"""
+        with self._conectar() as conexion:
+            conocidos = {
+                alumno for (alumno,) in conexion.execute(
+                    "SELECT DISTINCT alumno FROM mensajes_r4 WHERE excel != ?", (excepto_excel or "",)
+                )
+            }
+        return [nombre for nombre in nombres if nombre in conocidos]
+
+registro_calificaciones = RegistroCalificaciones()
@@ -0,0 +1,143 @@
+"""
+Un archivo de retroalimentación por alumno (.docx o .txt) empaquetado en un ZIP para
+subirlo al LMS en bloque.
+
+La plantilla de Word se compila una vez por lote: se arma un documento con
+python-docx, se guardan sus partes fijas (estilos, tema, tipos de contenido) y se
+separan en texto los fragmentos XML del título y de un párrafo. Para cada alumno solo
+se llenan esos fragmentos, se agregan a las partes fijas ya comprimidas y el documento
+se escribe en su entrada del ZIP antes de armar el siguiente, así que nunca hay más de
+un documento en memoria.
+"""
+import io
+import re
+import tempfile
+import zipfile
+from xml.sax.saxutils import escape
+
+from calificador.medicion import etapa
+from calificador.r3md import LETRAS, determinar_videos_necesarios
+
+FORMATOS_RETRO = ("docx", "txt")
+
+_MARCA = "⁣MARCA⁣"
+_TIPO_ENLACE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/hyperlink"
+_ENLACE = ('<w:p><w:hyperlink r:id="{id}" w:history="1"><w:r><w:rPr><w:color w:val="0563C1"/>'
+           '<w:u w:val="single"/></w:rPr><w:t xml:space="preserve">{texto}</w:t></w:r></w:hyperlink></w:p>')
+_RELACION = '<Relationship Id="{id}" Type="' + _TIPO_ENLACE + '" Target="{url}" TargetMode="External"/>'
+PATRON_NO_PERMITIDO = re.compile(r'[\\/:*?"<>|\x00-\x1f]+')
+
+class PlantillaDocx:
+    """Partes de un .docx listas para llenar con el título y los párrafos de cada alumno"""
+
+    def __init__(self):
+        from docx import Document
+
+        documento = Document()
+        documento.add_heading(_MARCA, level=1)
+        documento.add_paragraph(_MARCA)
+        salida = io.BytesIO()
+        documento.save(salida)
+        with zipfile.ZipFile(salida) as zf:
+            self.partes = {nombre: zf.read(nombre) for nombre in zf.namelist()}
+
+        xml = self.partes.pop("word/document.xml").decode("utf-8")
+        inicio_cuerpo = xml.index("<w:body>") + len("<w:body>")
+        fin_parrafos = xml.index("<w:sectPr")
+        self._inicio = xml[:inicio_cuerpo]
+        self._fin = xml[fin_parrafos:]
+        parrafos = re.findall(r"<w:p\b.*?</w:p>", xml[inicio_cuerpo:fin_parrafos], re.S)
+        self._titulo, self._parrafo = parrafos
+        # El texto de la marca no lleva xml:space="preserve"; sin él Word recorta los espacios
+        self._parrafo = self._parrafo.replace("<w:t>", '<w:t xml:space="preserve">')
+
+        relaciones = self.partes.pop("word/_rels/document.xml.rels").decode("utf-8")
+        self._relaciones, self._fin_relaciones = relaciones.split("</Relationships>")
+
+        # Las partes fijas (los estilos pesan casi 1 MB sin comprimir) se comprimen una sola
+        # vez; a cada documento solo se le agregan sus dos partes propias
+        base = io.BytesIO()
+        with zipfile.ZipFile(base, "w", zipfile.ZIP_DEFLATED) as zf:
+            for nombre, datos in self.partes.items():
+                zf.writestr(nombre, datos)
+        self._base = base.getvalue()
+
+    def escribir(self, destino, titulo, lineas, enlaces=()):
+        """Escribe en destino (archivo binario, puede no ser buscable) el .docx del alumno"""
+        enlaces = set(enlaces)
+        cuerpo = [self._titulo.replace(_MARCA, escape(titulo))]
+        relaciones = []
+        for linea in lineas:
+            if linea in enlaces:
+                id_relacion = f"rIdEnlace{len(relaciones) + 1}"
+                relaciones.append(_RELACION.format(id=id_relacion, url=escape(linea, {'"': "&quot;"})))
+                cuerpo.append(_ENLACE.format(id=id_relacion, texto=escape(linea)))
+            else:
+                cuerpo.append(self._parrafo.replace(_MARCA, escape(linea)))
+
+        documento = io.BytesIO(self._base)
+        documento.seek(0, io.SEEK_END)
+        with zipfile.ZipFile(documento, "a", zipfile.ZIP_DEFLATED) as docx:
+            docx.writestr("word/document.xml", self._inicio + "".join(cuerpo) + self._fin)
+            docx.writestr("word/_rels/document.xml.rels",
+                          self._relaciones + "".join(relaciones) + "</Relationships>" + self._fin_relaciones)
+        destino.write(documento.getbuffer())
+
+def nombre_documento(alumno, usados, extension):
+    """Nombre de archivo seguro y único dentro del ZIP: 'Ana López.docx', 'Ana López (2).docx'"""
+    base = PATRON_NO_PERMITIDO.sub(" ", str(alumno or "")).strip().strip(".") or "alumno"
+    nombre = f"{base}.{extension}"
+    repeticion = 1
+    while nombre.lower() in usados:
+        repeticion += 1
+        nombre = f"{base} ({repeticion}).{extension}"
+    usados.add(nombre.lower())
+    return nombre
+
+def documentos_r3md(filas):
+    """(alumno, mensaje, videos) de cada renglón del lote de R3MD; se omiten las entregas con error"""
+    for fila in filas:
+        if fila.get("Error") or not fila.get("Mensaje"):
+            continue
+        indices_incorrectos = [i for i in range(fila["Total"]) if not fila.get(f"{LETRAS[i]})", True)]
+        yield fila["Alumno"], fila["Mensaje"], determinar_videos_necesarios(indices_incorrectos) if indices_incorrectos else []
+
+def documentos_r4(df_mensajes):
+    """(alumno, mensaje, videos) de cada mensaje de R4MD"""
+    for nombre, mensaje in zip(df_mensajes["Nombre"], df_mensajes["Mensaje"]):
+        yield nombre, mensaje, []
+
+@etapa("escribir_zip_retro")
+def escribir_zip_retro(destino, documentos, formato="docx", al_avanzar=None):
+    """
+    Escribe un archivo por alumno en el ZIP destino (ruta o archivo binario) a medida
+    que recorre documentos [(alumno, mensaje, videos), ...], que puede ser un generador.
+    En Word cada renglón del mensaje es un párrafo y los videos quedan como enlaces.
+    Devuelve cuántos archivos se escribieron.
+    """
+    if formato not in FORMATOS_RETRO:
+        raise ValueError(f"Formato no soportado: '{formato}'. Usa uno de {', '.join(FORMATOS_RETRO)}")
+    plantilla = PlantillaDocx() if formato == "docx" else None
+    usados = set()
+    escritos = 0
+    # Un .docx ya viene comprimido: dentro del ZIP se guarda tal cual
+    compresion = zipfile.ZIP_STORED if formato == "docx" else zipfile.ZIP_DEFLATED
+    with zipfile.ZipFile(destino, "w", compresion) as zf:
+        for alumno, mensaje, videos in documentos:
+            nombre = nombre_documento(alumno, usados, formato)
+            with zf.open(nombre, "w") as entrada:
+                if plantilla is not None:
+                    plantilla.escribir(entrada, f"Retroalimentación: {alumno}", mensaje.rstrip("\n").split("\n"), videos)
+                else:
+                    entrada.write(mensaje.encode("utf-8"))
+            escritos += 1
+            if al_avanzar:
+                al_avanzar(escritos)
+    return escritos
+
+def retro_a_zip(documentos, formato="docx"):
+    """El ZIP de escribir_zip_retro como bytes; se arma en un archivo temporal, no en memoria"""
+    with tempfile.TemporaryFile() as temporal:
+        escribir_zip_retro(temporal, documentos, formato)
+        temporal.seek(0)
+        return temporal.read()
@@ -0,0 +1,378 @@
+"""
+Servicio HTTP local para calificar entregas de R3MD desde otros programas (por ejemplo,
+los scripts que sincronizan con el LMS) sin pasar por la interfaz de Streamlit.
+
+    python -m calificador servicio [--puerto 8765] [--procesos 2] [--max-cola 8]
+
+    POST /calificar?archivo=entrega.pdf&clave=ID[&tolerancia=2]   el cuerpo es el archivo tal cual
+    POST /claves     {"cadenas": [...]} o {"conjuntos": "U={...}; A={...}; ...", "expresiones": [...]}
+    GET  /claves     versiones de la clave guardadas en el registro de calificaciones
+    GET  /metrics    procesos ocupados, entregas en cola y percentiles de latencia
+
+La clave es el id de una versión del registro (la que devuelve POST /claves o la que se
+ve en R3MD) o "predefinidas", que es la opción por defecto. Cada entrega se califica en
+un pool acotado de procesos que se lanzan al arrancar y ya tienen importadas las
+librerías de PDF y Word; con todos ocupados y la cola llena se responde 503 con
+Retry-After para que el cliente reintente.
+
+    curl --data-binary @entrega.pdf "http://127.0.0.1:8765/calificar?archivo=entrega.pdf&clave=3"
+"""
+import concurrent.futures
+import importlib
+import json
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from calificador import motores_pdf
+from calificador.algebra import EXPRESIONES_R3MD, generar_clave, parsear_definiciones
+from calificador.calificacion import calificar_r3md
+from calificador.lote import EXTENSIONES_ENTREGA, nombre_desde_ruta
+from calificador.r3md import EXPRESIONES_FIJAS, LETRAS
+from calificador.registro import RegistroCalificaciones
+from calificador.temporales import MEMORIA_ACOTADA, borrar_temporales, guardar_temporal
+
+logger = logging.getLogger("calificador.servicio")
+
+PUERTO = 8765
+CLAVE_PREDEFINIDA = "predefinidas"
+# Librerías que cada proceso del pool importa al arrancar, antes de la primera entrega
+MODULOS_PRECARGADOS = ("PyPDF2", "pdfplumber", "docx")
+# Latencias más recientes con las que se calculan los percentiles de /metrics
+MUESTRAS_LATENCIA = 1000
+PERCENTILES = (50, 90, 99)
+
+class ColaLlena(Exception):
+    """Todos los procesos están ocupados y la cola de espera está completa"""
+
+class ErrorCalificacion(Exception):
+    """La entrega no se pudo leer o calificar (archivo dañado, PDF demasiado grande...)"""
+
+def _precargar():
+    """Inicializador de cada proceso del pool"""
+    for modulo in MODULOS_PRECARGADOS:
+        try:
+            importlib.import_module(modulo)
+        except ImportError:
+            pass
+
+def resultado_a_json(resultado):
+    """Incisos, mensaje y videos de un ResultadoR3MD como diccionario serializable"""
+    incorrectos = set(resultado.indices_incorrectos)
+    total = len(resultado.cadenas_busqueda)
+    return {
+        "archivo": resultado.archivo,
+        "alumno": nombre_desde_ruta(resultado.archivo) or resultado.nombre,
+        "correctas": total - len(incorrectos),
+        "total": total,
+        "incisos": [
+            # aproximada es la línea del alumno cuando el inciso se aceptó en el modo tolerante
+            {"inciso": f"{LETRAS[i]})", "expresion": expresion, "correcto": i not in incorrectos,
+             "aproximada": resultado.aproximadas.get(i, "")}
+            for i, expresion in enumerate(resultado.cadenas_busqueda)
+        ],
+        "mensaje": resultado.mensaje,
+        "videos": resultado.videos,
+        "aviso": resultado.aviso,
+    }
+
+def calificar_solicitud(archivo, datos, cadenas_busqueda, tolerancia=0):
+    """Se ejecuta en un proceso del pool; devuelve la respuesta y los segundos que tardó"""
+    inicio = time.perf_counter()
+    respuesta = resultado_a_json(calificar_r3md(archivo, datos, cadenas_busqueda, tolerancia))
+    return respuesta, time.perf_counter() - inicio
+
+def resumir_latencias(segundos):
+    """Percentiles (rango más cercano) y máximo, en ms, de una lista de duraciones"""
+    ordenadas = sorted(segundos)
+    resumen = {"muestras": len(ordenadas)}
+    if not ordenadas:
+        return resumen
+    for p in PERCENTILES:
+        resumen[f"p{p}"] = round(1000 * ordenadas[max(0, math.ceil(p / 100 * len(ordenadas)) - 1)], 1)
+    resumen["max"] = round(1000 * ordenadas[-1], 1)
+    return resumen
+
+def _lista_de_textos(solicitud, campo):
+    """Lista de textos del campo de una solicitud JSON; ValueError si trae otro tipo"""
+    valor = solicitud.get(campo) or []
+    if not isinstance(valor, list) or not all(isinstance(elemento, str) for elemento in valor):
+        raise ValueError(f"'{campo}' debe ser una lista de textos")
+    return valor
+
+class Servicio:
+    """
+    Pool de procesos ya calentados y contadores de las solicitudes. A lo más hay
+    procesos + max_cola entregas pendientes; las que llegan después se rechazan con
+    ColaLlena en lugar de acumularse en memoria.
+    """
+
+    def __init__(self, procesos=2, max_cola=None, registro=None, timeout=120):
+        self.procesos = procesos
+        self.max_cola = 4 * procesos if max_cola is None else max_cola
+        self.registro = registro or RegistroCalificaciones()
+        self.timeout = timeout
+        self._candado = threading.Lock()
+        self._pendientes = 0
+        self._contadores = dict.fromkeys(("atendidas", "fallidas", "rechazadas", "vencidas"), 0)
+        # Desde que llega la entrega hasta que hay respuesta (incluye la espera en la cola)
+        self._latencias = deque(maxlen=MUESTRAS_LATENCIA)
+        # Solo la calificación dentro del proceso
+        self._calificaciones = deque(maxlen=MUESTRAS_LATENCIA)
+        self._inicio = time.time()
+        self._pool = self._crear_pool()
+
+    def _crear_pool(self):
+        # "spawn", como en lote.ejecutar_lote, para no heredar los hilos del servidor
+        pool = ProcessPoolExecutor(self.procesos, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_precargar)
+        # El pool lanza un proceso por tarea enviada mientras no haya uno libre: con una
+        # tarea por proceso, todos arrancan e importan las librerías antes de abrir el puerto
+        for futuro in [pool.submit(os.getpid) for _ in range(self.procesos)]:
+            futuro.result()
+        return pool
+
+    def _reemplazar_pool(self, roto):
+        """Un proceso que muere (por ejemplo, sin memoria) rompe el pool; se lanza uno nuevo"""
+        with self._candado:
+            if self._pool is roto:
+                roto.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._crear_pool()
+
+    def resolver_clave(self, clave=CLAVE_PREDEFINIDA, tolerancia=None):
+        """
+        (expresiones, tolerancia) de "predefinidas" o del id de una versión del registro.
+        Sin tolerancia se usa la que se guardó con la clave.
+        """
+        if clave in ("", CLAVE_PREDEFINIDA):
+            return EXPRESIONES_FIJAS, tolerancia or 0
+        version = self.registro.clave(int(clave)) if clave.isdigit() else None
+        if version is None:
+            raise LookupError(f"No existe la clave '{clave}'; usa '{CLAVE_PREDEFINIDA}' o un id de GET /claves")
+        return version["cadenas"], version["tolerancia"] if tolerancia is None else tolerancia
+
+    def registrar_clave(self, solicitud):
+        """Guarda en el registro la clave de {"cadenas": [...]} o {"conjuntos": ..., "expresiones": [...]}"""
+        if not isinstance(solicitud, dict):
+            raise ValueError("La clave debe ser un objeto JSON")
+        tolerancia = solicitud.get("tolerancia") or 0
+        if not isinstance(tolerancia, int) or isinstance(tolerancia, bool) or tolerancia < 0:
+            raise ValueError("'tolerancia' debe ser un entero no negativo")
+        if solicitud.get("conjuntos"):
+            if not isinstance(solicitud["conjuntos"], str):
+                raise ValueError("'conjuntos' debe ser texto con una definición por renglón, como \"U = {1,...,14}\"")
+            expresiones = _lista_de_textos(solicitud, "expresiones") or EXPRESIONES_R3MD
+            cadenas = generar_clave(parsear_definiciones(solicitud["conjuntos"]), expresiones)
+        else:
+            cadenas = [cadena.strip() for cadena in _lista_de_textos(solicitud, "cadenas") if cadena.strip()]
+        if not cadenas:
+            raise ValueError("La clave necesita 'cadenas' o 'conjuntos'")
+        id_clave = self.registro.registrar_clave(cadenas, tolerancia)
+        return self.registro.clave(id_clave)
+
+    def calificar(self, archivo, datos, cadenas_busqueda, tolerancia=0):
+        """
+        Califica la entrega en el pool y devuelve la respuesta de resultado_a_json. Los
+        datos pueden ser bytes o un temporales.ArchivoEnDisco, que se borra al terminar.
+        """
+        with self._candado:
+            lleno = self._pendientes >= self.procesos + self.max_cola
+            if lleno:
+                self._contadores["rechazadas"] += 1
+            else:
+                self._pendientes += 1
+        if lleno:
+            borrar_temporales([(archivo, datos)])
+            raise ColaLlena(f"Hay {self.procesos + self.max_cola} entregas pendientes; intenta de nuevo en un momento")
+
+        inicio = time.perf_counter()
+        pool = self._pool
+        try:
+            futuro = pool.submit(calificar_solicitud, archivo, datos, cadenas_busqueda, tolerancia)
+        except BrokenProcessPool:
+            self._terminar(archivo, datos)
+            self._reemplazar_pool(pool)
+            raise
+        # Si la solicitud se vence, la tarea sigue ocupando su lugar hasta que termina de verdad
+        futuro.add_done_callback(lambda _: self._terminar(archivo, datos))
+        try:
+            respuesta, segundos = futuro.result(timeout=self.timeout)
+        except concurrent.futures.TimeoutError:
+            self._contar("vencidas")
+            raise
+        except BrokenProcessPool:
+            self._contar("fallidas")
+            self._reemplazar_pool(pool)
+            raise
+        except Exception as e:
+            self._contar("fallidas")
+            raise ErrorCalificacion(str(e)) from e
+        with self._candado:
+            self._contadores["atendidas"] += 1
+            self._latencias.append(time.perf_counter() - inicio)
+            self._calificaciones.append(segundos)
+        return respuesta
+
+    def _terminar(self, archivo, datos):
+        borrar_temporales([(archivo, datos)])
+        with self._candado:
+            self._pendientes -= 1
+
+    def _contar(self, contador):
+        with self._candado:
+            self._contadores[contador] += 1
+
+    def metricas(self):
+        with self._candado:
+            pendientes = self._pendientes
+            contadores = dict(self._contadores)
+            latencias = list(self._latencias)
+            calificaciones = list(self._calificaciones)
+        en_curso = min(pendientes, self.procesos)
+        return {
+            "procesos": self.procesos,
+            "en_curso": en_curso,
+            "en_cola": pendientes - en_curso,
+            "max_cola": self.max_cola,
+            **contadores,
+            "latencia_ms": resumir_latencias(latencias),
+            "calificacion_ms": resumir_latencias(calificaciones),
+            "activo_s": round(time.time() - self._inicio, 1),
+        }
+
+    def cerrar(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+class _CuerpoSolicitud:
+    """Lee del socket solo los Content-Length bytes del cuerpo (para copiarlo a disco)"""
+
+    def __init__(self, archivo, longitud):
+        self._archivo = archivo
+        self._restantes = longitud
+
+    def read(self, tamano=-1):
+        if tamano < 0 or tamano > self._restantes:
+            tamano = self._restantes
+        datos = self._archivo.read(tamano) if tamano else b""
+        self._restantes -= len(datos)
+        return datos
+
+class ManejadorServicio(BaseHTTPRequestHandler):
+    """Rutas del servicio; el Servicio está en self.server.servicio"""
+
+    server_version = "Calificador/1"
+
+    def do_GET(self):
+        servicio = self.server.servicio
+        ruta = urlparse(self.path).path
+        if ruta == "/metrics":
+            self._responder(HTTPStatus.OK, servicio.metricas())
+        elif ruta == "/claves":
+            self._responder(HTTPStatus.OK, servicio.registro.claves())
+        else:
+            self._responder(HTTPStatus.NOT_FOUND, {"error": f"Ruta desconocida: {ruta}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path not in ("/calificar", "/claves"):
+            self._responder(HTTPStatus.NOT_FOUND, {"error": f"Ruta desconocida: {url.path}"})
+            return
+        try:
+            longitud = int(self.headers["Content-Length"])
+        except (TypeError, ValueError):
+            self._responder(HTTPStatus.LENGTH_REQUIRED, {"error": "Falta el encabezado Content-Length"})
+            return
+        max_bytes = motores_pdf.LIMITES_PDF.max_bytes
+        if max_bytes and longitud > max_bytes:
+            self._responder(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                            {"error": f"El archivo pesa más de {max_bytes // 2**20} MB (CALIFICADOR_PDF_MAX_MB)"})
+            return
+
+        try:
+            if url.path == "/claves":
+                solicitud = json.loads(self.rfile.read(longitud) or b"{}")
+                self._responder(HTTPStatus.CREATED, self.server.servicio.registrar_clave(solicitud))
+            else:
+                self._responder(HTTPStatus.OK, self._calificar(parse_qs(url.query), longitud))
+        except ColaLlena as e:
+            self._responder(HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(e)}, {"Retry-After": "1"})
+        except concurrent.futures.TimeoutError:
+            self._responder(HTTPStatus.GATEWAY_TIMEOUT,
+                            {"error": f"La calificación tardó más de {self.server.servicio.timeout} s"})
+        except LookupError as e:
+            self._responder(HTTPStatus.NOT_FOUND, {"error": str(e)})
+        except ErrorCalificacion as e:
+            self._responder(HTTPStatus.UNPROCESSABLE_ENTITY, {"error": str(e)})
+        except ValueError as e:
+            self._responder(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+        except BrokenProcessPool:
+            self._responder(HTTPStatus.INTERNAL_SERVER_ERROR,
+                            {"error": "Un proceso del pool terminó inesperadamente; intenta de nuevo"})
+        except Exception:
+            logger.exception("Error inesperado en POST %s", url.path)
+            self._responder(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Error interno del servicio"})
+
+    def _calificar(self, parametros, longitud):
+        servicio = self.server.servicio
+        # El cuerpo se lee antes de validar para no dejarlo a medias en el socket
+        if MEMORIA_ACOTADA:
+            extension = os.path.splitext(parametros.get("archivo", [""])[0])[1]
+            datos = guardar_temporal(_CuerpoSolicitud(self.rfile, longitud), extension)
+            recibidos = datos.tamano
+        else:
+            datos = self.rfile.read(longitud)
+            recibidos = len(datos)
+        archivo = parametros.get("archivo", [""])[0]
+        try:
+            if recibidos != longitud:
+                raise ValueError(f"Se recibieron {recibidos} de {longitud} bytes")
+            if not archivo.lower().endswith(EXTENSIONES_ENTREGA):
+                raise ValueError("Indica el nombre de la entrega (.pdf o .docx) en el parámetro 'archivo'")
+            tolerancia = parametros.get("tolerancia", [""])[0]
+            cadenas_busqueda, tolerancia = servicio.resolver_clave(parametros.get("clave", [CLAVE_PREDEFINIDA])[0],
+                                                                   int(tolerancia) if tolerancia else None)
+        except (LookupError, ValueError):
+            borrar_temporales([(archivo, datos)])
+            raise
+        return servicio.calificar(archivo, datos, cadenas_busqueda, tolerancia)
+
+    def _responder(self, estado, datos, encabezados=None):
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        for nombre, valor in (encabezados or {}).items():
+            self.send_header(nombre, valor)
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):
+        logger.info("%s %s", self.address_string(), formato % args)
+
+def crear_servidor(host="127.0.0.1", puerto=PUERTO, **opciones):
+    """
+    Servidor con su Servicio, con el pool ya calentado (opciones van a Servicio). Con
+    puerto=0 se elige uno libre: servidor.server_address dice cuál.
+    """
+    servicio = Servicio(**opciones)
+    try:
+        servidor = ThreadingHTTPServer((host, puerto), ManejadorServicio)
+    except OSError:
+        servicio.cerrar()
+        raise
+    servidor.servicio = servicio
+    return servidor
+
+def cerrar_servidor(servidor):
+    """Libera el puerto y detiene el pool; serve_forever ya debe haber terminado"""
+    servidor.server_close()
+    servidor.servicio.cerrar()
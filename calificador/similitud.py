@@ -0,0 +1,174 @@
+"""
+Detección de entregas casi idénticas dentro de un lote con MinHash y LSH.
+
+Cada entrega se convierte en el conjunto de sus shingles (secuencias de
+TAMANO_SHINGLE palabras del texto normalizado) y se resume en una firma MinHash de
+NUM_PERMUTACIONES enteros: la fracción de posiciones iguales entre dos firmas estima
+la similitud de Jaccard de sus shingles. Para no comparar todos los pares, las firmas
+se cortan en BANDAS; solo se comparan las entregas que coinciden por completo en al
+menos una banda (locality-sensitive hashing), lo que mantiene el costo casi lineal.
+Las firmas se guardan en la caché de texto, junto al texto extraído de la entrega.
+"""
+import hashlib
+import os
+import re
+import zlib
+
+import numpy as np
+
+from calificador.cache import cache_texto, extraer_texto_cacheado
+from calificador.lote import ejecutar_lote
+from calificador.medicion import etapa
+from calificador.r3md import normalizar_texto
+from calificador.temporales import abrir_datos
+
+VERSION_FIRMA = 1
+TAMANO_SHINGLE = 5
+NUM_PERMUTACIONES = 128
+# 16 bandas de 8 filas: un par se vuelve candidato con probabilidad ≥ 50 % a partir
+# de una similitud de ~0.7 y casi seguro arriba de 0.85
+BANDAS = 16
+UMBRAL_SIMILITUD = 0.85
+
+# Permutaciones (a·x + b) mod p con p primo de Mersenne de 31 bits: con x, a y b menores
+# que p el producto cabe en 62 bits y uint64 nunca se desborda antes del módulo
+_PRIMO = np.uint64((1 << 31) - 1)
+# Valor de una firma vacía; ninguna permutación lo alcanza porque todas quedan bajo _PRIMO
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_azar = np.random.RandomState(20240817)
+_A = _azar.randint(1, (1 << 31) - 1, size=NUM_PERMUTACIONES, dtype=np.uint64)
+_B = _azar.randint(0, (1 << 31) - 1, size=NUM_PERMUTACIONES, dtype=np.uint64)
+_SHINGLES_POR_BLOQUE = 4096
+
+PATRON_PALABRA = re.compile(r"\w+|[∪∩′–{}=]")
+
+def shingles(texto, tamano=TAMANO_SHINGLE):
+    """Conjunto de secuencias de palabras consecutivas del texto normalizado"""
+    palabras = PATRON_PALABRA.findall(normalizar_texto(texto).lower())
+    if len(palabras) <= tamano:
+        return {" ".join(palabras)} if palabras else set()
+    return {" ".join(palabras[i:i + tamano]) for i in range(len(palabras) - tamano + 1)}
+
+def firma_minhash(texto):
+    """
+    Firma MinHash (NUM_PERMUTACIONES enteros uint32) del texto. Un texto sin palabras
+    da una firma vacía (todos los valores en el máximo), que agrupar_similares ignora.
+    """
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles(texto)), dtype=np.uint64) % _PRIMO
+    firma = np.full(NUM_PERMUTACIONES, _MAX_HASH, dtype=np.uint64)
+    # Por bloques, para no reservar una matriz shingles × permutaciones en textos largos
+    for inicio in range(0, len(hashes), _SHINGLES_POR_BLOQUE):
+        bloque = hashes[inicio:inicio + _SHINGLES_POR_BLOQUE, None]
+        permutados = (bloque * _A + _B) % _PRIMO
+        np.minimum(firma, permutados.min(axis=0), out=firma)
+    return firma.astype(np.uint32)
+
+def firma_vacia(firma):
+    return bool((firma == np.uint32(_MAX_HASH)).all())
+
+def similitud_estimada(firma_a, firma_b):
+    """Estimación de la similitud de Jaccard entre dos entregas a partir de sus firmas"""
+    return float(np.mean(firma_a == firma_b))
+
+def _clave_firma(clave_texto):
+    return hashlib.sha256(
+        f"firma:{VERSION_FIRMA}:{TAMANO_SHINGLE}:{NUM_PERMUTACIONES}:{clave_texto}".encode()
+    ).hexdigest()
+
+def firma_entrega(nombre_archivo, datos, cache=None):
+    """Firma de una entrega; se calcula a partir del texto extraído y se guarda en la caché"""
+    cache = cache or cache_texto
+    with abrir_datos(datos) as contenido:
+        clave = _clave_firma(cache.clave(contenido, os.path.splitext(nombre_archivo)[1]))
+        guardada = cache.obtener_bytes(clave, ".firma")
+        if guardada is not None and len(guardada) == 4 * NUM_PERMUTACIONES:
+            return np.frombuffer(guardada, dtype=np.uint32)
+
+        try:
+            texto, _ = extraer_texto_cacheado(nombre_archivo, contenido, cache)
+        except Exception:
+            # Una entrega ilegible no se parece a ninguna; el error ya aparece al calificarla
+            texto = ""
+    with etapa("firma_minhash"):
+        firma = firma_minhash(texto)
+    cache.guardar_bytes(clave, ".firma", firma.tobytes())
+    return firma
+
+@etapa("agrupar_similares")
+def agrupar_similares(firmas, umbral=UMBRAL_SIMILITUD, bandas=BANDAS):
+    """
+    Agrupa las entregas cuya similitud estimada con alguna otra del grupo es al menos
+    umbral. Devuelve una lista de grupos (de mayor a menor), cada uno como diccionario
+    con "miembros" (índices en firmas) y "pares" [(i, j, similitud), ...].
+    """
+    filas_por_banda = NUM_PERMUTACIONES // bandas
+    validas = [i for i, firma in enumerate(firmas) if firma is not None and not firma_vacia(firma)]
+
+    cubetas = {}
+    for i in validas:
+        firma = firmas[i]
+        for banda in range(bandas):
+            trozo = firma[banda * filas_por_banda:(banda + 1) * filas_por_banda]
+            cubetas.setdefault((banda, trozo.tobytes()), []).append(i)
+
+    candidatos = set()
+    for miembros in cubetas.values():
+        for a in range(len(miembros)):
+            for b in range(a + 1, len(miembros)):
+                candidatos.add((miembros[a], miembros[b]))
+
+    # Unión-búsqueda sobre los pares que superan el umbral
+    padre = {}
+
+    def raiz(i):
+        while padre.get(i, i) != i:
+            padre[i] = padre.get(padre[i], padre[i])
+            i = padre[i]
+        return i
+
+    pares = []
+    for i, j in sorted(candidatos):
+        similitud = similitud_estimada(firmas[i], firmas[j])
+        if similitud >= umbral:
+            pares.append((i, j, similitud))
+            padre[raiz(j)] = raiz(i)
+
+    grupos = {}
+    for i, j, similitud in pares:
+        grupo = grupos.setdefault(raiz(i), {"miembros": set(), "pares": []})
+        grupo["miembros"].update((i, j))
+        grupo["pares"].append((i, j, similitud))
+    resultado = [
+        {"miembros": sorted(grupo["miembros"]), "pares": grupo["pares"]}
+        for grupo in grupos.values()
+    ]
+    return sorted(resultado, key=lambda g: (-len(g["miembros"]), g["miembros"][0]))
+
+def tabla_similares(nombres, grupos):
+    """Un renglón por entrega sospechosa, con su grupo y la similitud más alta dentro de él"""
+    filas = []
+    for numero, grupo in enumerate(grupos, start=1):
+        maxima = {}
+        for i, j, similitud in grupo["pares"]:
+            maxima[i] = max(maxima.get(i, 0.0), similitud)
+            maxima[j] = max(maxima.get(j, 0.0), similitud)
+        for i in grupo["miembros"]:
+            filas.append({
+                "Grupo": numero,
+                "Archivo": nombres[i],
+                "Entregas en el grupo": len(grupo["miembros"]),
+                "Similitud máxima": round(maxima[i], 3),
+            })
+    return filas
+
+def calcular_firmas(entregas, max_workers=None, al_avanzar=None, al_terminar=None, cancelacion=None):
+    """
+    Firmas de las entregas [(nombre, bytes), ...] calculadas en paralelo (ver
+    ejecutar_lote); las que no alcanzaron a calcularse por una cancelación quedan en None.
+    """
+    return ejecutar_lote(firma_entrega, list(entregas), max_workers=max_workers, al_avanzar=al_avanzar,
+                         al_terminar=al_terminar, cancelacion=cancelacion)
+
+def buscar_similares(entregas, umbral=UMBRAL_SIMILITUD, **kwargs):
+    """Grupos de entregas casi idénticas de un lote (ver calcular_firmas y agrupar_similares)"""
+    return agrupar_similares(calcular_firmas(entregas, **kwargs), umbral)
@@ -0,0 +1,128 @@
+"""
+Entregas guardadas en disco en lugar de en memoria (modo de memoria acotada).
+
+Una carga se copia por bloques a un archivo temporal y, al procesarla, se mapea en
+memoria (mmap): el sistema operativo lee del disco solo las partes que se usan y
+puede soltarlas cuando le falta memoria. Un ArchivoEnDisco ocupa unos bytes, así que
+se puede mandar a los procesos del pool en lugar del contenido del archivo.
+"""
+import hashlib
+import io
+import mmap
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+MEMORIA_ACOTADA = os.environ.get("CALIFICADOR_MEMORIA_ACOTADA", "") not in ("", "0")
+DIRECTORIO_TEMPORAL = os.environ.get("CALIFICADOR_TMP_DIR") or None
+BYTES_POR_COPIA = 1 << 20
+
+@dataclass(frozen=True)
+class ArchivoEnDisco:
+    """Entrega que vive en disco; solo los temporales se borran al terminar"""
+    ruta: str
+    tamano: int
+    temporal: bool = True
+
+def guardar_temporal(origen, sufijo=""):
+    """Copia por bloques un archivo binario abierto (por ejemplo, un UploadedFile) a un temporal"""
+    if hasattr(origen, "seek"):
+        origen.seek(0)
+    fd, ruta = tempfile.mkstemp(suffix=sufijo, prefix="calificador_", dir=DIRECTORIO_TEMPORAL)
+    try:
+        with os.fdopen(fd, "wb") as destino:
+            shutil.copyfileobj(origen, destino, BYTES_POR_COPIA)
+    except BaseException:
+        os.unlink(ruta)
+        raise
+    return ArchivoEnDisco(ruta, os.path.getsize(ruta))
+
+def borrar_temporales(archivos):
+    """Borra los ArchivoEnDisco temporales de [(nombre, datos), ...]; ignora los demás"""
+    for _, datos in archivos:
+        if isinstance(datos, ArchivoEnDisco) and datos.temporal:
+            try:
+                os.unlink(datos.ruta)
+            except FileNotFoundError:
+                pass
+
+@contextmanager
+def copia_en_disco(origen, nombre_archivo=""):
+    """ArchivoEnDisco temporal con el contenido de origen, que se borra al salir del bloque with"""
+    archivo = guardar_temporal(origen, os.path.splitext(nombre_archivo)[1])
+    try:
+        yield archivo
+    finally:
+        borrar_temporales([(nombre_archivo, archivo)])
+
+def huella_archivo(archivo):
+    """SHA-256 de un archivo binario abierto, leído por bloques"""
+    archivo.seek(0)
+    h = hashlib.sha256()
+    while bloque := archivo.read(BYTES_POR_COPIA):
+        h.update(bloque)
+    archivo.seek(0)
+    return h.hexdigest()
+
+@contextmanager
+def abrir_datos(datos):
+    """
+    Contenido de una entrega como búfer de solo lectura: los bytes se entregan tal cual
+    y un ArchivoEnDisco se mapea en memoria mientras dure el bloque with.
+    """
+    if not isinstance(datos, ArchivoEnDisco):
+        yield datos
+        return
+    if not datos.tamano:
+        yield b""
+        return
+    with open(datos.ruta, "rb") as f:
+        mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        yield mapa
+    finally:
+        try:
+            mapa.close()
+        except BufferError:
+            # Algún lector todavía tiene una vista del mapa; se libera cuando la suelte
+            pass
+
+class LectorMemoria(io.RawIOBase):
+    """Archivo de solo lectura sobre un búfer (bytes, mmap) que no copia su contenido"""
+
+    def __init__(self, datos):
+        self._vista = memoryview(datos).cast("B")
+        self._posicion = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, destino):
+        n = max(0, min(len(destino), len(self._vista) - self._posicion))
+        destino[:n] = self._vista[self._posicion:self._posicion + n]
+        self._posicion += n
+        return n
+
+    def seek(self, desplazamiento, desde=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._posicion, io.SEEK_END: len(self._vista)}[desde]
+        self._posicion = max(0, base + desplazamiento)
+        return self._posicion
+
+    def tell(self):
+        return self._posicion
+
+    def close(self):
+        if not self.closed:
+            self._vista.release()
+        super().close()
+
+def como_archivo(datos):
+    """Archivo binario buscable sobre los datos de una entrega, sin copiarlos"""
+    if isinstance(datos, bytes):
+        return io.BytesIO(datos)
+    return io.BufferedReader(LectorMemoria(datos), BYTES_POR_COPIA // 16)
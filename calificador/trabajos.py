@@ -0,0 +1,106 @@
+"""
+Trabajos en segundo plano: la calificación corre en un hilo propio y la interfaz
+solo consulta su avance, así que sigue viva aunque la página se vuelva a ejecutar.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+EN_COLA = "en cola"
+EN_CURSO = "en curso"
+TERMINADO = "terminado"
+CANCELADO = "cancelado"
+FALLIDO = "fallido"
+
+class Trabajo:
+    """Estado de un trabajo; el hilo que lo ejecuta lo actualiza y la interfaz lo lee"""
+
+    def __init__(self, descripcion, total):
+        self.id = uuid.uuid4().hex
+        self.descripcion = descripcion
+        self.total = total
+        self.hechos = 0
+        self.resultados = [None] * total
+        self.resultado = None
+        self.estado = EN_COLA
+        self.error = ""
+        self.inicio = None
+        self.fin = None
+        self.cancelacion = threading.Event()
+        self._lock = threading.Lock()
+
+    def registrar(self, indice, valor):
+        """Guarda un resultado parcial en cuanto está listo"""
+        with self._lock:
+            self.resultados[indice] = valor
+            self.hechos += 1
+
+    def parciales(self):
+        with self._lock:
+            return [r for r in self.resultados if r is not None]
+
+    def cancelar(self):
+        self.cancelacion.set()
+
+    @property
+    def activo(self):
+        return self.estado in (EN_COLA, EN_CURSO)
+
+    @property
+    def progreso(self):
+        return self.hechos / self.total if self.total else 0.0
+
+    @property
+    def duracion(self):
+        if self.inicio is None:
+            return 0.0
+        return (self.fin or time.monotonic()) - self.inicio
+
+    def _ejecutar(self, funcion, args, kwargs):
+        self.inicio = time.monotonic()
+        self.estado = EN_CURSO
+        try:
+            self.resultado = funcion(self, *args, **kwargs)
+            self.estado = CANCELADO if self.cancelacion.is_set() else TERMINADO
+        except Exception as e:
+            self.error = str(e)
+            self.estado = FALLIDO
+        finally:
+            self.fin = time.monotonic()
+
+class GestorTrabajos:
+    """
+    Cola de trabajos compartida por todas las sesiones. funcion(trabajo, *args) debe
+    reportar su avance con trabajo.registrar y revisar trabajo.cancelacion.
+    """
+
+    def __init__(self, max_hilos=2, max_guardados=50):
+        self._executor = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="calificador")
+        self._trabajos = {}
+        self._max_guardados = max_guardados
+        self._lock = threading.Lock()
+
+    def enviar(self, descripcion, total, funcion, *args, **kwargs):
+        trabajo = Trabajo(descripcion, total)
+        with self._lock:
+            self._trabajos[trabajo.id] = trabajo
+            self._olvidar_terminados()
+        self._executor.submit(trabajo._ejecutar, funcion, args, kwargs)
+        return trabajo
+
+    def obtener(self, id_trabajo):
+        with self._lock:
+            return self._trabajos.get(id_trabajo)
+
+    def _olvidar_terminados(self):
+        # Se descartan los trabajos terminados más antiguos (los diccionarios guardan el orden de llegada)
+        sobrantes = len(self._trabajos) - self._max_guardados
+        for id_trabajo in [i for i, t in self._trabajos.items() if not t.activo][:max(sobrantes, 0)]:
+            del self._trabajos[id_trabajo]
+
+    def cerrar(self):
+        with self._lock:
+            for trabajo in self._trabajos.values():
+                trabajo.cancelar()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,36 @@
+"""
+Páginas de la interfaz registradas como plug-ins.
+
+Cada ejercicio se registra con su título, el módulo que lo implementa y la función
+que dibuja la página. El módulo (y con él pandas, las librerías de PDF y Word, etc.)
+solo se importa la primera vez que se abre la página, así que el arranque y las
+páginas ligeras no pagan por las dependencias de las demás. Este archivo no debe
+importar nada pesado.
+"""
+import importlib
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class Pagina:
+    titulo: str
+    modulo: str
+    funcion: str
+
+PAGINAS = [
+    Pagina("R3MD - Conjuntos", "paginas.r3md", "mostrar_r3md"),
+    Pagina("R4MD - Proposiciones Lógicas", "paginas.r4md", "mostrar_r4md"),
+    Pagina("R7MD - Mensajes Predefinidos", "paginas.r7md", "mostrar_r7md"),
+]
+
+def registrar_pagina(titulo, modulo, funcion, posicion=None):
+    """Agrega una página al menú; sin posición aparece al final"""
+    pagina = Pagina(titulo, modulo, funcion)
+    PAGINAS.insert(len(PAGINAS) if posicion is None else posicion, pagina)
+    return pagina
+
+def buscar_pagina(titulo):
+    return next(pagina for pagina in PAGINAS if pagina.titulo == titulo)
+
+def cargar_pagina(pagina):
+    """Importa el módulo de la página (solo la primera vez) y devuelve su función"""
+    return getattr(importlib.import_module(pagina.modulo), pagina.funcion)
@@ -0,0 +1,82 @@
+"""Funciones de interfaz compartidas por las páginas: portapapeles, fragmentos, trabajos y descargas."""
+import hashlib
+
+import streamlit as st
+
+from calificador.medicion import registrar
+from calificador.retroalimentacion import FORMATOS_RETRO, retro_a_zip
+from calificador.trabajos import GestorTrabajos
+
+def copy_to_clipboard_js(text):
+    """Genera JavaScript para copiar texto al portapapeles"""
+    texto_escapado = text.replace('`', '\\`')
+    js_code = f"""
+    <script>
+        navigator.clipboard.writeText(`{texto_escapado}`).then(function() {{
+            console.log('Texto copiado al portapapeles');
+        }});
+    </script>
+    """
+    return js_code
+
+# st.fragment vuelve a ejecutar solo la sección que cambió (Streamlit ≥ 1.37);
+# en versiones anteriores la sección se ejecuta junto con toda la página
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+
+def fragmento(funcion=None, run_every=None):
+    if _fragment is None:
+        return funcion if funcion else (lambda f: f)
+    if funcion is None:
+        return _fragment(run_every=run_every)
+    return _fragment(funcion, run_every=run_every)
+
+@st.cache_resource
+def gestor_trabajos():
+    """Un solo gestor por servidor: los trabajos siguen corriendo entre ejecuciones de la página"""
+    return GestorTrabajos()
+
+MIME_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+def descarga_diferida(etiqueta, clave, huella, construir, file_name, mime):
+    """
+    Construye el archivo solo cuando se pide y lo guarda en la sesión junto con la
+    huella de los datos; mientras no cambien, se descarga sin volver a generarlo.
+    """
+    guardado = st.session_state.get(clave)
+    if guardado is None or guardado[0] != huella:
+        if not st.button(f"⚙️ Preparar {etiqueta}", key=f"preparar_{clave}"):
+            return
+        guardado = (huella, construir())
+        st.session_state[clave] = guardado
+    
+    st.download_button(f"📥 Descargar {etiqueta}", data=guardado[1], file_name=file_name,
+                       mime=mime, key=f"descargar_{clave}")
+
+ETIQUETAS_RETRO = {"docx": "Word (.docx)", "txt": "Texto (.txt)"}
+
+def descarga_retro(clave, huella, documentos, file_name):
+    """
+    Elección de formato y descarga diferida del ZIP con un archivo de retroalimentación
+    por alumno; documentos() devuelve los (alumno, mensaje, videos) a empaquetar.
+    """
+    formato = st.radio("Retroalimentación por alumno", FORMATOS_RETRO, horizontal=True,
+                       key=f"{clave}_formato", format_func=ETIQUETAS_RETRO.get)
+    descarga_diferida(f"ZIP de retroalimentación ({formato})", f"{clave}_{formato}", huella,
+                      lambda: retro_a_zip(documentos(), formato), file_name, "application/zip")
+
+def huella_bytes(datos):
+    return hashlib.sha256(datos).hexdigest()
+
+def memorizar(clave, huella, calcular):
+    """
+    Guarda en la sesión el resultado de calcular() junto con la huella de sus entradas;
+    en las siguientes ejecuciones de la página se reutiliza mientras la huella no cambie.
+    """
+    guardado = st.session_state.get(clave)
+    if guardado is None or guardado[0] != huella:
+        guardado = (huella, calcular())
+        st.session_state[clave] = guardado
+    else:
+        # Aparece en los tiempos por etapa para distinguir una ejecución rápida de una reutilizada
+        registrar("memorizado", 0, clave=clave)
+    return guardado[1]
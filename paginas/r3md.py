@@ -0,0 +1,451 @@
+"""R3MD - Ejercicios de conjuntos: calificación individual, por lote y registro de calificaciones."""
+import os
+
+import pandas as pd
+import streamlit as st
+import streamlit.components.v1 as components
+
+from calificador.algebra import EXPRESIONES_R3MD, generar_clave, parsear_definiciones
+from calificador.calificacion import calificar_r3md
+from calificador.exportar import huella_tabla, tabla_a_csv, tabla_a_xlsx
+from calificador.lote import calificar_lote, expandir_entregas
+from calificador.motores_pdf import PDF_AVAILABLE, estadisticas_motores
+from calificador.r3md import EXPRESIONES_FIJAS, TOLERANCIA_EXPRESIONES
+from calificador.registro import registro_calificaciones
+from calificador.retroalimentacion import documentos_r3md
+from calificador.similitud import UMBRAL_SIMILITUD, agrupar_similares, calcular_firmas, tabla_similares
+from calificador.temporales import MEMORIA_ACOTADA, borrar_temporales, copia_en_disco, guardar_temporal, huella_archivo
+from calificador.trabajos import CANCELADO, FALLIDO
+from paginas.comun import (
+    MIME_XLSX,
+    _fragment,
+    copy_to_clipboard_js,
+    descarga_diferida,
+    descarga_retro,
+    fragmento,
+    gestor_trabajos,
+    huella_bytes,
+    memorizar,
+)
+
+MODO_INDIVIDUAL = "Individual"
+MODO_LOTE = "Lote (varios archivos o ZIP)"
+MODO_REGISTRO = "Registro de calificaciones"
+ORIGEN_EXCEL = "Excel personalizado"
+ORIGEN_CONJUNTOS = "Calcular desde los conjuntos"
+
+DEFINICIONES_EJEMPLO = """U = {1,...,14}
+A = {2,4,6,8,10,12,14}
+B = {1,2,3,5,8,13}
+C = {1,2,4,6,7,10,11,13}"""
+
+def seleccionar_cadenas_excel(excel_file):
+    """Lee el Excel personalizado y devuelve las expresiones de la columna elegida"""
+    # El Excel solo se vuelve a leer si se carga otro archivo
+    df_cadenas = memorizar("r3md_excel_clave", huella_bytes(excel_file.getvalue()), lambda: pd.read_excel(excel_file))
+    columnas = df_cadenas.columns.tolist()
+    columna_objetivo = st.selectbox("Selecciona la columna con las expresiones a buscar:", columnas)
+    
+    if columna_objetivo:
+        return df_cadenas[columna_objetivo].astype(str).str.strip().unique().tolist()
+    return []
+
+def definir_cadenas_por_conjuntos():
+    """Calcula las respuestas esperadas a partir de U, A, B, C y las expresiones del reto"""
+    col1, col2 = st.columns(2)
+    with col1:
+        definiciones = st.text_area("Conjuntos (uno por renglón)", value=DEFINICIONES_EJEMPLO, height=130)
+    with col2:
+        expresiones = st.text_area("Expresiones a calcular (una por renglón)", value="\n".join(EXPRESIONES_R3MD), height=130)
+    
+    try:
+        conjuntos = parsear_definiciones(definiciones)
+        cadenas_busqueda = generar_clave(conjuntos, [e.strip() for e in expresiones.splitlines() if e.strip()])
+    except (ValueError, KeyError) as e:
+        st.error(f"❌ No se pudieron calcular las respuestas: {str(e)}")
+        return []
+    
+    with st.expander("📝 Ver respuestas calculadas que se evaluarán"):
+        for i, expr in enumerate(cadenas_busqueda):
+            st.write(f"{chr(97+i)}) {expr}")
+    return cadenas_busqueda
+
+@fragmento(run_every=1)
+def seguir_trabajo(id_trabajo, avance="Calificadas {hechos} de {total} entregas", mostrar_parciales=True):
+    """Se vuelve a ejecutar cada segundo para mostrar el avance sin bloquear la página"""
+    trabajo = gestor_trabajos().obtener(id_trabajo)
+    if trabajo is None:
+        return
+    if not trabajo.activo:
+        # Al terminar se vuelve a ejecutar toda la página para mostrar los resultados completos
+        st.rerun()
+    
+    st.progress(trabajo.progreso, text=f"{avance.format(hechos=trabajo.hechos, total=trabajo.total)} ({trabajo.duracion:.0f} s)")
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("⏹️ Cancelar", key=f"cancelar_{id_trabajo}"):
+            trabajo.cancelar()
+            st.info("⏳ Cancelando... se conservan las entregas ya procesadas")
+    with col2:
+        if _fragment is None:
+            st.button("🔄 Actualizar avance", key=f"actualizar_{id_trabajo}")
+    
+    parciales = trabajo.parciales()
+    if mostrar_parciales and parciales:
+        st.dataframe(pd.DataFrame(parciales), use_container_width=True)
+
+def entregas_de_carga(archivos_lote):
+    """
+    (ruta, datos) de cada entrega cargada. En modo de memoria acotada las cargas se
+    copian a archivos temporales (y los ZIP se descomprimen a disco); quien las use
+    debe borrarlas con borrar_temporales al terminar.
+    """
+    if not MEMORIA_ACOTADA:
+        return expandir_entregas([(archivo.name, archivo.getvalue()) for archivo in archivos_lote])
+    cargados = [(archivo.name, guardar_temporal(archivo, os.path.splitext(archivo.name)[1])) for archivo in archivos_lote]
+    entregas = []
+    try:
+        entregas = expandir_entregas(cargados, en_disco=True)
+    finally:
+        # Los ZIP y los archivos que no son entregas ya no hacen falta
+        en_uso = {datos for _, datos in entregas}
+        borrar_temporales([(nombre, datos) for nombre, datos in cargados if datos not in en_uso])
+    return entregas
+
+def procesar_y_borrar(entregas, procesar):
+    """Trabajo en segundo plano que borra los temporales de las entregas al terminar"""
+    def trabajo(t):
+        try:
+            return procesar(t)
+        finally:
+            borrar_temporales(entregas)
+    return trabajo
+
+def mostrar_similares_r3md(archivos_lote):
+    """
+    Busca en segundo plano entregas casi idénticas (MinHash/LSH). El trabajo devuelve
+    las firmas, así que al mover el umbral solo se vuelven a agrupar.
+    """
+    st.subheader("🕵️ Entregas casi idénticas")
+    gestor = gestor_trabajos()
+    trabajo = gestor.obtener(st.session_state.get("r3md_similares_trabajo"))
+    
+    if trabajo is not None and trabajo.activo:
+        seguir_trabajo(trabajo.id, "Comparadas {hechos} de {total} entregas", mostrar_parciales=False)
+        return
+    
+    umbral = st.slider("Similitud mínima", 0.5, 1.0, UMBRAL_SIMILITUD, 0.05, key="r3md_umbral_similitud",
+                       help="Fracción estimada de fragmentos de 5 palabras que comparten dos entregas")
+    if st.button("🔍 Buscar entregas similares"):
+        entregas = entregas_de_carga(archivos_lote)
+        trabajo = gestor.enviar(
+            f"R3MD similitud: {len(entregas)} entregas", len(entregas),
+            procesar_y_borrar(entregas, lambda t: ([ruta for ruta, _ in entregas],
+                                                   calcular_firmas(entregas, al_terminar=t.registrar, cancelacion=t.cancelacion)))
+        )
+        st.session_state["r3md_similares_trabajo"] = trabajo.id
+        seguir_trabajo(trabajo.id, "Comparadas {hechos} de {total} entregas", mostrar_parciales=False)
+        return
+    
+    if trabajo is None:
+        return
+    if trabajo.estado == FALLIDO:
+        st.error(f"❌ No se pudo comparar el lote: {trabajo.error}")
+        return
+    if trabajo.estado == CANCELADO:
+        st.warning(f"⚠️ Comparación cancelada: solo se consideran {trabajo.hechos} de {trabajo.total} entregas")
+    if trabajo.resultado is None:
+        return
+    
+    nombres, firmas = trabajo.resultado
+    filas = tabla_similares(nombres, agrupar_similares(firmas, umbral))
+    if not filas:
+        st.success("✅ No se encontraron entregas casi idénticas")
+        return
+    df_similares = pd.DataFrame(filas)
+    st.warning(f"⚠️ Grupos de entregas casi idénticas: {df_similares['Grupo'].nunique()}")
+    st.dataframe(df_similares, use_container_width=True)
+
+def mostrar_lote_r3md(archivos_lote, cadenas_busqueda, tolerancia=0):
+    """
+    Califica varias entregas en segundo plano y muestra una tabla con un renglón por
+    alumno; el lote sigue avanzando aunque la página se vuelva a ejecutar.
+    """
+    gestor = gestor_trabajos()
+    trabajo = gestor.obtener(st.session_state.get("r3md_trabajo"))
+    
+    if trabajo is not None and trabajo.activo:
+        seguir_trabajo(trabajo.id)
+        return
+    
+    usar_registro = st.checkbox("💾 Guardar en el registro de calificaciones", value=True, key="r3md_usar_registro",
+                                help="Las entregas ya calificadas con esta clave se toman del registro y se pueden recalificar después sin volver a cargarlas")
+    if st.button("🚀 Calificar lote", type="primary"):
+        entregas = entregas_de_carga(archivos_lote)
+        if not entregas:
+            st.warning("⚠️ No se encontraron archivos .docx o .pdf en la carga")
+            return
+        
+        registro = registro_calificaciones if usar_registro else None
+        trabajo = gestor.enviar(
+            f"R3MD: {len(entregas)} entregas", len(entregas),
+            procesar_y_borrar(entregas, lambda t: calificar_lote(entregas, cadenas_busqueda, al_calificar=t.registrar,
+                                                                 cancelacion=t.cancelacion, registro=registro,
+                                                                 tolerancia=tolerancia))
+        )
+        st.session_state["r3md_trabajo"] = trabajo.id
+        st.session_state.pop("r3md_lote", None)
+        seguir_trabajo(trabajo.id)
+        return
+    
+    if trabajo is not None and st.session_state.get("r3md_lote_de") != trabajo.id:
+        # Primer recorrido después de que terminó el trabajo: se guardan sus resultados
+        st.session_state["r3md_lote"] = trabajo.parciales()
+        st.session_state["r3md_lote_de"] = trabajo.id
+    if trabajo is not None and trabajo.estado == FALLIDO:
+        st.error(f"❌ El lote no se pudo calificar: {trabajo.error}")
+    if trabajo is not None and trabajo.estado == CANCELADO:
+        st.warning(f"⚠️ Lote cancelado: se calificaron {trabajo.hechos} de {trabajo.total} entregas")
+    
+    resultados = st.session_state.get("r3md_lote")
+    if not resultados:
+        return
+    
+    df_resultados = pd.DataFrame(resultados)
+    con_error = (df_resultados["Error"] != "").sum()
+    st.success(f"✅ Entregas calificadas: {len(df_resultados)}")
+    st.info(f"🎯 Con todas las respuestas correctas: {(df_resultados['Correctas'] == df_resultados['Total']).sum()}")
+    if con_error:
+        st.warning(f"⚠️ Entregas que no se pudieron leer o que se leyeron solo en parte: {con_error}")
+    
+    st.dataframe(df_resultados, use_container_width=True)
+    
+    huella = huella_tabla(df_resultados)
+    col1, col2 = st.columns(2)
+    with col1:
+        descarga_diferida("resultados CSV", "r3md_lote_csv", huella,
+                          lambda: tabla_a_csv(df_resultados), "resultados_r3md.csv", "text/csv")
+    with col2:
+        descarga_diferida("resultados Excel", "r3md_lote_xlsx", huella,
+                          lambda: tabla_a_xlsx(df_resultados, "Resultados_R3"), "resultados_r3md.xlsx", MIME_XLSX)
+    
+    # Un archivo por alumno para subirlos en bloque al LMS (las entregas con error no llevan archivo)
+    descarga_retro("r3md_retro", huella, lambda: documentos_r3md(resultados), "retroalimentacion_r3md.zip")
+    
+    mostrar_similares_r3md(archivos_lote)
+
+def recalificar_registro(cadenas_busqueda, desde_clave, tolerancia=0):
+    """Se ejecuta antes de volver a dibujar la página, para mostrar ya la versión nueva"""
+    with st.spinner("Recalificando desde el registro..."):
+        id_nueva, evaluadas = registro_calificaciones.recalificar(cadenas_busqueda, desde_clave=desde_clave,
+                                                                  tolerancia=tolerancia)
+    st.session_state["r3md_registro_version"] = id_nueva
+    st.session_state["r3md_registro_aviso"] = f"✅ Se evaluaron {evaluadas} entregas con la clave actual (v{id_nueva}) sin volver a extraerlas"
+
+def mostrar_registro_r3md(cadenas_busqueda, tolerancia=0):
+    """
+    Consulta las calificaciones guardadas por versión de la clave y recalifica con la
+    clave actual usando el texto ya extraído, sin volver a cargar las entregas.
+    """
+    resumen = registro_calificaciones.resumen()
+    if not resumen["entregas"]:
+        st.info("🗂️ El registro está vacío: califica un lote con «Guardar en el registro» para llenarlo")
+        return
+    st.info(f"🗂️ Entregas en el registro: {resumen['entregas']} · versiones de la clave: {resumen['claves']}")
+    
+    claves = registro_calificaciones.claves()
+    id_actual = registro_calificaciones.buscar_clave(cadenas_busqueda, tolerancia) if cadenas_busqueda else None
+    etiquetas = {
+        clave["id"]: f"v{clave['id']} · {clave['fecha']} · {clave['entregas']} entregas"
+                     + (" · tolerante" if clave["tolerancia"] else "")
+                     + (" · clave actual" if clave["id"] == id_actual else "")
+        for clave in claves
+    }
+    ids = list(etiquetas)
+    if st.session_state.get("r3md_registro_version") not in ids:
+        st.session_state["r3md_registro_version"] = id_actual if id_actual in ids else ids[0]
+    id_clave = st.selectbox("Versión de la clave", ids, format_func=etiquetas.get, key="r3md_registro_version")
+    
+    with st.expander("📝 Ver expresiones de esta versión"):
+        for i, expr in enumerate(next(c["cadenas"] for c in claves if c["id"] == id_clave)):
+            st.write(f"{chr(97+i)}) {expr}")
+    
+    if cadenas_busqueda and id_clave != id_actual:
+        st.button("🔄 Recalificar estas entregas con la clave actual", type="primary",
+                  on_click=recalificar_registro, args=(cadenas_busqueda, id_clave, tolerancia))
+    aviso = st.session_state.pop("r3md_registro_aviso", None)
+    if aviso:
+        st.success(aviso)
+    
+    filas = registro_calificaciones.filas(id_clave)
+    if not filas:
+        st.warning("⚠️ Ninguna entrega se ha calificado con esta versión")
+        return
+    df_registro = pd.DataFrame(filas)
+    st.info(f"🎯 Con todas las respuestas correctas: {(df_registro['Correctas'] == df_registro['Total']).sum()} de {len(df_registro)}")
+    st.dataframe(df_registro, use_container_width=True)
+    
+    huella = huella_tabla(df_registro)
+    col1, col2 = st.columns(2)
+    with col1:
+        descarga_diferida("registro CSV", "r3md_registro_csv", huella,
+                          lambda: tabla_a_csv(df_registro), f"registro_r3md_v{id_clave}.csv", "text/csv")
+    with col2:
+        descarga_diferida("registro Excel", "r3md_registro_xlsx", huella,
+                          lambda: tabla_a_xlsx(df_registro, "Registro_R3"), f"registro_r3md_v{id_clave}.xlsx", MIME_XLSX)
+
+def mostrar_r3md():
+    st.title("🔢 R3MD - Generador de retroalimentación por ejercicios de conjuntos")
+    
+    if not PDF_AVAILABLE:
+        st.warning("⚠️ Las librerías de PDF no están instaladas. Solo se podrán procesar archivos Word (.docx)")
+        st.info("Para habilitar soporte PDF, instala: pip install PyPDF2 pdfplumber")
+
+    tipos_archivo = ["docx"]
+    if PDF_AVAILABLE:
+        tipos_archivo.append("pdf")
+
+    modo = st.radio("Modo de calificación:", [MODO_INDIVIDUAL, MODO_LOTE, MODO_REGISTRO], horizontal=True)
+
+    if modo == MODO_REGISTRO:
+        documento_file = None
+        archivos_lote = []
+    elif modo == MODO_INDIVIDUAL:
+        documento_file = st.file_uploader(
+            "Carga el archivo (Word .docx" + (" o PDF)" if PDF_AVAILABLE else " solamente)"), 
+            type=tipos_archivo
+        )
+        archivos_lote = []
+    else:
+        documento_file = None
+        archivos_lote = st.file_uploader(
+            "Carga las entregas (.docx" + (", .pdf" if PDF_AVAILABLE else "") + ") o el ZIP exportado del LMS",
+            type=tipos_archivo + ["zip"],
+            accept_multiple_files=True
+        )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        usar_expresiones_fijas = st.checkbox("📋 Usar expresiones predefinidas", value=True)
+    with col2:
+        excel_file = None
+        if not usar_expresiones_fijas:
+            origen_expresiones = st.radio("Origen de las expresiones:", [ORIGEN_EXCEL, ORIGEN_CONJUNTOS], horizontal=True)
+            if origen_expresiones == ORIGEN_EXCEL:
+                excel_file = st.file_uploader("📊 Carga archivo Excel personalizado", type=["xlsx"])
+
+    if usar_expresiones_fijas:
+        with st.expander("📝 Ver expresiones predefinidas que se evaluarán"):
+            for i, expr in enumerate(EXPRESIONES_FIJAS):
+                st.write(f"{chr(97+i)}) {expr}")
+        cadenas_busqueda = EXPRESIONES_FIJAS
+    elif origen_expresiones == ORIGEN_CONJUNTOS:
+        cadenas_busqueda = definir_cadenas_por_conjuntos()
+    else:
+        cadenas_busqueda = []
+
+    clave_lista = usar_expresiones_fijas or excel_file or bool(cadenas_busqueda)
+
+    tolerante = st.checkbox("🔤 Tolerar errores de escritura en las expresiones", key="r3md_tolerante",
+                            help="Acepta, por ejemplo, «BnC» por «B ∩ C» o «A^c» por «A ′» "
+                                 f"(hasta {TOLERANCIA_EXPRESIONES} caracteres de diferencia) si el conjunto es exactamente el esperado")
+    tolerancia = TOLERANCIA_EXPRESIONES if tolerante else 0
+
+    resultado = None
+
+    # Las expresiones se conocen antes de leer el documento para poder detener
+    # la extracción en cuanto todas aparecen
+    if (documento_file or archivos_lote or modo == MODO_REGISTRO) and not usar_expresiones_fijas and excel_file:
+        try:
+            cadenas_busqueda = seleccionar_cadenas_excel(excel_file)
+        except Exception as e:
+            st.error(f"❌ Error al leer el archivo Excel: {str(e)}")
+
+    if documento_file:
+        try:
+            if documento_file.name.lower().endswith('.pdf'):
+                if not PDF_AVAILABLE:
+                    st.error("❌ No se pueden procesar archivos PDF. Instala las librerías necesarias: pip install PyPDF2 pdfplumber")
+                    st.stop()
+                st.info("📄 Procesando archivo PDF...")
+            else:
+                st.info("📄 Procesando archivo Word...")
+            # Mientras no cambien el documento ni la clave de respuestas, se reutiliza la calificación
+            if MEMORIA_ACOTADA:
+                huella_documento = huella_archivo(documento_file)
+
+                def calificar_documento():
+                    with copia_en_disco(documento_file, documento_file.name) as archivo:
+                        return calificar_r3md(documento_file.name, archivo, cadenas_busqueda, tolerancia)
+            else:
+                datos_documento = documento_file.getvalue()
+                huella_documento = huella_bytes(datos_documento)
+
+                def calificar_documento():
+                    return calificar_r3md(documento_file.name, datos_documento, cadenas_busqueda, tolerancia)
+            huella = (documento_file.name, huella_documento, huella_bytes("\n".join(cadenas_busqueda).encode("utf-8")), tolerancia)
+            resultado = memorizar("r3md_resultado", huella, calificar_documento)
+            texto_completo = resultado.texto
+            
+            with st.expander("👁️ Ver texto extraído (primeros 500 caracteres)"):
+                st.text(texto_completo[:500] + "..." if len(texto_completo) > 500 else texto_completo)
+            if resultado.aviso:
+                st.warning(f"⚠️ {resultado.aviso}. Revisa a mano las respuestas que no se encontraron.")
+            elif not resultado.completo:
+                st.caption("⏩ Se dejó de leer el documento: todas las expresiones ya se habían encontrado")
+
+        except Exception as e:
+            st.error(f"❌ Error leyendo el documento: {str(e)}")
+
+    if resultado is not None and clave_lista:
+        try:
+            if cadenas_busqueda:
+                st.success(f"✅ Total de expresiones a evaluar: {len(cadenas_busqueda)}")
+                st.info(f"🎯 Coincidencias encontradas: {len(resultado.coincidencias)}")
+                if resultado.no_encontradas:
+                    st.warning(f"⚠️ No encontradas: {len(resultado.no_encontradas)}")
+                if resultado.aproximadas:
+                    with st.expander(f"🔤 Aceptadas con errores de escritura: {len(resultado.aproximadas)}"):
+                        for i, linea in resultado.aproximadas.items():
+                            st.write(f"{chr(97+i)}) {cadenas_busqueda[i]} ← «{linea}»")
+
+                mensaje_limpio = resultado.mensaje
+                st.text_area("📝 Mensaje final generado para copiar:", value=mensaje_limpio, height=300)
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    if st.button("📋 Copiar al portapapeles", type="primary"):
+                        components.html(copy_to_clipboard_js(mensaje_limpio), height=0)
+                        st.success("✅ ¡Texto copiado al portapapeles!")
+                
+                with col2:
+                    st.download_button("📥 Descargar mensaje como TXT", 
+                                     data=mensaje_limpio, 
+                                     file_name=f"retro_{resultado.nombre}.txt")
+
+        except Exception as e:
+            st.error(f"❌ Error al procesar los archivos: {str(e)}")
+
+    if archivos_lote and clave_lista:
+        try:
+            if cadenas_busqueda:
+                mostrar_lote_r3md(archivos_lote, cadenas_busqueda, tolerancia)
+        
+        except Exception as e:
+            st.error(f"❌ Error al procesar el lote: {str(e)}")
+
+    if modo == MODO_REGISTRO:
+        try:
+            mostrar_registro_r3md(cadenas_busqueda, tolerancia)
+        except Exception as e:
+            st.error(f"❌ Error al consultar el registro: {str(e)}")
+
+    filas_motores = estadisticas_motores.como_filas()
+    if filas_motores:
+        with st.expander("⚙️ Rendimiento de los motores PDF"):
+            st.caption("Cada página se lee primero con el motor más rápido; solo se recurre al siguiente si la página quedó "
+                       "vacía o trae ecuaciones a medias (un '=' sin conjunto o al revés).")
+            tasa_respaldo = estadisticas_motores.tasa_respaldo()
+            if tasa_respaldo is not None:
+                st.caption(f"Páginas que necesitaron un motor de respaldo: {tasa_respaldo:.1%}")
+            st.dataframe(pd.DataFrame(filas_motores), hide_index=True)
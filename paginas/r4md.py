@@ -0,0 +1,246 @@
+"""R4MD - Proposiciones lógicas: mensajes para los alumnos pendientes del Excel de calificaciones."""
+import pandas as pd
+import streamlit as st
+import streamlit.components.v1 as components
+
+from calificador.exportar import huella_tabla, mensajes_a_txt, tabla_a_xlsx
+from calificador.r4md import (
+    MENSAJES_R4,
+    NOMBRES_COLUMNA_NOMBRE,
+    NOMBRES_COLUMNA_OBJETIVO,
+    ExportacionCalificaciones,
+    buscar_pendientes,
+    generar_mensajes_r4,
+)
+from calificador.registro import registro_calificaciones
+from calificador.retroalimentacion import documentos_r4
+from paginas.comun import (
+    MIME_XLSX,
+    copy_to_clipboard_js,
+    descarga_diferida,
+    descarga_retro,
+    fragmento,
+    huella_bytes,
+    memorizar,
+)
+
+MENSAJES_POR_PAGINA = [10, 25, 50]
+
+@fragmento
+def mostrar_mensajes_paginados(df_resultado):
+    """
+    Muestra solo la página visible de mensajes (filtrada por nombre). Las llaves de
+    los widgets usan el número de fila del alumno, así que no cambian al paginar o buscar.
+    """
+    col_busqueda, col_tamano = st.columns([3, 1])
+    with col_busqueda:
+        busqueda = st.text_input("🔎 Buscar alumno", key="r4_busqueda").strip()
+    with col_tamano:
+        por_pagina = st.selectbox("Mensajes por página", MENSAJES_POR_PAGINA, key="r4_por_pagina")
+
+    visibles = df_resultado
+    if busqueda:
+        visibles = df_resultado[df_resultado['Nombre'].str.contains(busqueda, case=False, regex=False)]
+    if visibles.empty:
+        st.warning(f"⚠️ Ningún alumno coincide con '{busqueda}'")
+        return
+
+    paginas = (len(visibles) - 1) // por_pagina + 1
+    # Al buscar o cambiar el tamaño puede haber menos páginas que la seleccionada
+    if st.session_state.get("r4_pagina", 1) > paginas:
+        st.session_state["r4_pagina"] = paginas
+    pagina = st.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas, step=1, key="r4_pagina")
+    inicio = (pagina - 1) * por_pagina
+    fin = min(inicio + por_pagina, len(visibles))
+    st.caption(f"Mostrando {inicio + 1}–{fin} de {len(visibles)} mensajes")
+
+    for i, nombre, mensaje_completo in visibles.iloc[inicio:fin].itertuples():
+        # Mostrar cada mensaje con su botón individual
+        with st.container():
+            st.markdown(f"**{i+1}. {nombre}**")
+            
+            # Mostrar el mensaje en un área de texto pequeña
+            st.text_area(
+                f"Mensaje para {nombre}:", 
+                value=mensaje_completo, 
+                height=120, 
+                key=f"mensaje_{i}",
+                label_visibility="collapsed"
+            )
+            
+            # Botón para copiar mensaje individual (solo se vuelve a ejecutar este fragmento)
+            if st.button(f"📋 Copiar mensaje de {nombre}", key=f"copy_individual_{i}"):
+                components.html(copy_to_clipboard_js(mensaje_completo), height=0)
+                st.success(f"✅ ¡Mensaje de {nombre} copiado!")
+            
+            st.markdown("---")
+
+def guardar_mensajes_r4(huella_excel, df_resultado):
+    """Guarda los mensajes de este Excel en el registro, una sola vez por sesión"""
+    memorizar("r4md_registro", huella_excel,
+              lambda: registro_calificaciones.guardar_mensajes_r4(huella_excel, df_resultado))
+
+def al_entregar(huella_excel, df_resultado, construir):
+    """construir() de una descarga que además registra los mensajes: solo cuentan los que se entregan"""
+    def construir_y_guardar():
+        guardar_mensajes_r4(huella_excel, df_resultado)
+        return construir()
+    return construir_y_guardar
+
+def leer_exportacion(archivo):
+    """Encabezados y, si está la columna objetivo, los pendientes (una sola pasada por bloques)"""
+    exportacion = ExportacionCalificaciones(archivo, archivo.name)
+    pendientes = buscar_pendientes(exportacion) if exportacion.columna_objetivo else None
+    return exportacion, pendientes
+
+def mostrar_r4md():
+    st.title("🧠 R4MD - Proposiciones Lógicas")
+    
+    excel_file = st.file_uploader("📊 Carga el archivo Excel o CSV", type=["xlsx", "csv"])
+    
+    if excel_file:
+        try:
+            # Las columnas se buscan de manera flexible en el encabezado y solo esas se leen,
+            # por bloques: de cada bloque se guardan solo los nombres de los alumnos con "-".
+            # El archivo solo se vuelve a leer si se carga otro, no en cada clic
+            huella_excel = huella_bytes(excel_file.getvalue())
+            exportacion, pendientes = memorizar("r4md_calificaciones", huella_excel,
+                                                lambda: leer_exportacion(excel_file))
+            encabezados = exportacion.encabezados
+            columna_objetivo = exportacion.columna_objetivo
+            columna_nombre = exportacion.columna_nombre
+            
+            # Mostrar información del archivo
+            if pendientes is not None:
+                st.info(f"📋 Archivo cargado: {pendientes.filas} filas, {len(encabezados)} columnas")
+            
+            # Mostrar columnas disponibles
+            with st.expander("👁️ Ver columnas disponibles"):
+                st.write(encabezados)
+            
+            if columna_objetivo:
+                st.success(f"✅ Columna objetivo encontrada: '{columna_objetivo}'")
+                
+                if pendientes.con_guion > 0:
+                    st.info(f"🔍 Encontradas {pendientes.con_guion} filas con '-'")
+                    
+                    if columna_nombre:
+                        st.success(f"✅ Columna nombre encontrada: '{columna_nombre}'")
+                        
+                        # Nombres ya limpios (sin espacios extra, NaN, etc.)
+                        nombres_limpios = pendientes.nombres
+                        
+                        if nombres_limpios:
+                            # Crear mensajes balanceados (estructura nombre|mensaje para el Excel)
+                            df_resultado = generar_mensajes_r4(nombres_limpios)
+                            mensajes_finales = df_resultado['Mensaje'].tolist()
+                            
+                            # Aquí solo se consulta el registro; los mensajes se guardan al copiarlos o
+                            # al generar una descarga, no cada vez que se dibuja la página
+                            previos = memorizar("r4md_previos", huella_excel,
+                                                lambda: registro_calificaciones.alumnos_r4_con_mensaje(
+                                                    nombres_limpios, excepto_excel=huella_excel))
+                            if previos:
+                                st.info(f"🗂️ {len(previos)} de estos alumnos ya recibieron un mensaje de R4MD con otro archivo")
+                                with st.expander("👁️ Ver quiénes"):
+                                    st.write(previos)
+                            
+                            st.markdown("---")
+                            st.subheader("📝 Mensajes Generados")
+                            
+                            mostrar_mensajes_paginados(df_resultado)
+                            
+                            st.success(f"✅ Procesados {len(mensajes_finales)} mensajes")
+                            
+                            # Mostrar DataFrame resultado
+                            st.subheader("📊 Vista previa del Excel")
+                            st.dataframe(df_resultado)
+                            
+                            # Botones principales
+                            col1, col2, col3 = st.columns(3)
+                            
+                            with col1:
+                                # Copiar todos los mensajes (solo el contenido, sin nombres)
+                                texto_todos_mensajes = "\n\n".join(mensajes_finales)
+                                if st.button("📋 Copiar TODOS los mensajes", type="primary"):
+                                    guardar_mensajes_r4(huella_excel, df_resultado)
+                                    components.html(copy_to_clipboard_js(texto_todos_mensajes), height=0)
+                                    st.success("✅ ¡Todos los mensajes copiados!")
+                            
+                            # Los archivos se generan solo al pedirlos y se reutilizan mientras no cambien los mensajes
+                            huella = huella_tabla(df_resultado)
+                            
+                            with col2:
+                                # Descargar Excel con estructura nombre|mensaje
+                                descarga_diferida("Excel", "r4md_xlsx", huella,
+                                                  al_entregar(huella_excel, df_resultado,
+                                                              lambda: tabla_a_xlsx(df_resultado, "Mensajes_R4")),
+                                                  "mensajes_r4.xlsx", MIME_XLSX)
+                            
+                            with col3:
+                                # Descargar solo mensajes como TXT
+                                descarga_diferida("mensajes TXT", "r4md_txt", huella,
+                                                  al_entregar(huella_excel, df_resultado,
+                                                              lambda: mensajes_a_txt(mensajes_finales)),
+                                                  "mensajes_r4.txt", "text/plain")
+                            
+                            # Un archivo por alumno para subirlos en bloque al LMS
+                            descarga_retro("r4md_retro", huella,
+                                           al_entregar(huella_excel, df_resultado, lambda: documentos_r4(df_resultado)),
+                                           "retroalimentacion_r4md.zip")
+                            
+                            # Mostrar distribución de mensajes
+                            with st.expander("📊 Distribución de mensajes"):
+                                total = len(mensajes_finales)
+                                for i in range(min(total, len(MENSAJES_R4))):
+                                    # El reparto es rotativo: la plantilla i se usa una vez por cada vuelta completa
+                                    cantidad = total // len(MENSAJES_R4) + (1 if i < total % len(MENSAJES_R4) else 0)
+                                    st.write(f"Mensaje {i + 1}: {cantidad} veces")
+                        
+                        else:
+                            st.warning("⚠️ No se encontraron nombres válidos en las filas con '-'")
+                    
+                    else:
+                        st.error(f"❌ No se encontró ninguna columna de nombres")
+                        st.write("**Columnas buscadas:** ", NOMBRES_COLUMNA_NOMBRE)
+                        st.write("**Columnas disponibles:** ", encabezados)
+                        
+                        # Sugerir columnas similares
+                        st.write("**💡 Sugerencias de columnas que podrían contener nombres:**")
+                        for col in encabezados:
+                            if any(palabra in col.lower() for palabra in ['nombre', 'name', 'alumno', 'estudiante']):
+                                st.write(f"   - {col}")
+                
+                else:
+                    st.warning("⚠️ No se encontraron filas con '-' en la columna objetivo")
+                    
+                    # Mostrar valores únicos de la columna objetivo para debug
+                    with st.expander("🔍 Ver valores únicos en la columna objetivo"):
+                        valores_unicos = pd.Series(pendientes.valores, dtype=int).sort_values(ascending=False)
+                        st.write(valores_unicos)
+            
+            else:
+                st.error(f"❌ No se encontró la columna objetivo")
+                st.write("**Columnas buscadas:** ", NOMBRES_COLUMNA_OBJETIVO)
+                st.write("**Columnas disponibles:** ", encabezados)
+                
+                # Sugerir columnas similares
+                st.write("**💡 Sugerencias de columnas que podrían ser la objetivo:**")
+                for col in encabezados:
+                    if any(palabra in col.lower() for palabra in ['tarea', 'r4', 'proposiciones', 'logicas']):
+                        st.write(f"   - {col}")
+        
+        except Exception as e:
+            st.error(f"❌ Error al procesar el archivo: {str(e)}")
+    
+    with st.expander("🗂️ Mensajes de R4MD ya generados"):
+        busqueda = st.text_input("Buscar por nombre", key="r4_historial_busqueda")
+        try:
+            historial = registro_calificaciones.mensajes_r4(busqueda)
+        except Exception as e:
+            st.error(f"❌ Error al consultar el registro: {str(e)}")
+            historial = []
+        if historial:
+            st.dataframe(pd.DataFrame(historial), use_container_width=True)
+        else:
+            st.info("No hay mensajes guardados" + (" para esa búsqueda" if busqueda else ""))
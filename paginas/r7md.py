@@ -0,0 +1,83 @@
+"""R7MD - Mensajes predefinidos para copiar. No depende de pandas ni de las librerías de documentos."""
+import streamlit as st
+import streamlit.components.v1 as components
+
+from calificador.plantillas import banco_plantillas
+from paginas.comun import copy_to_clipboard_js, fragmento
+
+def separar_etiquetas(texto):
+    return [e.strip() for e in texto.split(",") if e.strip()]
+
+@fragmento
+def mostrar_plantillas():
+    """
+    Búsqueda en el banco de plantillas: al escribir o filtrar solo se vuelve a ejecutar
+    este fragmento y solo se dibujan las mejores coincidencias, no toda la biblioteca.
+    """
+    col_busqueda, col_actividad = st.columns([3, 1])
+    with col_busqueda:
+        busqueda = st.text_input("🔎 Buscar plantilla", key="r7_busqueda",
+                                 placeholder="Palabras del título, del texto o de las etiquetas (p. ej. hasse transitivas)")
+    with col_actividad:
+        actividades = [None] + banco_plantillas.actividades()
+        # Una actividad o etiqueta elegida puede haber desaparecido al eliminar plantillas
+        if st.session_state.get("r7_actividad") not in actividades:
+            st.session_state["r7_actividad"] = None
+        actividad = st.selectbox("Actividad", actividades, key="r7_actividad",
+                                 format_func=lambda a: "Todas" if a is None else a)
+    etiquetas_disponibles = [etiqueta for etiqueta, _ in banco_plantillas.etiquetas(actividad)]
+    st.session_state["r7_etiquetas"] = [e for e in st.session_state.get("r7_etiquetas", []) if e in etiquetas_disponibles]
+    etiquetas = st.multiselect("🏷️ Etiquetas (criterio de la rúbrica, corregir/correcto...)", etiquetas_disponibles,
+                               key="r7_etiquetas")
+
+    plantillas, total = banco_plantillas.buscar(busqueda, etiquetas, actividad)
+    if not plantillas:
+        st.warning("⚠️ Ninguna plantilla coincide con la búsqueda")
+        return
+    st.caption(f"Mostrando {len(plantillas)} de {total} plantillas"
+               + (" · escribe más palabras o elige etiquetas para afinar" if total > len(plantillas) else ""))
+
+    for i, plantilla in enumerate(plantillas):
+        # Las llaves usan el id de la plantilla, así que no cambian al buscar
+        id_plantilla = plantilla["id"]
+        etiquetas_texto = " · ".join(plantilla["etiquetas"])
+        with st.expander(f"{plantilla['titulo']} — {plantilla['actividad']}" + (f" · {etiquetas_texto}" if etiquetas_texto else ""),
+                         expanded=i == 0):
+            st.text_area(plantilla["titulo"], value=plantilla["texto"], height=200, key=f"plantilla_{id_plantilla}",
+                         label_visibility="collapsed")
+            col_copiar, col_eliminar = st.columns([3, 1])
+            with col_copiar:
+                if st.button("📋 Copiar mensaje", key=f"copy_plantilla_{id_plantilla}"):
+                    components.html(copy_to_clipboard_js(plantilla["texto"]), height=0)
+                    st.success("✅ ¡Mensaje copiado!")
+            with col_eliminar:
+                # Se elimina antes de volver a dibujar, así ya no aparece en los resultados
+                st.button("🗑️ Eliminar", key=f"eliminar_plantilla_{id_plantilla}",
+                          on_click=banco_plantillas.eliminar, args=(id_plantilla,))
+
+    if len(plantillas) > 1 and st.button(f"📋 Copiar los {len(plantillas)} mensajes mostrados", type="secondary"):
+        todos = ("\n\n" + "=" * 50 + "\n\n").join(plantilla["texto"] for plantilla in plantillas)
+        components.html(copy_to_clipboard_js(todos), height=0)
+        st.success("✅ ¡Mensajes copiados!")
+
+def mostrar_r7md():
+    st.title("💬 R7MD - Mensajes Predefinidos")
+
+    # Antes de la búsqueda, para que una plantilla recién guardada ya aparezca en los resultados
+    with st.expander("➕ Agregar plantilla"):
+        with st.form("r7_nueva_plantilla", clear_on_submit=True):
+            titulo = st.text_input("Título")
+            actividad = st.text_input("Actividad", value="R7MD")
+            etiquetas = st.text_input("Etiquetas separadas por comas", placeholder="corregir, diagrama de Hasse")
+            texto = st.text_area("Mensaje", height=200)
+            if st.form_submit_button("💾 Guardar plantilla", type="primary"):
+                if not titulo.strip() or not texto.strip() or not actividad.strip():
+                    st.error("❌ La plantilla necesita título, actividad y mensaje")
+                else:
+                    banco_plantillas.agregar(titulo, texto, actividad, separar_etiquetas(etiquetas))
+                    st.success(f"✅ Plantilla '{titulo.strip()}' guardada")
+
+    try:
+        mostrar_plantillas()
+    except Exception as e:
+        st.error(f"❌ Error al consultar el banco de plantillas: {str(e)}")
@@ -0,0 +1,17 @@
+"""
+Configuración común de las pruebas: el paquete se importa desde la raíz del repositorio
+y la caché de texto, el registro y el banco de plantillas apuntan a un directorio
+temporal, antes de que los módulos lean esas variables al importarse.
+"""
+import os
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+_DIRECTORIO = tempfile.mkdtemp(prefix="calificador-pruebas-")
+os.environ["CALIFICADOR_CACHE_DIR"] = os.path.join(_DIRECTORIO, "cache")
+os.environ["CALIFICADOR_REGISTRO"] = os.path.join(_DIRECTORIO, "registro.sqlite3")
+os.environ["CALIFICADOR_PLANTILLAS"] = os.path.join(_DIRECTORIO, "plantillas.sqlite3")
+os.environ.pop("CALIFICADOR_MEMORIA_ACOTADA", None)
@@ -0,0 +1,75 @@
+import pytest
+
+from calificador.algebra import (
+    EXPRESIONES_R3MD,
+    MAXIMO_ELEMENTO_MASCARA,
+    conjunto_a_mascara,
+    evaluar,
+    forma_canonica,
+    formatear_conjunto,
+    generar_clave,
+    mascara,
+    mascara_a_lista,
+    parsear_definiciones,
+)
+from calificador.r3md import EXPRESIONES_FIJAS
+
+DEFINICIONES = """U = {1,...,14}
+A = {2,4,6,8,10,12,14}
+B = {1,2,3,5,8,13}
+C = {1,2,4,6,7,10,11,13}"""
+
+@pytest.mark.parametrize("variantes", [
+    ["B ∩ C", "C Ո B", "(b∩c)", "((B)) ∩ C"],
+    ["A ∪ (B ∪ C)", "(C ∪ A) ∪ B", "B Ս C Ս A"],
+    ["C – B ′", "C - B'", "C − B´", "C -- B ′", "C \\ B′"],
+])
+def test_forma_canonica_iguala_variantes(variantes):
+    formas = {forma_canonica(variante) for variante in variantes}
+    assert len(formas) == 1 and None not in formas
+
+def test_forma_canonica_respeta_orden_y_precedencia():
+    assert forma_canonica("B ∩ C") == "∩(B,C)"
+    assert forma_canonica("B – A") != forma_canonica("A – B")
+    # ∩ va antes que ∪ y el complemento solo toca lo que lo antecede
+    assert forma_canonica("A ∪ B ∩ C") == forma_canonica("A ∪ (B ∩ C)") != forma_canonica("(A ∪ B) ∩ C")
+    assert forma_canonica("A ∩ B ′") == "∩(A,′(B))"
+    assert forma_canonica("(A ∩ B) ′") == "′(∩(A,B))"
+
+@pytest.mark.parametrize("expresion", ["A ∩", "∪ B", "(A ∪ B", "A ∪ B)", "A $ B", "A ′ ′ ("])
+def test_forma_canonica_de_expresion_mal_formada(expresion):
+    assert forma_canonica(expresion) is None
+    with pytest.raises(ValueError):
+        evaluar(expresion, parsear_definiciones(DEFINICIONES))
+
+def test_evaluar_con_mascaras():
+    conjuntos = parsear_definiciones(DEFINICIONES)
+    assert mascara_a_lista(conjuntos["U"]) == list(range(1, 15))
+    assert mascara_a_lista(evaluar("A ∪ B ∩ C", conjuntos)) == [1, 2, 4, 6, 8, 10, 12, 13, 14]
+    assert mascara_a_lista(evaluar("B – A – C", conjuntos)) == [3, 5]
+    # El universo se puede dar aparte de los conjuntos
+    assert mascara_a_lista(evaluar("A ′", conjuntos, universo=mascara(range(1, 6)))) == [1, 3, 5]
+
+def test_generar_clave_da_las_expresiones_fijas():
+    assert generar_clave(parsear_definiciones(DEFINICIONES), EXPRESIONES_R3MD) == EXPRESIONES_FIJAS
+
+@pytest.mark.parametrize("texto, mensaje", [
+    ("A = {1,2}", "universo"),
+    ("U = {1,2}; 1A = {1}", "Definición inválida"),
+    ("U = ", "Definición inválida"),
+])
+def test_parsear_definiciones_invalidas(texto, mensaje):
+    with pytest.raises(ValueError, match=mensaje):
+        parsear_definiciones(texto)
+
+def test_parsear_definiciones_con_rangos_y_punto_y_coma():
+    conjuntos = parsear_definiciones("u = {1..3, 7}; a = {2,...,4}")
+    assert mascara_a_lista(conjuntos["U"]) == [1, 2, 3, 7]
+    assert mascara_a_lista(conjuntos["A"]) == [2, 3, 4]
+
+def test_conjunto_a_mascara_con_numeros_grandes():
+    assert conjunto_a_mascara(["13", "2", "1"]) == mascara([1, 2, 13])
+    grande = conjunto_a_mascara([1, MAXIMO_ELEMENTO_MASCARA + 1])
+    assert grande == frozenset({1, MAXIMO_ELEMENTO_MASCARA + 1})
+    assert formatear_conjunto(grande) == f"{{1,{MAXIMO_ELEMENTO_MASCARA + 1}}}"
+    assert formatear_conjunto(mascara([])) == "{}"
@@ -0,0 +1,34 @@
+import random
+
+import pytest
+
+from calificador.arbol_bk import ArbolBK, distancia_edicion
+
+@pytest.mark.parametrize("a, b, distancia", [
+    ("", "", 0),
+    ("B∩C", "B∩C", 0),
+    ("BNC", "B∩C", 1),
+    ("", "A′", 2),
+    ("kitten", "sitting", 3),
+    ("C–B′", "B′–C", 4),
+])
+def test_distancia_edicion(a, b, distancia):
+    assert distancia_edicion(a, b) == distancia_edicion(b, a) == distancia
+
+def test_buscar_igual_que_fuerza_bruta():
+    azar = random.Random(7)
+    alfabeto = "ABCU∩∪–′()"
+    cadenas = {"".join(azar.choice(alfabeto) for _ in range(azar.randint(1, 8))) for _ in range(400)}
+    arbol = ArbolBK(cadenas)
+    assert len(arbol) == len(cadenas)
+    for _ in range(50):
+        consulta = "".join(azar.choice(alfabeto) for _ in range(azar.randint(1, 8)))
+        for radio in (0, 1, 2):
+            esperadas = sorted((d, c) for c in cadenas if (d := distancia_edicion(consulta, c)) <= radio)
+            assert arbol.buscar(consulta, radio) == esperadas
+
+def test_agregar_repetida_y_arbol_vacio():
+    arbol = ArbolBK()
+    assert arbol.buscar("A", 3) == []
+    assert arbol.agregar("A∩B") and not arbol.agregar("A∩B")
+    assert len(arbol) == 1
@@ -0,0 +1,112 @@
+import os
+
+import pytest
+
+from benchmarks.corpus import LINEAS_POR_PAGINA, escribir_docx, escribir_pdf
+from calificador import cache as modulo_cache
+from calificador.cache import CacheTexto, leer_entrega
+from calificador.motores_pdf import PDF_AVAILABLE
+from calificador.r3md import EXPRESIONES_FIJAS
+
+def entrega(tmp_path, extension, paginas_extra=0):
+    """Una página con todas las respuestas correctas y, si se pide, páginas de anexo después"""
+    lineas = ["Nombre completo: Ana López"]
+    for letra, expresion in zip("abcdefg", EXPRESIONES_FIJAS):
+        lineas += [f"{letra})", expresion]
+    if paginas_extra:
+        lineas += [""] * (LINEAS_POR_PAGINA - len(lineas))
+        lineas += ["Anexo sin respuestas"] * (paginas_extra * LINEAS_POR_PAGINA)
+    ruta = tmp_path / f"entrega{extension}"
+    (escribir_pdf if extension == ".pdf" else escribir_docx)(lineas, ruta)
+    return ruta.name, ruta.read_bytes()
+
+def archivos_cache(cache):
+    return [n for n in os.listdir(cache.directorio) if n.endswith(".txt")] if os.path.isdir(cache.directorio) else []
+
+@pytest.mark.parametrize("extension", [
+    pytest.param(".pdf", marks=pytest.mark.skipif(not PDF_AVAILABLE, reason="sin librerías de PDF")),
+    ".docx",
+])
+def test_entrega_correcta_completa_se_guarda_en_cache(tmp_path, extension):
+    cache = CacheTexto(str(tmp_path / "cache"))
+    nombre, datos = entrega(tmp_path, extension)
+
+    texto, _, completo, aviso = leer_entrega(nombre, datos, EXPRESIONES_FIJAS, cache)
+    assert completo and not aviso
+    assert len(archivos_cache(cache)) == 1
+
+    texto_cache, _, completo_cache, _ = leer_entrega(nombre, datos, EXPRESIONES_FIJAS, cache)
+    assert completo_cache and texto_cache == texto
+
+@pytest.mark.skipif(not PDF_AVAILABLE, reason="sin librerías de PDF")
+def test_lectura_detenida_antes_del_anexo_no_se_guarda(tmp_path):
+    cache = CacheTexto(str(tmp_path / "cache"))
+    nombre, datos = entrega(tmp_path, ".pdf", paginas_extra=2)
+
+    texto, _, completo, _ = leer_entrega(nombre, datos, EXPRESIONES_FIJAS, cache)
+    assert not completo
+    assert "Anexo sin respuestas" not in texto
+    assert archivos_cache(cache) == []
+
+def test_clave_depende_del_contenido_la_extension_y_la_version(tmp_path, monkeypatch):
+    cache = CacheTexto(str(tmp_path))
+    clave = cache.clave(b"datos", ".PDF")
+    assert clave == cache.clave(b"datos", ".pdf")
+    assert clave != cache.clave(b"datos", ".docx")
+    assert clave != cache.clave(b"otros", ".pdf")
+    monkeypatch.setattr(modulo_cache, "VERSION_EXTRACTOR", modulo_cache.VERSION_EXTRACTOR + 1)
+    assert clave != cache.clave(b"datos", ".pdf")
+
+def test_recortar_borra_primero_lo_menos_usado(tmp_path):
+    cache = CacheTexto(str(tmp_path), tamano_maximo=35)
+    for i, clave in enumerate(["vieja", "media", "nueva"]):
+        cache.guardar(clave, "x" * 10)
+        os.utime(os.path.join(cache.directorio, f"{clave}.txt"), (1000 + i, 1000 + i))
+    # Un acierto la vuelve la más reciente
+    assert cache.obtener("vieja") == "x" * 10
+    cache.guardar_bytes("nueva", ".firma", b"1" * 10)
+    assert cache.obtener("media") is None
+    assert cache.obtener("vieja") is not None and cache.obtener_bytes("nueva", ".firma") == b"1" * 10
+
+def test_directorio_que_no_se_puede_escribir(tmp_path):
+    archivo = tmp_path / "no_es_directorio"
+    archivo.write_text("")
+    cache = CacheTexto(str(archivo / "cache"))
+    cache.guardar("clave", "texto")
+    assert cache.obtener("clave") is None
+
+def test_extraer_texto_cacheado_no_vuelve_a_extraer(tmp_path, monkeypatch):
+    extraidos = []
+
+    def iterar_paginas(nombre_archivo, datos):
+        extraidos.append(nombre_archivo)
+        return iter([datos.decode()])
+
+    monkeypatch.setattr(modulo_cache, "iterar_paginas", iterar_paginas)
+    cache = CacheTexto(str(tmp_path))
+    assert modulo_cache.extraer_texto_cacheado("a.docx", b"texto", cache) == ("texto", "")
+    assert modulo_cache.extraer_texto_cacheado("copia.docx", b"texto", cache) == ("texto", "")
+    assert extraidos == ["a.docx"]
+
+RESPUESTAS = ["B ∩ C = {1,2,13}", "C´ = {3,5,8,9,12,14}"]
+
+def paginas_falsas(monkeypatch, paginas):
+    """Sustituye la extracción por un generador que registra cuántas páginas se pidieron"""
+    pedidas = []
+    def iterar_paginas(nombre_archivo, archivo):
+        for pagina in paginas:
+            pedidas.append(pagina)
+            yield pagina
+    monkeypatch.setattr(modulo_cache, "iterar_paginas", iterar_paginas)
+    return pedidas
+
+def test_bloques_sin_contar_paginas_se_detienen_tras_pedir_uno_mas(tmp_path, monkeypatch):
+    cache = CacheTexto(str(tmp_path / "cache"))
+    pedidas = paginas_falsas(monkeypatch, ["\n".join(RESPUESTAS), "Anexo 1", "Anexo 2", "Anexo 3"])
+
+    texto, _, completo, _ = leer_entrega("entrega.docx", b"docx", RESPUESTAS, cache)
+    assert not completo
+    # Solo se pidió la página siguiente para saber que el documento seguía
+    assert len(pedidas) == 2
+    assert "Anexo 2" not in texto
+    assert archivos_cache(cache) == []
@@ -0,0 +1,62 @@
+import io
+
+import pytest
+from docx import Document
+
+from benchmarks.bench import cargar_corpus
+from calificador.calificacion import calificar_r3md
+from calificador.motores_pdf import PDF_AVAILABLE
+from calificador.r3md import EXPRESIONES_FIJAS, TOLERANCIA_EXPRESIONES
+
+def entrega_docx(expresiones, nombre="Ana López"):
+    """Bytes de un .docx con el nombre y una expresión por inciso, separados por saltos de línea"""
+    lineas = [f"Nombre completo: {nombre}"]
+    for letra, expresion in zip("abcdefg", expresiones):
+        lineas += [f"{letra})", expresion]
+    documento = Document()
+    documento.add_paragraph("\n".join(lineas))
+    salida = io.BytesIO()
+    documento.save(salida)
+    return salida.getvalue()
+
+def test_entrega_correcta():
+    resultado = calificar_r3md("ana.docx", entrega_docx(EXPRESIONES_FIJAS))
+    assert resultado.todo_correcto and resultado.completo
+    assert resultado.nombre == "Ana"
+    assert resultado.coincidencias == EXPRESIONES_FIJAS and not resultado.videos
+
+def test_entrega_con_un_inciso_incorrecto():
+    expresiones = EXPRESIONES_FIJAS[:6] + ["C – B ′ = {1,2}"]
+    resultado = calificar_r3md("beto.docx", entrega_docx(expresiones, "Beto Ruiz"))
+    assert resultado.indices_incorrectos == [6]
+    assert resultado.no_encontradas == [EXPRESIONES_FIJAS[6]]
+    assert resultado.videos and "Beto" in resultado.mensaje
+
+def test_encabezado_sembrado_con_archivo_y_nombre():
+    datos = entrega_docx(EXPRESIONES_FIJAS, "Ana López")
+    mensajes = {calificar_r3md(f"ana_{i}.docx", datos).mensaje.split("\n")[0] for i in range(20)}
+    assert len(mensajes) > 1
+    assert calificar_r3md("ana_0.docx", datos).mensaje == calificar_r3md("ana_0.docx", datos).mensaje
+
+@pytest.fixture(scope="module")
+def corpus(tmp_path_factory):
+    documentos, esperados = cargar_corpus(str(tmp_path_factory.mktemp("corpus")), 24, semilla=5)
+    if not PDF_AVAILABLE:
+        documentos = [(archivo, datos) for archivo, datos in documentos if archivo.endswith(".docx")]
+    return documentos, esperados
+
+@pytest.mark.parametrize("tolerancia", [0, TOLERANCIA_EXPRESIONES])
+def test_calificacion_igual_al_manifiesto_del_corpus(corpus, tolerancia):
+    documentos, esperados = corpus
+    for archivo, datos in documentos:
+        resultado = calificar_r3md(archivo, datos, tolerancia=tolerancia)
+        assert resultado.indices_incorrectos == esperados[archivo], archivo
+        assert resultado.nombre
+        assert resultado.todo_correcto == (not esperados[archivo])
+        if resultado.indices_incorrectos:
+            assert resultado.videos and resultado.nombre in resultado.mensaje
+
+def test_corpus_mezcla_formatos_y_errores(corpus):
+    documentos, esperados = corpus
+    assert {archivo[-4:] for archivo, _ in documentos} == ({".pdf", "docx"} if PDF_AVAILABLE else {"docx"})
+    assert any(esperados.values()) and not all(esperados.values())
@@ -0,0 +1,107 @@
+import io
+import zipfile
+
+import pandas as pd
+import pytest
+
+from calificador.hojas import iterar_bloques, leer_encabezados
+
+LIBRO = """<?xml version="1.0" encoding="UTF-8"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+ xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets><sheet name="Hoja" sheetId="1" r:id="rId1"/></sheets></workbook>"""
+RELACIONES = """<?xml version="1.0" encoding="UTF-8"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="worksheet" Target="worksheets/hoja.xml"/></Relationships>"""
+TEXTOS = """<?xml version="1.0" encoding="UTF-8"?>
+<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<si><t>Nombre</t></si><si><t>Calificación</t></si><si><r><t>Ana </t></r><r><t>López</t></r></si>
+<si><t>Luis &amp; Eva</t></si></sst>"""
+
+def xlsx_a_mano(renglones):
+    """Libro mínimo con la hoja escrita a mano, como lo generan otras herramientas distintas de Excel"""
+    hoja = ('<?xml version="1.0" encoding="UTF-8"?>'
+            "<worksheet xmlns='http://schemas.openxmlformats.org/spreadsheetml/2006/main'><sheetData>"
+            + "".join(renglones) + "</sheetData></worksheet>")
+    contenido = io.BytesIO()
+    with zipfile.ZipFile(contenido, "w") as zf:
+        zf.writestr("xl/workbook.xml", LIBRO)
+        zf.writestr("xl/_rels/workbook.xml.rels", RELACIONES)
+        zf.writestr("xl/sharedStrings.xml", TEXTOS)
+        zf.writestr("xl/worksheets/hoja.xml", hoja)
+    contenido.seek(0)
+    return contenido
+
+def leer(archivo, nombre, columnas, filas_por_bloque=2):
+    bloques = list(iterar_bloques(archivo, nombre, columnas, filas_por_bloque))
+    assert all(len(bloque) <= filas_por_bloque for bloque in bloques)
+    return pd.concat(bloques, ignore_index=True) if bloques else pd.DataFrame(columns=columnas)
+
+def test_xlsx_de_openpyxl_igual_que_pandas(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    libro = openpyxl.Workbook()
+    hoja = libro.active
+    hoja.append(["Id", "Nombre", None, "Mensaje"])
+    for i in range(7):
+        hoja.append([i, f"Alumno {i}", "x", None if i == 3 else f"Hola <{i}> & adiós"])
+    ruta = tmp_path / "lista.xlsx"
+    libro.save(ruta)
+
+    assert leer_encabezados(str(ruta), ruta.name) == ["Id", "Nombre", "Unnamed: 2", "Mensaje"]
+    leido = leer(str(ruta), ruta.name, ["Nombre", "Mensaje"])
+    esperado = pd.read_excel(ruta, usecols=["Nombre", "Mensaje"], dtype=object)
+    assert leido["Nombre"].tolist() == esperado["Nombre"].tolist()
+    assert leido["Mensaje"].tolist() == [None if pd.isna(v) else v for v in esperado["Mensaje"]]
+
+def test_xlsx_con_atributos_en_otro_orden_y_comillas_simples():
+    archivo = xlsx_a_mano([
+        '<row r="1"><c t="s" r="A1"><v>0</v></c><c r=\'B1\' t=\'s\'><v>1</v></c></row>',
+        # Un renglón que solo tiene la columna B no debe tomarse como encabezado
+        '<row r="2"><c r="B2"><v>10</v></c></row>',
+        "<row r='3'><c t='s' r='A3'><v>2</v></c><c r='B3'><v>9.5</v></c></row>",
+        '<row r="4"><c t="inlineStr" r="A4"><is><t>Sofía &lt;3</t></is></c><c r="B4"/></row>',
+        # Celdas sin referencia: van una después de otra desde la columna A
+        '<row><c t="s"><v>3</v></c><c><v>7</v></c></row>',
+    ])
+    assert leer_encabezados(archivo, "lista.xlsx") == ["Nombre", "Calificación"]
+    leido = leer(archivo, "lista.xlsx", ["Calificación", "Nombre"])
+    assert leido.to_dict("records") == [
+        {"Calificación": "10", "Nombre": None},
+        {"Calificación": "9.5", "Nombre": "Ana López"},
+        {"Calificación": None, "Nombre": "Sofía <3"},
+        {"Calificación": "7", "Nombre": "Luis & Eva"},
+    ]
+
+def test_titulos_con_espacios_y_renglones_sin_las_columnas_pedidas_igual_en_csv_y_xlsx(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    renglones = [["Nombre ", " Correo", "Grupo"], ["Ana", "ana@uni.mx", "A"], [None, None, "B"], ["Eva", None, "A"]]
+    libro = openpyxl.Workbook()
+    for renglon in renglones:
+        libro.active.append(renglon)
+    libro.save(tmp_path / "lista.xlsx")
+    (tmp_path / "lista.csv").write_text("\n".join(",".join(c or "" for c in r) for r in renglones) + "\n")
+
+    for nombre in ("lista.csv", "lista.xlsx"):
+        ruta = str(tmp_path / nombre)
+        assert leer_encabezados(ruta, nombre) == ["Nombre", "Correo", "Grupo"]
+        leido = leer(ruta, nombre, ["Nombre", "Correo"])
+        assert leido.astype(object).where(leido.notna(), None).to_dict("records") == [
+            {"Nombre": "Ana", "Correo": "ana@uni.mx"},
+            {"Nombre": None, "Correo": None},
+            {"Nombre": "Eva", "Correo": None},
+        ], nombre
+
+def test_xlsx_sin_renglones():
+    archivo = xlsx_a_mano([])
+    assert leer_encabezados(archivo, "vacia.xlsx") == []
+
+def test_csv_por_bloques_con_separador_y_codificacion_de_excel(tmp_path):
+    ruta = tmp_path / "lista.csv"
+    ruta.write_bytes("Nombre;Calificación\nJosé;9\nAna;10\nEva;8\n".encode("cp1252"))
+    assert leer_encabezados(str(ruta), ruta.name) == ["Nombre", "Calificación"]
+    leido = leer(str(ruta), ruta.name, ["Nombre"])
+    assert leido["Nombre"].tolist() == ["José", "Ana", "Eva"]
+
+def test_formato_no_soportado():
+    with pytest.raises(ValueError, match="Formato no soportado"):
+        leer_encabezados(io.BytesIO(b""), "lista.ods")
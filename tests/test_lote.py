@@ -0,0 +1,78 @@
+import io
+import os
+import threading
+import zipfile
+
+import pytest
+
+from calificador.lote import ejecutar_lote, expandir_entregas, nombre_desde_ruta
+from calificador.temporales import ArchivoEnDisco, borrar_temporales
+
+CARPETA = "Ana López_123_assignsubmission_file_"
+
+def zip_del_lms():
+    """ZIP como el que descarga Moodle, con los archivos que se deben descartar"""
+    contenido = io.BytesIO()
+    with zipfile.ZipFile(contenido, "w") as zf:
+        zf.writestr(f"{CARPETA}/", "")
+        zf.writestr(f"{CARPETA}/reto.PDF", b"pdf de Ana")
+        zf.writestr(f"__MACOSX/{CARPETA}/._reto.PDF", b"metadatos")
+        zf.writestr("Beto Ruiz_456_assignsubmission_file_/~$reto.docx", b"bloqueo de Word")
+        zf.writestr("Beto Ruiz_456_assignsubmission_file_/reto.docx", b"docx de Beto")
+        zf.writestr("Beto Ruiz_456_assignsubmission_file_/notas.txt", b"texto")
+    return contenido.getvalue()
+
+def test_expandir_entregas_abre_el_zip_y_descarta_lo_demas():
+    entregas = expandir_entregas([
+        ("suelta.docx", b"docx suelto"),
+        ("entregas.zip", zip_del_lms()),
+        ("foto.png", b"imagen"),
+    ])
+    assert entregas == [
+        ("suelta.docx", b"docx suelto"),
+        (f"{CARPETA}/reto.PDF", b"pdf de Ana"),
+        ("Beto Ruiz_456_assignsubmission_file_/reto.docx", b"docx de Beto"),
+    ]
+
+def test_expandir_entregas_en_disco():
+    entregas = expandir_entregas([("entregas.zip", zip_del_lms())], en_disco=True)
+    try:
+        assert [ruta for ruta, _ in entregas] == [f"{CARPETA}/reto.PDF", "Beto Ruiz_456_assignsubmission_file_/reto.docx"]
+        assert all(isinstance(datos, ArchivoEnDisco) for _, datos in entregas)
+        with open(entregas[0][1].ruta, "rb") as f:
+            assert f.read() == b"pdf de Ana"
+    finally:
+        borrar_temporales(entregas)
+    assert not any(os.path.exists(datos.ruta) for _, datos in entregas)
+
+@pytest.mark.parametrize("ruta, alumno", [
+    (f"{CARPETA}/reto.pdf", "Ana López"),
+    (f"entregas/{CARPETA}/reto.pdf", "Ana López"),
+    ("entregas/reto.pdf", ""),
+    ("reto.pdf", ""),
+])
+def test_nombre_desde_ruta(ruta, alumno):
+    assert nombre_desde_ruta(ruta) == alumno
+
+def test_ejecutar_lote_cancelado_deja_pendientes_en_none():
+    cancelacion = threading.Event()
+    avances = []
+
+    def duplicar(numero):
+        if numero == 1:
+            cancelacion.set()
+        return 2 * numero
+
+    resultados = ejecutar_lote(duplicar, [(n,) for n in range(4)], max_workers=1,
+                               al_avanzar=lambda hechos, total: avances.append((hechos, total)),
+                               cancelacion=cancelacion)
+    assert resultados == [0, 2, None, None]
+    assert avances == [(1, 4), (2, 4)]
+
+def test_ejecutar_lote_en_procesos_conserva_el_orden():
+    terminadas = {}
+    resultados = ejecutar_lote(pow, [(2, n) for n in range(5)], max_workers=2,
+                               al_terminar=lambda indice, resultado: terminadas.update({indice: resultado}))
+    assert resultados == [1, 2, 4, 8, 16]
+    assert terminadas == dict(enumerate(resultados))
+    assert ejecutar_lote(pow, []) == []
@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+
+import pytest
+
+from calificador import motores_pdf
+from calificador.motores_pdf import EstadisticasMotores, LimitesPDF, MotorPDF, PaginasPDF, calidad_suficiente
+
+class _Documento:
+    def __init__(self, paginas):
+        self.paginas = paginas
+        self.numero_paginas = len(paginas)
+
+    def texto(self, numero):
+        return self.paginas[numero]
+
+    def cerrar(self):
+        pass
+
+class MotorFijo(MotorPDF):
+    """Motor de prueba que devuelve siempre los mismos textos por página"""
+
+    def __init__(self, nombre, paginas):
+        self.nombre = nombre
+        self.paginas = paginas
+
+    def abrir(self, datos):
+        return _Documento(self.paginas)
+
+def test_motor_sin_abrir_no_se_puede_instanciar():
+    class MotorIncompleto(MotorPDF):
+        nombre = "incompleto"
+
+    with pytest.raises(TypeError):
+        MotorIncompleto()
+
+@pytest.mark.parametrize("texto, suficiente", [
+    ("a) B ∩ C = {1,2,13}", True),
+    ("Instrucciones: resuelve cada inciso y entrega en PDF.", True),
+    ("", False),
+    ("   \n", False),
+    ("a) B ∩ C = 1,2,13", False),
+    ("{1,2,13}", False),
+])
+def test_calidad_suficiente(texto, suficiente):
+    assert calidad_suficiente(texto) is suficiente
+
+@pytest.fixture
+def pdf_disponible(monkeypatch):
+    monkeypatch.setattr(motores_pdf, "PDF_AVAILABLE", True)
+
+def test_respaldo_solo_en_paginas_vacias_o_con_ecuaciones_a_medias(pdf_disponible):
+    rapido = MotorFijo("rapido", ["Portada del reto", "a) B ∩ C = 1,2,13", "", "Anexo"])
+    lento = MotorFijo("lento", ["Portada (lento)", "a) B ∩ C = {1,2,13}", "b) C ′ = {3}", "Anexo (lento)"])
+    estadisticas = EstadisticasMotores()
+    paginas = PaginasPDF(b"%PDF", [rapido, lento], estadisticas, LimitesPDF(None, None))
+
+    assert list(paginas) == ["Portada del reto", "a) B ∩ C = {1,2,13}", "b) C ′ = {3}", "Anexo"]
+    assert estadisticas.tasa_respaldo("rapido") == 0.5
+    assert not paginas.quedan_paginas and not paginas.truncado
+
+def test_limite_de_paginas_trunca(pdf_disponible):
+    motor = MotorFijo("rapido", [f"Página {i}" for i in range(5)])
+    paginas = PaginasPDF(b"%PDF", [motor], EstadisticasMotores(), LimitesPDF(2, None))
+    assert list(paginas) == ["Página 0", "Página 1"]
+    assert paginas.truncado and "2 de 5" in paginas.aviso
+
+class _PaginaPdfplumber:
+    def extract_text(self):
+        return "a) B ∩ C = {1,2,13}"
+
+    def close(self):
+        pass
+
+class _PdfPdfplumber:
+    def __init__(self, doc):
+        self.pages = [_PaginaPdfplumber()]
+        self.doc = doc
+
+@pytest.mark.parametrize("doc", [
+    SimpleNamespace(_cached_objs={1: "objeto"}),
+    # Una versión de pdfminer sin ese atributo interno
+    SimpleNamespace(),
+])
+def test_pdfplumber_suelta_objetos_si_pdfminer_los_expone(doc):
+    documento = object.__new__(motores_pdf._DocumentoPdfplumber)
+    documento._pdf = _PdfPdfplumber(doc)
+    assert documento.texto(0) == "a) B ∩ C = {1,2,13}"
+    assert getattr(doc, "_cached_objs", {}) == {}
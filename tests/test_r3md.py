@@ -0,0 +1,59 @@
+from calificador.r3md import (
+    EXPRESIONES_FIJAS,
+    IndiceEcuaciones,
+    buscar_por_expresion_aproximada,
+    buscar_por_expresion_flexible,
+    buscar_por_inciso_exacto,
+    evaluar_expresiones,
+    extraer_expresion_y_conjunto,
+)
+
+TEXTO = """Nombre completo: Ana López
+a) B ∩ C = {1,2,13}
+b) C´ = {3,5,8,9,12,14}
+Otros cálculos
+A ∩ C = {2,4,6,10}
+"""
+
+def test_linea_por_inciso_solo_bajo_su_inciso():
+    indice = IndiceEcuaciones(TEXTO)
+    clave = extraer_expresion_y_conjunto(EXPRESIONES_FIJAS[0])
+    assert indice.linea_por_inciso("a", clave) == "a) B ∩ C = {1,2,13}"
+    assert indice.linea_por_inciso("c", clave) == ""
+
+def test_linea_por_expresion_en_cualquier_parte():
+    indice = IndiceEcuaciones(TEXTO)
+    clave = extraer_expresion_y_conjunto(EXPRESIONES_FIJAS[3])
+    assert indice.linea_por_expresion(clave) == "A ∩ C = {2,4,6,10}"
+    assert indice.linea_por_inciso("d", clave) == ""
+    assert indice.buscar(3, EXPRESIONES_FIJAS[3]) == (True, "A ∩ C = {2,4,6,10}")
+
+def test_funciones_de_modulo_usan_el_indice():
+    expresion, conjunto = extraer_expresion_y_conjunto(EXPRESIONES_FIJAS[1])
+    assert buscar_por_inciso_exacto(TEXTO, "b", expresion, conjunto)[0]
+    assert not buscar_por_inciso_exacto(TEXTO, "e", expresion, conjunto)[0]
+    assert buscar_por_expresion_flexible(TEXTO, expresion, conjunto)[0]
+
+def test_aproximada_prefiere_la_linea_de_su_inciso():
+    # La línea de c) está más cerca de la respuesta de a) que lo que escribió en a)
+    texto = "a)\nA n 8 = {1,2}\n\n\n\nc)\nA ∩ B′ = {1,2}\n"
+    cadenas = ["A ∩ B = {1,2}", "B = {1}", "A ∩ B′ = {1,2}"]
+    coincidencias, _, incorrectos, aproximadas = evaluar_expresiones(texto, cadenas, tolerancia=2)
+    assert incorrectos == [1]
+    assert aproximadas == {0: "A n 8 = {1,2}"}
+    assert coincidencias == [cadenas[0], cadenas[2]]
+
+def test_aproximada_sin_candidatas_en_su_inciso_busca_en_todo_el_texto():
+    texto = "a)\nx = 0\n\n\n\nc)\nA ∩ B′ = {1,2}\n"
+    assert buscar_por_expresion_aproximada(texto, "A ∩ B = {1,2}", 2, indice_inciso=0) == (True, "A ∩ B′ = {1,2}")
+    assert buscar_por_expresion_aproximada(texto, "A ∩ B = {1,2}", 0, indice_inciso=0) == (False, "")
+
+def test_aproximada_con_el_mismo_conjunto_en_dos_incisos_acepta_la_de_su_inciso():
+    # B′ está a una edición de A′ y A^c a dos, pero B′ es la respuesta de b)
+    texto = "a)\nA^c = {1,3,5}\n\n\n\nb)\nB ′ = {1,3,5}\n"
+    cadenas = ["A ′ = {1,3,5}", "B ′ = {1,3,5}"]
+    assert buscar_por_expresion_aproximada(texto, cadenas[0], 2) == (True, "B ′ = {1,3,5}")
+    assert buscar_por_expresion_aproximada(texto, cadenas[0], 2, indice_inciso=0) == (True, "A^c = {1,3,5}")
+    coincidencias, _, incorrectos, aproximadas = evaluar_expresiones(texto, cadenas, tolerancia=2)
+    assert coincidencias == cadenas and incorrectos == []
+    assert aproximadas == {0: "A^c = {1,3,5}"}
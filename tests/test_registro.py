@@ -0,0 +1,59 @@
+import sqlite3
+
+from calificador import registro
+from calificador.calificacion import calificar_texto
+from calificador.r3md import EXPRESIONES_FIJAS
+from calificador.registro import RegistroCalificaciones
+
+def texto_entrega(nombre, incorrectos=()):
+    lineas = [f"Nombre completo: {nombre}"]
+    for i, (letra, expresion) in enumerate(zip("abcdefg", EXPRESIONES_FIJAS)):
+        lineas += [f"{letra})", "x = 0" if i in incorrectos else expresion]
+    return "\n".join(lineas)
+
+def llenar(reg, textos):
+    id_clave = reg.registrar_clave(EXPRESIONES_FIJAS)
+    for i, texto in enumerate(textos):
+        archivo = f"entrega{i}.pdf"
+        resultado = calificar_texto(archivo, texto, EXPRESIONES_FIJAS)
+        reg.guardar(archivo, resultado.nombre, f"hash{i}", texto, id_clave, resultado)
+    return id_clave
+
+def test_recalificar_por_bloques(tmp_path, monkeypatch):
+    monkeypatch.setattr(registro, "TEXTOS_POR_BLOQUE", 2)
+    reg = RegistroCalificaciones(str(tmp_path / "registro.sqlite3"))
+    textos = [texto_entrega(f"Alumno {i}", incorrectos=(i % 7,)) for i in range(5)]
+    id_anterior = llenar(reg, textos)
+
+    # Otra clave: el inciso a ahora es "x = 0", que todas escribieron en algún inciso
+    cadenas = ["x = 0"] + list(EXPRESIONES_FIJAS[1:])
+    avances = []
+    id_clave, evaluados = reg.recalificar(cadenas, desde_clave=id_anterior,
+                                          al_avanzar=lambda n, total: avances.append((n, total)))
+    assert evaluados == 5
+    assert avances == [(n, 5) for n in range(1, 6)]
+    filas = reg.filas(id_clave)
+    assert len(filas) == 5
+    assert [fila["Archivo"] for fila in filas] == [f"entrega{i}.pdf" for i in range(5)]
+    assert [fila["Incorrectos"] for fila in filas] == ["", "b)", "c)", "d)", "e)"]
+
+    # Los pares ya calificados no se repiten
+    assert reg.recalificar(cadenas, desde_clave=id_anterior)[1] == 0
+
+def test_migra_claves_sin_tolerancia(tmp_path):
+    ruta = str(tmp_path / "registro.sqlite3")
+    with sqlite3.connect(ruta) as conexion:
+        conexion.execute("CREATE TABLE claves (id INTEGER PRIMARY KEY, huella TEXT NOT NULL UNIQUE, "
+                         "cadenas TEXT NOT NULL, fecha TEXT NOT NULL)")
+        conexion.execute("INSERT INTO claves (huella, cadenas, fecha) VALUES ('h', '[\"x = 1\"]', '2024-01-01')")
+    conexion.close()
+
+    reg = RegistroCalificaciones(ruta)
+    assert reg.claves() == [{"id": 1, "cadenas": ["x = 1"], "fecha": "2024-01-01", "tolerancia": 0, "entregas": 0}]
+    id_tolerante = reg.registrar_clave(EXPRESIONES_FIJAS, tolerancia=2)
+    assert reg.claves()[0]["tolerancia"] == 2
+    assert reg.buscar_clave(EXPRESIONES_FIJAS) is None
+    assert reg.buscar_clave(EXPRESIONES_FIJAS, tolerancia=2) == id_tolerante
+    assert reg.clave(1) == {"id": 1, "cadenas": ["x = 1"], "fecha": "2024-01-01", "tolerancia": 0}
+    assert reg.clave(id_tolerante)["tolerancia"] == 2
+    assert reg.clave(999) is None
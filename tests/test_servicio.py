@@ -0,0 +1,112 @@
+import json
+import sqlite3
+import threading
+import urllib.error
+import urllib.request
+from urllib.parse import urlencode
+
+import pytest
+
+from benchmarks.corpus import escribir_docx
+from calificador.r3md import EXPRESIONES_FIJAS
+from calificador.registro import RegistroCalificaciones
+from calificador.servicio import cerrar_servidor, crear_servidor, resumir_latencias
+
+DEFINICIONES = "U = {1,...,14}; A = {2,4,6,8,10,12,14}; B = {1,2,3,5,8,13}; C = {1,2,4,6,7,10,11,13}"
+
+@pytest.fixture(scope="module")
+def servidor(tmp_path_factory):
+    registro = RegistroCalificaciones(str(tmp_path_factory.mktemp("registro") / "registro.sqlite3"))
+    servidor = crear_servidor(puerto=0, procesos=1, max_cola=0, registro=registro)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    servidor.url = "http://%s:%d" % servidor.server_address[:2]
+    yield servidor
+    servidor.shutdown()
+    cerrar_servidor(servidor)
+
+@pytest.fixture(scope="module")
+def entrega(tmp_path_factory):
+    """Entrega con todos los incisos bien salvo el b)"""
+    lineas = ["Nombre completo: Ana López"]
+    for letra, expresion in zip("abcdefg", EXPRESIONES_FIJAS):
+        lineas += [f"{letra})", "C ′ = {1}" if letra == "b" else expresion]
+    ruta = tmp_path_factory.mktemp("entregas") / "entrega.docx"
+    escribir_docx(lineas, ruta)
+    return ruta.read_bytes()
+
+def pedir(servidor, ruta, datos=None, parametros=None):
+    """(estado, respuesta JSON, encabezados) de una solicitud, aunque sea de error"""
+    url = servidor.url + ruta + (f"?{urlencode(parametros)}" if parametros else "")
+    solicitud = urllib.request.Request(url, data=datos, method="POST" if datos is not None else "GET")
+    try:
+        with urllib.request.urlopen(solicitud, timeout=60) as respuesta:
+            return respuesta.status, json.load(respuesta), respuesta.headers
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e), e.headers
+
+def test_calificar_con_clave_predefinida(servidor, entrega):
+    estado, respuesta, _ = pedir(servidor, "/calificar", entrega, {"archivo": "entrega.docx"})
+    assert estado == 200
+    assert [inciso["correcto"] for inciso in respuesta["incisos"]] == [True, False] + [True] * 5
+    assert respuesta["correctas"] == 6 and respuesta["total"] == 7
+    assert respuesta["videos"]
+
+    estado, metricas, _ = pedir(servidor, "/metrics")
+    assert estado == 200
+    assert metricas["procesos"] == 1 and metricas["atendidas"] >= 1
+    assert metricas["en_cola"] == 0 and metricas["latencia_ms"]["muestras"] >= 1
+
+def test_registrar_clave_y_calificar_con_ella(servidor, entrega):
+    estado, clave, _ = pedir(servidor, "/claves", json.dumps({"conjuntos": DEFINICIONES, "tolerancia": 2}).encode())
+    assert estado == 201
+    assert clave["cadenas"] == EXPRESIONES_FIJAS and clave["tolerancia"] == 2
+    assert any(version["id"] == clave["id"] for version in pedir(servidor, "/claves")[1])
+
+    estado, respuesta, _ = pedir(servidor, "/calificar", entrega, {"archivo": "entrega.docx", "clave": clave["id"]})
+    assert estado == 200 and respuesta["correctas"] == 6
+
+@pytest.mark.parametrize("ruta, datos, parametros, estado_esperado", [
+    ("/no-existe", None, None, 404),
+    ("/no-existe", b"x", None, 404),
+    ("/calificar", b"x", {"archivo": "entrega.txt"}, 400),
+    ("/calificar", b"x", {"archivo": "entrega.docx", "clave": "999"}, 404),
+    ("/calificar", b"no es un docx", {"archivo": "entrega.docx"}, 422),
+    ("/claves", b"{}", None, 400),
+    ("/claves", b"[1, 2]", None, 400),
+    ("/claves", b"no es JSON", None, 400),
+    ("/claves", b'{"conjuntos": 5}', None, 400),
+    ("/claves", b'{"cadenas": "x = 1"}', None, 400),
+    ("/claves", b'{"cadenas": [1]}', None, 400),
+    ("/claves", b'{"cadenas": ["x = 1"], "tolerancia": "dos"}', None, 400),
+])
+def test_errores(servidor, ruta, datos, parametros, estado_esperado):
+    estado, respuesta, _ = pedir(servidor, ruta, datos, parametros)
+    assert estado == estado_esperado
+    assert respuesta["error"]
+
+def test_error_inesperado_responde_500(servidor, monkeypatch):
+    def registrar_clave(*args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(servidor.servicio.registro, "registrar_clave", registrar_clave)
+    estado, respuesta, _ = pedir(servidor, "/claves", json.dumps({"cadenas": ["x = 1"]}).encode())
+    assert estado == 500
+    assert respuesta["error"] == "Error interno del servicio"
+
+def test_cola_llena_responde_503(servidor, entrega):
+    servicio = servidor.servicio
+    with servicio._candado:
+        servicio._pendientes += servicio.procesos + servicio.max_cola
+    try:
+        estado, respuesta, encabezados = pedir(servidor, "/calificar", entrega, {"archivo": "entrega.docx"})
+    finally:
+        with servicio._candado:
+            servicio._pendientes -= servicio.procesos + servicio.max_cola
+    assert estado == 503 and encabezados["Retry-After"] == "1"
+    assert pedir(servidor, "/metrics")[1]["rechazadas"] >= 1
+
+def test_resumir_latencias():
+    assert resumir_latencias([]) == {"muestras": 0}
+    resumen = resumir_latencias([i / 1000 for i in range(1, 101)])
+    assert resumen == {"muestras": 100, "p50": 50.0, "p90": 90.0, "p99": 99.0, "max": 100.0}
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from calificador.similitud import (
+    _A,
+    _B,
+    _PRIMO,
+    agrupar_similares,
+    firma_minhash,
+    firma_vacia,
+    shingles,
+    similitud_estimada,
+)
+
+def texto_con_comunes(comunes, propias, etiqueta, par=0):
+    """Texto de palabras únicas: las primeras `comunes` compartidas, luego `propias` solo suyas"""
+    palabras = [f"comun{par}x{i}" for i in range(comunes)] + [f"{etiqueta}{par}x{i}" for i in range(propias)]
+    return " ".join(palabras)
+
+def jaccard(a, b):
+    sa, sb = shingles(a), shingles(b)
+    return len(sa & sb) / len(sa | sb)
+
+def test_permutaciones_no_se_desbordan():
+    # El mayor valor posible de a·x + b (x < p) debe caber en uint64 antes del módulo
+    p = int(_PRIMO)
+    assert max(int(a) for a in _A) * (p - 1) + max(int(b) for b in _B) < 2**64
+
+@pytest.mark.parametrize("comunes, propias", [(400, 0), (300, 100), (200, 200), (100, 300), (40, 400), (0, 400)])
+def test_similitud_estimada_sigue_a_jaccard(comunes, propias):
+    a = texto_con_comunes(comunes, propias, "a")
+    b = texto_con_comunes(comunes, propias, "b")
+    exacta = jaccard(a, b)
+    # 128 permutaciones: desviación estándar de la estimación ≤ 0.045
+    assert abs(similitud_estimada(firma_minhash(a), firma_minhash(b)) - exacta) < 0.15
+
+def test_estimacion_sin_sesgo():
+    # Pares independientes (cada uno con su vocabulario) con similitud exacta cercana a 0.5:
+    # el error promedio de 30 estimaciones debe acercarse a cero
+    errores = []
+    for par in range(30):
+        a = texto_con_comunes(270, 130, "a", par)
+        b = texto_con_comunes(270, 130, "b", par)
+        errores.append(similitud_estimada(firma_minhash(a), firma_minhash(b)) - jaccard(a, b))
+    assert abs(np.mean(errores)) < 0.03
+
+def test_firma_vacia_y_grupos():
+    assert firma_vacia(firma_minhash(""))
+    base = texto_con_comunes(300, 0, "x")
+    casi_igual = base + " cambio final"
+    distinto = texto_con_comunes(0, 300, "z")
+    grupos = agrupar_similares([firma_minhash(base), firma_minhash(casi_igual), firma_minhash(distinto),
+                                firma_minhash("")])
+    assert [grupo["miembros"] for grupo in grupos] == [[0, 1]]